@@ -0,0 +1,48 @@
+"""
+Compare the recursive and the explicit stack (iterative) sorting engines on deep,
+narrow objects and on wide, shallow ones.
+
+    PYTHONPATH=src python benchmarks/iterative_sorter.py
+"""
+import timeit
+from pathlib import Path
+
+from ndl_tools.sorter import Sorter
+
+
+def deep(depth: int) -> dict:
+    """Dict/list chain nested depth times."""
+    data = {"leaf": 1}
+    for i in range(depth):
+        data = {"child": [data], "level": i}
+    return data
+
+
+def wide(width: int) -> dict:
+    """Dict of width lists of small records."""
+    return {
+        f"key-{i}": [{"x": j, "y": [j, -j]} for j in range(10)] for i in range(width)
+    }
+
+
+def main():
+    cases = [
+        ("deep 50", deep(50)),
+        ("deep 100", deep(100)),
+        ("deep 2000", deep(2000)),
+        ("wide 2000", wide(2000)),
+    ]
+    engines = [("recursive", Sorter._sorted), ("iterative", Sorter._sorted_iterative)]
+    for name, data in cases:
+        for engine, sort in engines:
+            try:
+                seconds = min(
+                    timeit.repeat(lambda: sort(data, Path()), number=3, repeat=3)
+                )
+                print(f"{name:>10} {engine:>10} {seconds / 3 * 1000:10.2f} ms")
+            except RecursionError:
+                print(f"{name:>10} {engine:>10}  RecursionError")
+
+
+if __name__ == "__main__":
+    main()
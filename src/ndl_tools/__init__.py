@@ -1,21 +1,120 @@
-from .differ import DiffResult, Differ
-from .list_sorter import BaseListSorter, NoSortListSorter, DefaultListSorter
-from .normalizer import (
-    NORMALIZERS,
-    BaseNormalizer,
-    DefaultNormalizer,
-    FloatRoundNormalizer,
-    TodayDateNormalizer,
-    StrTodayDateNormalizer,
-    PathNormalizer,
-)
-from .selector import (
-    SELECTORS,
-    BaseSelector,
-    ListLastComponentSelector,
-    ListAnyComponentSelector,
-    RegExSelector,
-    NegativeSelector,
-    EndsWithSelector,
-)
-from .sorter import Sorter
+"""
+Tools for sorting and diffing nested dictionaries and lists.  The classes are
+imported from their modules on first use, so importing the package, or just one
+of its modules like the command line tool, doesn't load the modules it doesn't
+need, like NumPy, asyncio and the snapshot and session code.
+"""
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .budget import DiffBudget
+    from .cache import DiffCache
+    from .columnar import ColumnarPruner, ColumnTable
+    from .comparator import (
+        COMPARATORS,
+        BaseComparator,
+        FloatToleranceComparator,
+        IsoDateComparator,
+        PathSuffixComparator,
+    )
+    from .difference import MISSING, Difference
+    from .differ import DiffResult, Differ
+    from .directory import DirectoryDiffer, DirectoryDiffResult
+    from .drift import DriftCounts, DriftIndex
+    from .list_sorter import BaseListSorter, NoSortListSorter, DefaultListSorter
+    from .normalizer import (
+        NORMALIZERS,
+        BaseNormalizer,
+        DefaultNormalizer,
+        FloatRoundNormalizer,
+        TodayDateNormalizer,
+        StrTodayDateNormalizer,
+        PathNormalizer,
+    )
+    from .profiler import ComponentProfiler, ComponentStats
+    from .pruner import PRUNERS, BasePruner, DropPruner, PlaceholderPruner
+    from .renderer import (
+        BaseRenderer,
+        AnsiRenderer,
+        PlainRenderer,
+        UnifiedRenderer,
+        HtmlRenderer,
+    )
+    from .selector import (
+        SELECTORS,
+        BaseSelector,
+        ListLastComponentSelector,
+        ListAnyComponentSelector,
+        RegExSelector,
+        NegativeSelector,
+        EndsWithSelector,
+    )
+    from .session import DiffSession
+    from .snapshot import NotSnapshotError, Snapshot, write_snapshot
+    from .sorter import InternTable, Sorter
+
+# Modules of the exported names.
+_EXPORTS = {
+    "budget": ("DiffBudget",),
+    "cache": ("DiffCache",),
+    "columnar": ("ColumnarPruner", "ColumnTable"),
+    "comparator": (
+        "COMPARATORS",
+        "BaseComparator",
+        "FloatToleranceComparator",
+        "IsoDateComparator",
+        "PathSuffixComparator",
+    ),
+    "difference": ("MISSING", "Difference"),
+    "differ": ("DiffResult", "Differ"),
+    "directory": ("DirectoryDiffer", "DirectoryDiffResult"),
+    "drift": ("DriftCounts", "DriftIndex"),
+    "list_sorter": ("BaseListSorter", "NoSortListSorter", "DefaultListSorter"),
+    "normalizer": (
+        "NORMALIZERS",
+        "BaseNormalizer",
+        "DefaultNormalizer",
+        "FloatRoundNormalizer",
+        "TodayDateNormalizer",
+        "StrTodayDateNormalizer",
+        "PathNormalizer",
+    ),
+    "profiler": ("ComponentProfiler", "ComponentStats"),
+    "pruner": ("PRUNERS", "BasePruner", "DropPruner", "PlaceholderPruner"),
+    "renderer": (
+        "BaseRenderer",
+        "AnsiRenderer",
+        "PlainRenderer",
+        "UnifiedRenderer",
+        "HtmlRenderer",
+    ),
+    "selector": (
+        "SELECTORS",
+        "BaseSelector",
+        "ListLastComponentSelector",
+        "ListAnyComponentSelector",
+        "RegExSelector",
+        "NegativeSelector",
+        "EndsWithSelector",
+    ),
+    "session": ("DiffSession",),
+    "snapshot": ("NotSnapshotError", "Snapshot", "write_snapshot"),
+    "sorter": ("InternTable", "Sorter"),
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name: str) -> Any:
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,38 @@
+"""
+Diff a directory of golden JSON documents against a directory of fresh outputs.
+
+    python -m ndl_tools BASELINE ACTUAL [--index FILE] [-j N]
+
+Exits with 0 if the directories match and 1 if they don't.
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from .directory import DirectoryDiffer
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m ndl_tools",
+        description="Diff the JSON documents in two directories.",
+    )
+    parser.add_argument("baseline", help="Directory of expected documents.")
+    parser.add_argument("actual", help="Directory of test documents.")
+    parser.add_argument("--index", help="Index file of fingerprints to reuse.")
+    parser.add_argument("--pattern", default="*.json", help="Glob for documents.")
+    parser.add_argument("-j", "--workers", type=int, help="Processes for the diffs.")
+    parser.add_argument(
+        "--support", action="store_true", help="Show the diff of changed documents."
+    )
+    args = parser.parse_args(argv)
+
+    result = DirectoryDiffer(pattern=args.pattern).diff(
+        args.baseline, args.actual, index=args.index, workers=args.workers
+    )
+    print(result.report(support=args.support))
+    return 0 if result else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Limits on how much work Differ.diff() will do.  When a limit is hit the diff
+stops and returns a DiffResult with the match result, if it could still be
+determined cheaply, and a partial support that is marked as partial.
+"""
+import time
+from typing import Any, Optional
+
+# Lines of unchanged output kept around the changed region for orientation.
+CONTEXT_LINES = 3
+
+
+class DiffBudget:
+    """
+    Time and size limits for a single diff.  Any limit left as None is unlimited.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_seconds: Optional[float] = None,
+        max_nodes: Optional[int] = None,
+        max_lines: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        chunk_lines: int = 1000,
+    ):
+        """
+        Set up the limits for a diff.
+
+        :param max_seconds: Wall time limit for the whole diff.  Checked between the
+            sorting of each side, between chunks of the line diff and during it.
+        :param max_nodes: Maximum number of dict/list/leaf nodes in either side.  Larger
+            documents aren't sorted at all.
+        :param max_lines: Maximum number of lines from the changed region of the
+            jsonified documents that are line diffed.
+        :param max_rows: Maximum number of rows in the support.
+        :param chunk_lines: Number of lines line diffed at a time.  Smaller chunks
+            check the time limit more often and keep each line diff small.  Chunks
+            are cut at lines that are the same on both sides where there are any.
+        """
+        self.max_seconds = max_seconds
+        self.max_nodes = max_nodes
+        self.max_lines = max_lines
+        self.max_rows = max_rows
+        self.chunk_lines = chunk_lines
+        self._start = None
+        self._cancelled = False
+
+    def start(self) -> "DiffBudget":
+        """Start the clock for the time limit."""
+        self._start = time.monotonic()
+        return self
+
+    def cancel(self):
+        """
+        Stop the diff at the next check of the time limit.  Safe to call from
+        another thread than the one running the diff.
+        """
+        self._cancelled = True
+
+    def expired(self) -> bool:
+        """True if the diff has been cancelled or the time limit has been used up."""
+        if self._cancelled:
+            return True
+        if self.max_seconds is None or self._start is None:
+            return False
+        return time.monotonic() - self._start > self.max_seconds
+
+    def too_many_nodes(self, data: Any) -> bool:
+        """
+        Check the node limit.  Stops counting as soon as the limit is passed
+        so the cost is bounded by the limit and not by the document size.
+
+        :param data: Unsorted document.
+        :return: True if the document has more nodes than the limit.
+        """
+        if self.max_nodes is None:
+            return False
+
+        count = 0
+        stack = [data]
+        while stack:
+            count += 1
+            if count > self.max_nodes:
+                return True
+            element = stack.pop()
+            if isinstance(element, dict):
+                stack.extend(element.values())
+            elif isinstance(element, list):
+                stack.extend(element)
+        return False
+
+
+def partial_marker(reason: str) -> str:
+    """Header line that marks the support as partial."""
+    return f"*** PARTIAL DIFF: {reason} ***"
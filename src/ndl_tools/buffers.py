@@ -0,0 +1,249 @@
+"""
+NumPy array and bytes-like leaf elements.  These are compared element by element
+with vectorized operations instead of being expanded into lists, and are
+summarized in the diff by their shape, dtype and the first positions that don't
+match.  ColumnTables from the columnar module are handled the same way.
+"""
+import pickle
+from collections.abc import Mapping
+from typing import Any, Iterable, List, Optional, Tuple
+
+from .columnar import ColumnTable
+from .optional import import_numpy, loaded_numpy
+from .sorter import CompactList, SortedList, SortedMapping
+
+BUFFER_TYPES = (bytes, bytearray, memoryview, ColumnTable)
+# Number of mismatched positions shown in a summary.
+MAX_POSITIONS = 5
+
+
+def is_buffer(element: Any) -> bool:
+    """True if the element is a NumPy array, bytes-like or ColumnTable leaf."""
+    numpy = loaded_numpy()
+    return isinstance(element, BUFFER_TYPES) or (
+        numpy is not None and isinstance(element, numpy.ndarray)
+    )
+
+
+def has_buffers(elements: Iterable) -> bool:
+    """True if any of the elements is a NumPy array, bytes-like or ColumnTable leaf."""
+    numpy = loaded_numpy()
+    for type_ in set(map(type, elements)):
+        if issubclass(type_, BUFFER_TYPES) or (
+            numpy is not None and issubclass(type_, numpy.ndarray)
+        ):
+            return True
+    return False
+
+
+def sort_key(element: Any) -> Tuple:
+    """
+    Sort key for the elements of a list that contains buffers, which can't be
+    ordered with <.  Buffers are ordered by type, element type, shape and contents,
+    after the other leaves and before mappings and lists, which are ordered by the
+    keys of their elements.
+
+    :param element: Sorted element.
+    :return: Key.
+    """
+    numpy = loaded_numpy()
+    if is_buffer(element):
+        if isinstance(element, ColumnTable):
+            contents = pickle.dumps(element, pickle.HIGHEST_PROTOCOL)
+        elif numpy is not None and isinstance(element, numpy.ndarray):
+            if element.dtype.hasobject:
+                contents = repr(element.tolist()).encode()
+            else:
+                contents = numpy.ascontiguousarray(element).tobytes()
+        else:
+            contents = bytes(element)
+        shape, dtype = _shape_dtype(element)
+        return 1, type(element).__name__, dtype, shape, contents
+    if isinstance(element, Mapping):
+        return 2, tuple((k, sort_key(v)) for k, v in element.items())
+    if isinstance(element, (list, CompactList)):
+        return 3, tuple(sort_key(v) for v in element)
+    return 0, element
+
+
+def _as_array(element: Any) -> Any:
+    """View a buffer as a NumPy array without copying it."""
+    numpy = import_numpy()
+    if isinstance(element, (bytes, bytearray)):
+        return numpy.frombuffer(element, dtype=numpy.uint8)
+    return numpy.asarray(element)
+
+
+def _shape_dtype(element: Any) -> Tuple[Tuple[int, ...], str]:
+    """Shape and element type of a buffer."""
+    numpy = loaded_numpy()
+    if numpy is not None and isinstance(element, numpy.ndarray):
+        return element.shape, str(element.dtype)
+    if isinstance(element, memoryview):
+        return element.shape, element.format
+    if isinstance(element, ColumnTable):
+        return (len(element),), "records"
+    return (len(element),), "bytes"
+
+
+def mismatches(
+    left: Any, right: Any, rtol: float = 0.0, atol: float = 0.0
+) -> Optional[Tuple[int, List[Tuple[int, ...]]]]:
+    """
+    Compare two buffers element by element.
+
+    :param left: Left buffer.
+    :param right: Right buffer.
+    :param rtol: Relative tolerance for floating point elements.
+    :param atol: Absolute tolerance for floating point elements.
+    :return: Count and first positions of the mismatched elements, or None if the
+        buffers have different shapes or element types and can't be compared.
+    """
+    if isinstance(left, ColumnTable) or isinstance(right, ColumnTable):
+        if isinstance(left, ColumnTable) and isinstance(right, ColumnTable):
+            return left.mismatches(right, rtol, atol)
+        return None
+
+    left_shape, left_dtype = _shape_dtype(left)
+    right_shape, right_dtype = _shape_dtype(right)
+    if left_shape != right_shape:
+        return None
+
+    numpy = import_numpy()
+    if numpy is None:
+        if left_dtype != right_dtype:
+            return None
+        left_bytes = left.tobytes() if isinstance(left, memoryview) else left
+        right_bytes = right.tobytes() if isinstance(right, memoryview) else right
+        if left_bytes == right_bytes:
+            return 0, []
+        positions = [
+            (i,) for i, (l, r) in enumerate(zip(left_bytes, right_bytes)) if l != r
+        ]
+        return len(positions), positions[:MAX_POSITIONS]
+
+    left_array = _as_array(left)
+    right_array = _as_array(right)
+    if left_array.dtype != right_array.dtype:
+        # NumPy would compare the values of an int and a float array.
+        return None
+    try:
+        if left_array.dtype.kind in "fc" or right_array.dtype.kind in "fc":
+            equal = numpy.isclose(
+                left_array, right_array, rtol=rtol, atol=atol, equal_nan=True
+            )
+        else:
+            equal = numpy.asarray(left_array == right_array)
+    except TypeError:
+        return None
+    if equal.shape != left_array.shape:
+        # Elementwise comparison isn't supported for these dtypes.
+        return None
+
+    mismatched = numpy.flatnonzero(~equal)
+    positions = [
+        tuple(int(i) for i in numpy.unravel_index(index, left_array.shape))
+        for index in mismatched[:MAX_POSITIONS]
+    ]
+    return len(mismatched), positions
+
+
+def buffers_equal(left: Any, right: Any, rtol: float = 0.0, atol: float = 0.0) -> bool:
+    """True if two buffers have the same shape and all their elements match."""
+    result = mismatches(left, right, rtol, atol)
+    return result is not None and result[0] == 0
+
+
+def summary(
+    element: Any, mismatch: Optional[Tuple[int, List[Tuple[int, ...]]]] = None
+) -> str:
+    """
+    Compact one line description of a buffer for the diff.
+
+    :param element: Buffer to summarize.
+    :param mismatch: Count and positions of mismatches with the other side.  The values
+        of this side at those positions are included.
+    :return: Summary.
+    """
+    if isinstance(element, ColumnTable):
+        return element.summary(mismatch)
+
+    shape, dtype = _shape_dtype(element)
+    description = f"<{type(element).__name__} shape={shape} dtype={dtype}"
+    if mismatch and mismatch[0]:
+        count, positions = mismatch
+        if import_numpy() is not None:
+            array = _as_array(element)
+            values = [array[position].item() for position in positions]
+        else:
+            values = [element[position[0]] for position in positions]
+        shown = " ".join(
+            f"{list(position)}={value!r}" for position, value in zip(positions, values)
+        )
+        description = f"{description} mismatches={count} {shown}"
+    return f"{description}>"
+
+
+def summarize_buffers(
+    left: Any, right: Any, rtol: float = 0.0, atol: float = 0.0
+) -> Tuple[Any, Any]:
+    """
+    Replace the buffers in two sorted NDLs with their summaries.  Buffers at the
+    same path are compared so that matching buffers get the same summary and
+    mismatched ones show their values where they differ.
+
+    :param left: Sorted left NDL.
+    :param right: Sorted right NDL.
+    :param rtol: Relative tolerance for floating point elements.
+    :param atol: Absolute tolerance for floating point elements.
+    :return: Left and right NDL with summaries in place of the buffers.
+    """
+    left_buffer = is_buffer(left)
+    right_buffer = is_buffer(right)
+    if left_buffer and right_buffer:
+        mismatch = mismatches(left, right, rtol, atol)
+        if mismatch is not None and not mismatch[0]:
+            return summary(left), summary(left)
+        return summary(left, mismatch), summary(right, mismatch)
+
+    if isinstance(left, dict) and isinstance(right, dict):
+        left_items = []
+        right_items = []
+        for k in sorted(left.keys() | right.keys()):
+            if k in left and k in right:
+                left_value, right_value = summarize_buffers(
+                    left[k], right[k], rtol, atol
+                )
+                left_items.append((k, left_value))
+                right_items.append((k, right_value))
+            elif k in left:
+                left_items.append((k, _summarize_one(left[k])))
+            else:
+                right_items.append((k, _summarize_one(right[k])))
+        return (
+            SortedMapping._from_sorted(left_items),
+            SortedMapping._from_sorted(right_items),
+        )
+
+    if isinstance(left, list) and isinstance(right, list):
+        pairs = [summarize_buffers(l, r, rtol, atol) for l, r in zip(left, right)]
+        left_list = [l for l, _ in pairs]
+        left_list.extend(_summarize_one(l) for l in left[len(pairs) :])
+        right_list = [r for _, r in pairs]
+        right_list.extend(_summarize_one(r) for r in right[len(pairs) :])
+        return SortedList._from_sorted(left_list), SortedList._from_sorted(right_list)
+
+    return _summarize_one(left), _summarize_one(right)
+
+
+def _summarize_one(element: Any) -> Any:
+    """Replace the buffers in an NDL that has nothing to be compared with."""
+    if is_buffer(element):
+        return summary(element)
+    if isinstance(element, dict):
+        return SortedMapping._from_sorted(
+            (k, _summarize_one(v)) for k, v in element.items()
+        )
+    if isinstance(element, list):
+        return SortedList._from_sorted(_summarize_one(v) for v in element)
+    return element
@@ -0,0 +1,141 @@
+"""
+LRU cache of diff results for tests and retry loops that diff the same pair of
+objects with the same configuration again and again.
+
+    cache = DiffCache(maxsize=256)
+    result = Differ.diff(left, right, normalizers=normalizers, cache=cache)
+
+Results are keyed on fingerprints of the raw objects and a hash of the
+configuration, so a repeat returns the stored DiffResult without sorting or line
+diffing anything.  Fingerprints are digests of the typed contents of the objects
+that don't depend on the order of dict keys.  Diffs of objects with leaves that
+can't be pickled, other than the JSON types, NumPy arrays and bytes-like leaves,
+and diffs with lambdas or local functions in the configuration aren't cached.
+"""
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from .differ import DiffResult
+from .directory import describe_config
+from .snapshot import raw_fingerprint
+
+# Bytes of support kept by default.
+MAX_BYTES = 64 * 1024 * 1024
+
+
+class DiffCache:
+    """
+    Bounded LRU cache of DiffResults.  The least recently used results are dropped
+    when there are more than maxsize results or their support takes more than
+    max_bytes.  A cache can be shared by threads.
+    """
+
+    def __init__(
+        self, maxsize: Optional[int] = 1024, max_bytes: Optional[int] = MAX_BYTES
+    ):
+        """
+        :param maxsize: Maximum number of results.  None for no limit.
+        :param max_bytes: Maximum size of the supports of the results.  None for
+            no limit.
+        """
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._results: "OrderedDict[Tuple, Tuple[DiffResult, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    @staticmethod
+    def key(left: Any, right: Any, config: Sequence[Any]) -> Optional[Tuple]:
+        """
+        Cache key of a diff.
+
+        :param left: Test object.
+        :param right: Expected object.
+        :param config: JSON encoder class, components and options of the diff.
+        :return: (left fingerprint, right fingerprint, configuration hash), or None
+            if a leaf can't be fingerprinted or the configuration can't be
+            described, like one with a lambda, and the diff can't be cached.
+        """
+        fingerprints: Dict[int, bytes] = {}
+        try:
+            left_fingerprint = raw_fingerprint(left, fingerprints)
+            right_fingerprint = raw_fingerprint(right, fingerprints)
+        except TypeError:
+            return None
+        description = describe_config(list(config))
+        if description is None:
+            return None
+        return (
+            left_fingerprint,
+            right_fingerprint,
+            hashlib.sha256(description.encode()).hexdigest(),
+        )
+
+    def get(self, key: Tuple) -> Optional[DiffResult]:
+        """
+        Stored result of a diff.
+
+        :param key: Key from key().
+        :return: Result or None if it isn't stored.
+        """
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple, result: DiffResult):
+        """
+        Store the result of a diff.  Results with a support bigger than max_bytes
+        aren't stored.
+
+        :param key: Key from key().
+        :param result: Result of the diff.
+        """
+        size = sys.getsizeof(result.support)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._results.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._results[key] = (result, size)
+            self.bytes += size
+            while self._over_limits():
+                _, (_, evicted_size) = self._results.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def _over_limits(self) -> bool:
+        if self.maxsize is not None and len(self._results) > self.maxsize:
+            return True
+        return self.max_bytes is not None and self.bytes > self.max_bytes
+
+    def clear(self):
+        """Drop the stored results.  The statistics are kept."""
+        with self._lock:
+            self._results.clear()
+            self.bytes = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"DiffCache(hits={self.hits}, misses={self.misses}, "
+            f"evictions={self.evictions}, size={len(self)}, bytes={self.bytes})"
+        )
@@ -0,0 +1,306 @@
+"""
+ndl-diff: diff JSON and NDJSON documents from the command line.
+
+    ndl-diff [-c CONFIG] [-f {ansi,plain,json-patch}] [-j N] LEFT RIGHT [LEFT RIGHT ...]
+
+LEFT and RIGHT are files or - for stdin.  Files ending in .ndjson or .jsonl are
+read as a list with one document per line.  Sorters, normalizers and pruners are
+built from a TOML or JSON config where each component is a table with its class
+name in "type" and its arguments in the other keys:
+
+    [[normalizers]]
+    type = "FloatRoundNormalizer"
+    places = 2
+    selectors = [{type = "EndsWithSelector", end_of_path = "price"}]
+
+The exit code is 0 if every pair matches, 1 if any pair differs and 2 for a usage,
+config or input error.
+"""
+import argparse
+import importlib
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+MATCH = 0
+DIFFERENT = 1
+ERROR = 2
+
+FORMATS = ("ansi", "plain", "json-patch")
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+# Modules with the classes that can be named in a config.  The modules each mode
+# needs are imported when it runs so that the command starts quickly.
+COMPONENT_MODULES = (
+    "columnar",
+    "comparator",
+    "list_sorter",
+    "normalizer",
+    "pruner",
+    "selector",
+)
+
+ANSI_ESCAPE = re.compile(r"\033\[[0-9;:]*m")
+
+
+class ConfigError(Exception):
+    """The config file can't be read or names an unknown component."""
+
+
+def load_config(path: str) -> Dict[str, Any]:
+    """
+    Read a TOML or JSON config and build its components.
+
+    :param path: Config file.  TOML if it ends in .toml, otherwise JSON.
+    :return: Keyword arguments for the diff: sorters, normalizers, pruners,
+        comparators and max_col_width.
+    """
+    try:
+        with open(path, "rb") as fp:
+            raw = fp.read()
+    except OSError as e:
+        raise ConfigError(f"Can't read config {path}: {e}")
+
+    try:
+        if path.endswith(".toml"):
+            data = _toml().loads(raw.decode())
+        else:
+            data = json.loads(raw)
+    except ValueError as e:
+        raise ConfigError(f"Can't parse config {path}: {e}")
+
+    return build_config(data)
+
+
+def build_config(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the components in a decoded config.
+
+    :param data: Decoded TOML or JSON config.
+    :return: Keyword arguments for the diff: sorters, normalizers, pruners,
+        comparators and max_col_width.
+    """
+    unknown = set(data) - {
+        "sorters",
+        "normalizers",
+        "pruners",
+        "comparators",
+        "max_col_width",
+    }
+    if unknown:
+        raise ConfigError(f"Unknown config keys: {', '.join(sorted(unknown))}")
+    return {key: _build(value) for key, value in data.items()}
+
+
+def _toml() -> Any:
+    """TOML parser from the standard library or tomli."""
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise ConfigError("TOML configs need Python 3.11+ or tomli installed.")
+    return tomllib
+
+
+def _build(spec: Any) -> Any:
+    """Build the components in a config value.  Tables with a type are components."""
+    if isinstance(spec, list):
+        return [_build(value) for value in spec]
+    if not isinstance(spec, dict):
+        return spec
+
+    kwargs = {key: _build(value) for key, value in spec.items() if key != "type"}
+    name = spec.get("type")
+    if name is None:
+        return kwargs
+    component_type = _component_types().get(name)
+    if component_type is None:
+        raise ConfigError(f"Unknown component type: {name}")
+    try:
+        return component_type(**kwargs)
+    except (TypeError, ValueError) as e:
+        raise ConfigError(f"Can't build {name}: {e}")
+
+
+def _component_types() -> Dict[str, type]:
+    """Sorter, normalizer, pruner, comparator and selector classes by name."""
+    types = {}
+    for module_name in COMPONENT_MODULES:
+        module = importlib.import_module(f".{module_name}", __package__)
+        for name, value in vars(module).items():
+            if isinstance(value, type) and value.__module__ == module.__name__:
+                types[name] = value
+    return types
+
+
+def read_document(path: str, ndjson: bool = False) -> Any:
+    """
+    Read a JSON document, or an NDJSON file as a list of documents.
+
+    :param path: File or - for stdin.
+    :param ndjson: Read as NDJSON even if the file doesn't end in .ndjson or .jsonl.
+    :return: Document.
+    """
+    if path == "-":
+        raw = sys.stdin.buffer.read()
+    else:
+        raw = Path(path).read_bytes()
+    if ndjson or path.endswith(NDJSON_SUFFIXES):
+        return [json.loads(line) for line in raw.splitlines() if line.strip()]
+    return json.loads(raw)
+
+
+def json_patch(left: Any, right: Any, config: Dict[str, Any]) -> List[Dict]:
+    """
+    RFC 6902 JSON patch that turns the sorted left document into the sorted right
+    document.  List indexes are positions in the sorted lists as the operations
+    are applied in order.
+
+    :param left: Test document.
+    :param right: Expected document.
+    :param config: Keyword arguments from load_config().
+    :return: Patch operations.
+    """
+    from .comparator import reconcile
+    from .difference import differences
+    from .sorter import Sorter
+
+    kwargs = {key: config.get(key) for key in ("sorters", "normalizers", "pruners")}
+    sorted_left = Sorter.sorted(left, **kwargs)
+    sorted_right = reconcile(
+        sorted_left, Sorter.sorted(right, **kwargs), config.get("comparators")
+    )
+    operations = []
+    # The list indexes of the differences are valid when they are applied in order.
+    for difference in differences(sorted_left, sorted_right):
+        pointer = json_pointer(difference.keys)
+        kind = difference.kind
+        if kind == "removed":
+            operations.append({"op": "remove", "path": pointer})
+        else:
+            op = "add" if kind == "added" else "replace"
+            operations.append({"op": op, "path": pointer, "value": difference.right})
+    return operations
+
+
+def json_pointer(keys: Tuple) -> str:
+    """
+    RFC 6901 JSON pointer to an element.
+
+    :param keys: Mapping keys and list indexes to the element.
+    :return: Pointer, "" for the whole document.
+    """
+    return "".join(
+        "/" + str(key).replace("~", "~0").replace("/", "~1") for key in keys
+    )
+
+
+def diff_pair(job: Tuple[str, str, Any, Any, str, Dict[str, Any], bool]) -> Tuple:
+    """
+    Diff one pair of documents.  Runs in the worker processes.
+
+    :param job: Left name, right name, left and right documents or None to read
+        them from the names, format, config and NDJSON flag.
+    :return: Exit code and output.
+    """
+    left_name, right_name, left, right, format_, config, ndjson = job
+    try:
+        if left is None:
+            left = read_document(left_name, ndjson)
+        if right is None:
+            right = read_document(right_name, ndjson)
+    except (OSError, ValueError) as e:
+        return ERROR, f"{left_name} {right_name}: {e}"
+
+    try:
+        if format_ == "json-patch":
+            patch = json_patch(left, right, config)
+            return (DIFFERENT if patch else MATCH), patch
+        from .differ import Differ
+
+        result = Differ.diff(left, right, **config)
+    except Exception as e:
+        # For example a list of values that can't be ordered.  Exit code 1 means the
+        # documents differ, so this is reported as an error instead of a crash.
+        return ERROR, f"{left_name} {right_name}: {type(e).__name__}: {e}"
+
+    if result:
+        return MATCH, ""
+    support = result.support
+    if format_ == "plain":
+        support = ANSI_ESCAPE.sub("", support)
+    return DIFFERENT, support
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="ndl-diff", description="Diff JSON and NDJSON documents."
+    )
+    parser.add_argument(
+        "files", nargs="+", metavar="FILE", help="LEFT RIGHT pairs, - for stdin."
+    )
+    parser.add_argument("-c", "--config", help="TOML or JSON config of components.")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="ansi")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="Processes.")
+    parser.add_argument("--ndjson", action="store_true", help="Read files as NDJSON.")
+    parser.add_argument("--max-col-width", type=int, help="Width of each side.")
+    args = parser.parse_args(argv)
+
+    if len(args.files) % 2:
+        parser.error("files must be LEFT RIGHT pairs")
+    if args.files.count("-") > 1:
+        parser.error("only one file can be read from stdin")
+
+    try:
+        config = load_config(args.config) if args.config else {}
+    except ConfigError as e:
+        print(e, file=sys.stderr)
+        return ERROR
+    if args.max_col_width is not None:
+        config["max_col_width"] = args.max_col_width
+    if args.format == "json-patch":
+        config.pop("max_col_width", None)
+
+    jobs = []
+    for left_name, right_name in zip(args.files[::2], args.files[1::2]):
+        # Stdin is read here since the worker processes don't share it.
+        try:
+            left = read_document("-", args.ndjson) if left_name == "-" else None
+            right = read_document("-", args.ndjson) if right_name == "-" else None
+        except ValueError as e:
+            print(f"-: {e}", file=sys.stderr)
+            return ERROR
+        jobs.append(
+            (left_name, right_name, left, right, args.format, config, args.ndjson)
+        )
+
+    if args.workers > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            results = list(executor.map(diff_pair, jobs))
+    else:
+        results = [diff_pair(job) for job in jobs]
+
+    exit_code = MATCH
+    for job, (code, output) in zip(jobs, results):
+        exit_code = max(exit_code, code)
+        if code == ERROR:
+            print(output, file=sys.stderr)
+        elif args.format == "json-patch":
+            if len(jobs) == 1:
+                print(json.dumps(output, indent=2))
+            else:
+                print(json.dumps({"left": job[0], "right": job[1], "patch": output}))
+        elif output:
+            if len(jobs) > 1:
+                print(f"--- {job[0]}\n+++ {job[1]}")
+            print(output)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Columnar comparison of lists of records like [{"id": 1, "price": 2.0}, ...].
+A ColumnarPruner replaces a selected list of records that all have the same
+fields with a ColumnTable before the list is sorted, so no dict is built per
+row and the line diff sees one line per table.  The tables are compared column
+by column with the rows matched up by their key columns.
+"""
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .normalizer import BATCH_TYPES
+from .optional import import_numpy, loaded_numpy
+from .pruner import BasePruner, NotPrunedError
+from .selector import SELECTORS
+
+# Number of mismatched cells or rows shown in a summary.
+MAX_POSITIONS = 5
+
+# Position of a mismatch: (row key, column name or None for a missing row).
+POSITION = Tuple[Tuple, Optional[str]]
+
+
+def _sort_key(value: Any) -> Tuple[str, Any]:
+    """Sort key that keeps values of different types, like None and int, apart."""
+    return type(value).__name__, value
+
+
+class ColumnTable:
+    """
+    Records stored by column and sorted by their key columns.
+    """
+
+    def __init__(self, records: Sequence[Dict], key_columns: Sequence[str]):
+        """
+        Build the table from a list of records that all have the same fields.
+
+        :param records: Records to store.
+        :param key_columns: Fields that identify a record.  Rows with the same key
+            are told apart by the order of their other fields.
+        """
+        self.key_columns = list(key_columns)
+        self.column_names = sorted(records[0].keys()) if records else []
+        rows = sorted(
+            (tuple(record[name] for name in self.column_names) for record in records),
+            key=lambda row: tuple(_sort_key(value) for value in row),
+        )
+        key_positions = [self.column_names.index(name) for name in self.key_columns]
+
+        # Rows with the same key are numbered so that every row has a unique key.
+        self.keys = []
+        occurrences = {}
+        for row in rows:
+            key = tuple(row[i] for i in key_positions)
+            occurrence = occurrences.get(key, 0)
+            occurrences[key] = occurrence + 1
+            self.keys.append(key + (occurrence,) if occurrence else key)
+
+        numpy = import_numpy()
+        self.columns = {}
+        for i, name in enumerate(self.column_names):
+            values = [row[i] for row in rows]
+            if numpy is not None and values and all(
+                isinstance(value, (int, float)) and not isinstance(value, bool)
+                for value in values
+            ):
+                values = numpy.asarray(values)
+            self.columns[name] = values
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def mismatches(
+        self, other: "ColumnTable", rtol: float = 0.0, atol: float = 0.0
+    ) -> Optional[Tuple[int, List[POSITION]]]:
+        """
+        Compare the table with another table.  Rows are matched by key and every
+        other column of the matched rows is compared in bulk.
+
+        :param other: Table to compare with.
+        :param rtol: Relative tolerance for float columns.
+        :param atol: Absolute tolerance for float columns.
+        :return: Count and first positions of mismatched cells and rows that are
+            only in one table, or None if the tables have different columns.
+        """
+        if (self.column_names, self.key_columns) != (
+            other.column_names,
+            other.key_columns,
+        ):
+            return None
+
+        other_rows = {key: i for i, key in enumerate(other.keys)}
+        self_matched = []
+        other_matched = []
+        positions = []
+        for i, key in enumerate(self.keys):
+            j = other_rows.pop(key, None)
+            if j is None:
+                positions.append((key, None))
+            else:
+                self_matched.append(i)
+                other_matched.append(j)
+        positions.extend((key, None) for key in other_rows)
+
+        for name in self.column_names:
+            if name in self.key_columns:
+                continue
+            mismatched = _mismatched_rows(
+                self.columns[name],
+                other.columns[name],
+                self_matched,
+                other_matched,
+                rtol,
+                atol,
+            )
+            positions.extend((self.keys[i], name) for i in mismatched)
+
+        positions.sort(key=lambda position: tuple(_sort_key(v) for v in position[0]))
+        return len(positions), positions[:MAX_POSITIONS]
+
+    def summary(self, mismatch: Optional[Tuple[int, List[POSITION]]] = None) -> str:
+        """
+        Compact one line description of the table for the diff.
+
+        :param mismatch: Count and positions of mismatches with the other table.  The
+            values of this table at those positions are included.
+        :return: Summary.
+        """
+        description = (
+            f"<ColumnTable rows={len(self)} columns={self.column_names}"
+            f" keys={self.key_columns}"
+        )
+        if mismatch and mismatch[0]:
+            count, positions = mismatch
+            rows = {key: i for i, key in enumerate(self.keys)}
+            shown = []
+            for key, name in positions:
+                row = rows.get(key)
+                label = ",".join(
+                    f"{k}={v!r}" for k, v in zip(self.key_columns, key)
+                )
+                if row is None:
+                    shown.append(f"[{label}]=<missing>")
+                elif name is None:
+                    shown.append(f"[{label}]=<row>")
+                else:
+                    value = self.columns[name][row]
+                    value = value.item() if hasattr(value, "item") else value
+                    shown.append(f"[{label}].{name}={value!r}")
+            description = f"{description} mismatches={count} {' '.join(shown)}"
+        return f"{description}>"
+
+
+def _mismatched_rows(
+    left: Any,
+    right: Any,
+    left_rows: List[int],
+    right_rows: List[int],
+    rtol: float,
+    atol: float,
+) -> List[int]:
+    """
+    Compare a column of two tables for the matched rows.
+
+    :return: Left row numbers that don't match.
+    """
+    numpy = loaded_numpy()
+    if numpy is not None and isinstance(left, numpy.ndarray):
+        if isinstance(right, numpy.ndarray):
+            left_values = left[left_rows]
+            right_values = right[right_rows]
+            if left_values.dtype.kind == "f" or right_values.dtype.kind == "f":
+                equal = numpy.isclose(
+                    left_values, right_values, rtol=rtol, atol=atol, equal_nan=True
+                )
+            else:
+                equal = left_values == right_values
+            return numpy.asarray(left_rows)[~equal].tolist()
+        left = left.tolist()
+    elif numpy is not None and isinstance(right, numpy.ndarray):
+        right = right.tolist()
+    return [
+        i
+        for i, j in zip(left_rows, right_rows)
+        if not _values_equal(left[i], right[j], rtol, atol)
+    ]
+
+
+def _values_equal(left: Any, right: Any, rtol: float, atol: float) -> bool:
+    """Compare two cells, with tolerance if they are floats."""
+    if left == right:
+        return True
+    numbers = all(
+        isinstance(value, (int, float)) and not isinstance(value, bool)
+        for value in (left, right)
+    )
+    if numbers and (isinstance(left, float) or isinstance(right, float)):
+        if math.isnan(left) and math.isnan(right):
+            return True
+        return math.isclose(left, right, rel_tol=rtol, abs_tol=atol)
+    return False
+
+
+class ColumnarPruner(BasePruner):
+    def __init__(
+        self, *, key_columns: Sequence[str], selectors: SELECTORS,
+    ):
+        """
+        Replace selected lists of records that all have the same scalar fields with
+        a ColumnTable.  The records aren't sorted or normalized.  Use the Differ's
+        array tolerances to compare float columns.  Lists that aren't records are
+        sorted as usual.
+
+        :param key_columns: Fields that identify a record.
+        :param selectors: Selectors to use to select which lists are converted.
+        """
+        self._key_columns = list(key_columns)
+        super().__init__(selectors)
+
+    def _prune(self, element: Any) -> Any:
+        if not isinstance(element, list) or not element:
+            raise NotPrunedError()
+
+        first = element[0]
+        if not isinstance(first, dict) or not set(self._key_columns) <= first.keys():
+            raise NotPrunedError()
+        fields = first.keys()
+        for record in element:
+            if not isinstance(record, dict) or record.keys() != fields:
+                raise NotPrunedError()
+            for value in record.values():
+                if type(value) not in BATCH_TYPES:
+                    raise NotPrunedError()
+        return ColumnTable(element, self._key_columns)
@@ -0,0 +1,242 @@
+"""
+Comparators decide if two leaf elements that aren't equal should still match,
+like floats within a tolerance.  Unlike Normalizers, which rewrite every selected
+leaf of both NDLs before they are compared, Comparators only run on the pairs of
+leaves that differ after the NDLs are sorted.  Comparators are applied to leaf
+elements using the Selectors associated with the Comparator and are chained so
+they are all tried until one applies.
+"""
+import datetime
+import math
+from abc import abstractmethod
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, List, Optional, Union
+
+from .buffers import is_buffer
+from .selector import BaseSelector, SELECTORS
+from .sorter import CompactList, SortedList, SortedMapping
+
+
+class NotComparedError(Exception):
+    """The comparator doesn't apply to the elements."""
+
+
+class BaseComparator:
+    """
+    Base comparator implements the chaining logic.
+    """
+
+    def __init__(
+        self, selectors: SELECTORS = None,
+    ):
+        """
+        Initialize the comparator with optional selectors.
+
+        :param selectors: Optional list of selector to use to select which
+            elements this comparator runs.
+        """
+        if selectors:
+            self._selectors = selectors if isinstance(selectors, list) else [selectors]
+        else:
+            # No selectors specified
+            self._selectors = None
+
+    @staticmethod
+    def compare(
+        left: Any,
+        right: Any,
+        path: Path,
+        comparators: Optional[List["BaseComparator"]] = None,
+    ) -> bool:
+        """
+        Run all the comparators until one applies to the leaf elements.
+
+        :param left: Element in the left (test) NDL.
+        :param right: Element in the right (expected) NDL.
+        :param path: Path to the elements.
+        :param comparators: Comparators to apply to the elements.
+        :return: True if the elements match.
+        """
+        if not comparators:
+            return False
+
+        for comparator in comparators:
+            if BaseSelector.match(path, comparator._selectors):
+                try:
+                    return comparator._compare(left, right)
+                except NotComparedError:
+                    continue
+        return False
+
+    @abstractmethod
+    def _compare(self, left: Any, right: Any) -> bool:
+        """
+        Prototype for the core comparator logic implemented in the subclass.
+
+        :param left: Element in the left (test) NDL.
+        :param right: Element in the right (expected) NDL.
+        :return: True if the elements match.
+        :raises NotComparedError: If the comparator doesn't apply to the elements.
+        """
+        pass  # pragma: no cover
+
+
+COMPARATORS = Optional[Union[BaseComparator, List[BaseComparator]]]
+
+
+def _is_container(element: Any) -> bool:
+    return isinstance(element, (Mapping, list, CompactList)) or is_buffer(element)
+
+
+def reconcile(
+    sorted_left: Any, sorted_right: Any, comparators: COMPARATORS, path: Path = Path()
+) -> Any:
+    """
+    Replace the leaves of the right NDL that the comparators match with the leaves
+    of the left NDL, so the matched leaves are equal when the NDLs are compared or
+    line diffed.  Equal branches are skipped with a single comparison and only the
+    mappings and lists above a replaced leaf are copied.
+
+    :param sorted_left: Sorted left (test) NDL.
+    :param sorted_right: Sorted right (expected) NDL.
+    :param comparators: Comparators to apply to the leaves that differ.
+    :param path: Path to the elements.
+    :return: Right NDL with the matched leaves replaced.
+    """
+    if not comparators:
+        return sorted_right
+    if not isinstance(comparators, list):
+        comparators = [comparators]
+    return _reconcile(sorted_left, sorted_right, comparators, path)
+
+
+def _reconcile(
+    left: Any, right: Any, comparators: List[BaseComparator], path: Path
+) -> Any:
+    if left is right or is_buffer(left) or is_buffer(right):
+        return right
+    try:
+        if left == right:
+            return right
+    except ValueError:
+        # Arrays compare elementwise so branches containing them are walked.
+        pass
+
+    if isinstance(left, Mapping) and isinstance(right, Mapping):
+        items = []
+        changed = False
+        for k, value in right.items():
+            if k in left:
+                reconciled = _reconcile(left[k], value, comparators, path / str(k))
+                changed = changed or reconciled is not value
+                value = reconciled
+            items.append((k, value))
+        return SortedMapping._from_sorted(items) if changed else right
+
+    if isinstance(left, (list, CompactList)) and isinstance(
+        right, (list, CompactList)
+    ):
+        values = []
+        changed = False
+        for i, value in enumerate(right):
+            if i < len(left):
+                reconciled = _reconcile(left[i], value, comparators, path / f"[{i}]")
+                changed = changed or reconciled is not value
+                value = reconciled
+            values.append(value)
+        return SortedList._from_sorted(values) if changed else right
+
+    if _is_container(left) or _is_container(right):
+        return right
+    if BaseComparator.compare(left, right, path, comparators):
+        return left
+    return right
+
+
+class FloatToleranceComparator(BaseComparator):
+    def __init__(
+        self,
+        rtol: float = 0.0,
+        atol: float = 0.0,
+        *,
+        selectors: SELECTORS = None,
+    ):
+        """
+        Match numbers that are within a relative or absolute tolerance like
+        math.isclose().  Unlike rounding, numbers on either side of a rounding
+        boundary like 1.05 and 1.0499 match.
+
+        :param rtol: Relative tolerance.
+        :param atol: Absolute tolerance.
+        :param selectors: Optional list of selector to use to select which
+            elements this comparator runs.
+        """
+        if rtol < 0 or atol < 0:
+            raise ValueError("Tolerances must be zero or positive.")
+        self._rtol = rtol
+        self._atol = atol
+        super().__init__(selectors)
+
+    def _compare(self, left: Any, right: Any) -> bool:
+        if not (_is_number(left) and _is_number(right)):
+            raise NotComparedError()
+        return math.isclose(left, right, rel_tol=self._rtol, abs_tol=self._atol)
+
+
+def _is_number(element: Any) -> bool:
+    return isinstance(element, (int, float)) and not isinstance(element, bool)
+
+
+def _is_iso_date(element: Any) -> bool:
+    if not isinstance(element, str):
+        return False
+    for type_ in (datetime.date, datetime.datetime):
+        try:
+            type_.fromisoformat(element)
+            return True
+        except ValueError:
+            pass
+    return False
+
+
+class IsoDateComparator(BaseComparator):
+    def __init__(
+        self, *, selectors: SELECTORS = None,
+    ):
+        """
+        Match any two strings that are valid ISO dates or datetimes.
+
+        :param selectors: Optional list of selector to use to select which
+            elements this comparator runs.
+        """
+        super().__init__(selectors)
+
+    def _compare(self, left: Any, right: Any) -> bool:
+        if not (_is_iso_date(left) and _is_iso_date(right)):
+            raise NotComparedError()
+        return True
+
+
+class PathSuffixComparator(BaseComparator):
+    def __init__(
+        self, *, num_components: int, selectors: SELECTORS = None,
+    ):
+        """
+        Match paths whose last N components are the same.
+
+        :param num_components: Number of last components to compare.
+        :param selectors: Optional list of selector to use to select which
+            elements this comparator runs.
+        """
+        self.num_components = num_components
+        super().__init__(selectors)
+
+    def _compare(self, left: Any, right: Any) -> bool:
+        if not (isinstance(left, str) and isinstance(right, str)):
+            raise NotComparedError()
+        return self._suffix(left) == self._suffix(right)
+
+    def _suffix(self, element: str) -> tuple:
+        parts = Path(element).parts
+        return parts[max(len(parts) - self.num_components, 0) :]
@@ -2,16 +2,42 @@
 Compare to nested dictionary/list objects.  diff() will return a unix diff like
 list of lines of the jsonified object to help locate the differences.
 """
-import json
-from difflib import HtmlDiff
+import copy
+import functools
+import re
+from concurrent.futures import Executor
+from difflib import IS_CHARACTER_JUNK, HtmlDiff, SequenceMatcher
+from itertools import islice
 from json import JSONEncoder
-from typing import List, Optional, Type
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
-from .formatter import Formatter
+from .budget import CONTEXT_LINES, DiffBudget, partial_marker
+from .buffers import is_buffer, summarize_buffers
+from .comparator import COMPARATORS, reconcile
+from .difference import Difference, differences, equal
+from .formatter import Formatter, Row
 from .list_sorter import LIST_SORTERS
 from .normalizer import NORMALIZERS
+from .pruner import PRUNERS
 from .sorter import Sorter, NDLElement
 
+if TYPE_CHECKING:  # pragma: no cover
+    from .cache import DiffCache
+    from .renderer import BaseRenderer
+    from .snapshot import Snapshot
+
 
 class DiffResult:
     """
@@ -19,9 +45,11 @@ class DiffResult:
     Provides supporting information for the match.
     """
 
-    def __init__(self, match: bool, support: List[str]):
+    def __init__(self, match: bool, support: List[str], partial: bool = False):
         self._match = match
         self.support = support
+        # True if a DiffBudget limit was hit and support only covers part of the diff.
+        self.partial = partial
 
     def __bool__(self) -> bool:
         return self._match
@@ -42,6 +70,14 @@ class Differ:
         sorters: LIST_SORTERS = None,
         normalizers: NORMALIZERS = None,
         max_col_width: Optional[int] = 20,
+        pruners: PRUNERS = None,
+        budget: Optional[DiffBudget] = None,
+        array_rtol: float = 0.0,
+        array_atol: float = 0.0,
+        section_depth: int = 0,
+        executor: Optional[Executor] = None,
+        comparators: COMPARATORS = None,
+        cache: Optional["DiffCache"] = None,
     ) -> DiffResult:
         """
         Show the difference of two objects.  Unix like diff results.
@@ -51,19 +87,879 @@ class Differ:
         :param sorters: Sorters for list elements.
         :param normalizers: Normalizers for leaf elements.
         :param max_col_width: Maximum column width of diff output.
+        :param pruners: Pruners for branches to drop or replace without diffing them.
+        :param budget: Time and size limits.  When a limit is hit the result is partial.
+        :param array_rtol: Relative tolerance for floats in NumPy array leaves.
+        :param array_atol: Absolute tolerance for floats in NumPy array leaves.
+        :param section_depth: Line diff each key of the mappings this many levels
+            deep on its own instead of line diffing the whole objects at once.
+            Not used with a budget.
+        :param executor: Thread or process pool to line diff the sections in.
+        :param comparators: Comparators for leaf elements that differ.
+        :param cache: Cache to return the stored result of a repeated diff from.
+            Not used with a budget or for objects with leaves that can't be pickled.
         :return: True if match.
         """
+        if cache is not None and budget is None:
+            key = cache.key(
+                left,
+                right,
+                [
+                    cls,
+                    sorters,
+                    normalizers,
+                    max_col_width,
+                    pruners,
+                    array_rtol,
+                    array_atol,
+                    section_depth,
+                    comparators,
+                ],
+            )
+            result = cache.get(key) if key is not None else None
+            if result is None:
+                result = Differ.diff(
+                    left,
+                    right,
+                    cls,
+                    sorters,
+                    normalizers,
+                    max_col_width,
+                    pruners,
+                    None,
+                    array_rtol,
+                    array_atol,
+                    section_depth,
+                    executor,
+                    comparators,
+                )
+                if key is not None:
+                    cache.put(key, result)
+            return result
         if normalizers:
             normalizers = (
                 normalizers if isinstance(normalizers, list) else [normalizers]
             )
-        sorted_left = Sorter.sorted(left, sorters=sorters, normalizers=normalizers)
-        sorted_right = Sorter.sorted(right, sorters=sorters, normalizers=normalizers)
-        differ = HtmlDiff()
+        if budget is not None:
+            return Differ._diff_budgeted(
+                left,
+                right,
+                cls,
+                sorters,
+                normalizers,
+                pruners,
+                max_col_width,
+                budget,
+                array_rtol,
+                array_atol,
+                comparators,
+            )
+        sorted_left = Sorter.sorted(
+            left, sorters=sorters, normalizers=normalizers, pruners=pruners
+        )
+        sorted_right = Sorter.sorted(
+            right, sorters=sorters, normalizers=normalizers, pruners=pruners
+        )
+        sorted_right = reconcile(sorted_left, sorted_right, comparators)
+        return Differ._diff_sorted(
+            sorted_left,
+            sorted_right,
+            cls,
+            max_col_width,
+            array_rtol,
+            array_atol,
+            section_depth,
+            executor,
+        )
+
+    @staticmethod
+    async def adiff(
+        left: NDLElement,
+        right: NDLElement,
+        cls: Optional[Type[JSONEncoder]] = None,
+        sorters: LIST_SORTERS = None,
+        normalizers: NORMALIZERS = None,
+        max_col_width: Optional[int] = 20,
+        pruners: PRUNERS = None,
+        budget: Optional[DiffBudget] = None,
+        array_rtol: float = 0.0,
+        array_atol: float = 0.0,
+        executor: Optional[Executor] = None,
+        comparators: COMPARATORS = None,
+    ) -> DiffResult:
+        """
+        Diff two objects in an executor so the event loop isn't blocked.  The result
+        is the same as diff().  When the coroutine is cancelled a diff running in a
+        thread stops at its next check, after sorting either object or during the
+        line diff.  A diff that has already started in a process runs to the end.
+        :param left: Test object
+        :param right: Expected object
+        :param cls: JSON Encoder if any fields aren't JSON encodable.
+        :param sorters: Sorters for list elements.
+        :param normalizers: Normalizers for leaf elements.
+        :param max_col_width: Maximum column width of diff output.
+        :param pruners: Pruners for branches to drop or replace without diffing them.
+        :param budget: Time and size limits.  It is copied for each diff.
+        :param array_rtol: Relative tolerance for floats in NumPy array leaves.
+        :param array_atol: Absolute tolerance for floats in NumPy array leaves.
+        :param executor: Thread or process pool.  None for the loop's default.
+        :param comparators: Comparators for leaf elements that differ.
+        :return: True if match.
+        """
+        import asyncio
+
+        if budget is not None:
+            budget = copy.copy(budget)
+            cancel = budget.cancel
+            call = functools.partial(
+                Differ.diff,
+                left,
+                right,
+                cls,
+                sorters,
+                normalizers,
+                max_col_width,
+                pruners,
+                budget,
+                array_rtol,
+                array_atol,
+                comparators=comparators,
+            )
+        else:
+            token = _CancelToken()
+            cancel = token.cancel
+            call = functools.partial(
+                Differ._diff_stoppable,
+                left,
+                right,
+                token,
+                cls,
+                sorters,
+                normalizers,
+                max_col_width,
+                pruners,
+                array_rtol,
+                array_atol,
+                comparators,
+            )
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, call)
+        except asyncio.CancelledError:
+            cancel()
+            raise
 
-        result = differ.make_file(
-            json.dumps(sorted_left, indent=2, cls=cls).split("\n"),
-            json.dumps(sorted_right, indent=2, cls=cls).split("\n"),
+    @staticmethod
+    def _diff_stoppable(
+        left: NDLElement,
+        right: NDLElement,
+        stop: Callable[[], bool],
+        cls: Optional[Type[JSONEncoder]],
+        sorters: LIST_SORTERS,
+        normalizers: NORMALIZERS,
+        max_col_width: Optional[int],
+        pruners: PRUNERS,
+        array_rtol: float,
+        array_atol: float,
+        comparators: COMPARATORS,
+    ) -> DiffResult:
+        """
+        Diff two objects like diff() without a budget, but stop once stop() returns
+        True.  It is checked after sorting each object and during the line diff.
+
+        :raises _DiffStopped: If stop() returned True.
+        """
+        if normalizers:
+            normalizers = (
+                normalizers if isinstance(normalizers, list) else [normalizers]
+            )
+        sorted_left = Sorter.sorted(
+            left, sorters=sorters, normalizers=normalizers, pruners=pruners
         )
-        match, support = Formatter(max_col_width=max_col_width).format(result)
-        return DiffResult(match, support)
+        if stop():
+            raise _DiffStopped()
+        sorted_right = Sorter.sorted(
+            right, sorters=sorters, normalizers=normalizers, pruners=pruners
+        )
+        if stop():
+            raise _DiffStopped()
+        sorted_right = reconcile(sorted_left, sorted_right, comparators)
+        left_lines, right_lines = Differ._jsonified(
+            sorted_left, sorted_right, cls, array_rtol, array_atol
+        )
+        return DiffResult(
+            *_render_section(left_lines, right_lines, max_col_width, stop)
+        )
+
+    @staticmethod
+    async def adiff_many(
+        pairs: Iterable[Tuple[NDLElement, NDLElement]],
+        *,
+        limit: int = 4,
+        ordered: bool = True,
+        **kwargs,
+    ) -> AsyncIterator[Tuple[int, DiffResult]]:
+        """
+        Diff many pairs of objects with at most limit diffs running at a time.
+        Results are yielded as (index of the pair, result), in the order of the pairs
+        or as soon as each diff completes.  Diffs that haven't been yielded are
+        cancelled if the iteration stops early.
+        :param pairs: (test object, expected object) pairs.
+        :param limit: Maximum number of diffs running at a time.
+        :param ordered: Yield the results in the order of the pairs.  Otherwise
+            yield them as they complete.
+        :param kwargs: Arguments for adiff().
+        :return: Async iterator of (index, result).
+        """
+        import asyncio
+
+        semaphore = asyncio.Semaphore(limit)
+
+        async def run(index: int, left: Any, right: Any) -> Tuple[int, DiffResult]:
+            async with semaphore:
+                return index, await Differ.adiff(left, right, **kwargs)
+
+        tasks = [
+            asyncio.ensure_future(run(index, left, right))
+            for index, (left, right) in enumerate(pairs)
+        ]
+        try:
+            if ordered:
+                for task in tasks:
+                    yield await task
+            else:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def diff_json(
+        raw_left: Union[str, bytes, bytearray],
+        raw_right: Union[str, bytes, bytearray],
+        cls: Optional[Type[JSONEncoder]] = None,
+        sorters: LIST_SORTERS = None,
+        normalizers: NORMALIZERS = None,
+        max_col_width: Optional[int] = 20,
+        pruners: PRUNERS = None,
+        comparators: COMPARATORS = None,
+    ) -> DiffResult:
+        """
+        Show the difference of two JSON documents.  The documents are sorted as they
+        are parsed with Sorter.loads() rather than parsed and then sorted.
+        :param raw_left: Test JSON document.
+        :param raw_right: Expected JSON document.
+        :param cls: JSON Encoder if any normalized fields aren't JSON encodable.
+        :param sorters: Sorters for list elements.
+        :param normalizers: Normalizers for leaf elements.
+        :param max_col_width: Maximum column width of diff output.
+        :param pruners: Pruners for branches to drop or replace without diffing them.
+        :param comparators: Comparators for leaf elements that differ.
+        :return: True if match.
+        """
+        sorted_left = Sorter.loads(
+            raw_left, sorters=sorters, normalizers=normalizers, pruners=pruners
+        )
+        sorted_right = Sorter.loads(
+            raw_right, sorters=sorters, normalizers=normalizers, pruners=pruners
+        )
+        sorted_right = reconcile(sorted_left, sorted_right, comparators)
+        return Differ._diff_sorted(sorted_left, sorted_right, cls, max_col_width)
+
+    @staticmethod
+    def diff_snapshot(
+        left: NDLElement,
+        snapshot: "Snapshot",
+        cls: Optional[Type[JSONEncoder]] = None,
+        sorters: LIST_SORTERS = None,
+        normalizers: NORMALIZERS = None,
+        max_col_width: Optional[int] = 20,
+        pruners: PRUNERS = None,
+        comparators: COMPARATORS = None,
+    ) -> DiffResult:
+        """
+        Show the difference of an object and a snapshot of the expected object.
+        The elements of the snapshot are compared by fingerprint and only the
+        elements that differ are read from the snapshot.
+        :param left: Test object
+        :param snapshot: Snapshot written with the same sorters, normalizers and
+            pruners.
+        :param cls: JSON Encoder if any fields aren't JSON encodable.
+        :param sorters: Sorters for list elements.
+        :param normalizers: Normalizers for leaf elements.
+        :param max_col_width: Maximum column width of diff output.
+        :param pruners: Pruners for branches to drop or replace without diffing them.
+        :param comparators: Comparators for leaf elements that differ.
+        :return: True if match.
+        """
+        sorted_left = Sorter.sorted(
+            left, sorters=sorters, normalizers=normalizers, pruners=pruners
+        )
+        sorted_right = snapshot.rebuild(sorted_left)
+        sorted_right = reconcile(sorted_left, sorted_right, comparators)
+        return Differ._diff_sorted(sorted_left, sorted_right, cls, max_col_width)
+
+    @staticmethod
+    def render(
+        left: NDLElement,
+        right: NDLElement,
+        renderer: "BaseRenderer",
+        cls: Optional[Type[JSONEncoder]] = None,
+        sorters: LIST_SORTERS = None,
+        normalizers: NORMALIZERS = None,
+        pruners: PRUNERS = None,
+        array_rtol: float = 0.0,
+        array_atol: float = 0.0,
+        comparators: COMPARATORS = None,
+    ) -> bool:
+        """
+        Write the difference of two objects to the renderer's stream as it is made
+        instead of collecting it in the support of a DiffResult.
+        :param left: Test object
+        :param right: Expected object
+        :param renderer: Renderer like AnsiRenderer(sys.stdout).
+        :param cls: JSON Encoder if any fields aren't JSON encodable.
+        :param sorters: Sorters for list elements.
+        :param normalizers: Normalizers for leaf elements.
+        :param pruners: Pruners for branches to drop or replace without diffing them.
+        :param array_rtol: Relative tolerance for floats in NumPy array leaves.
+        :param array_atol: Absolute tolerance for floats in NumPy array leaves.
+        :param comparators: Comparators for leaf elements that differ.
+        :return: True if match.
+        """
+        sorted_left = Sorter.sorted(
+            left, sorters=sorters, normalizers=normalizers, pruners=pruners
+        )
+        sorted_right = Sorter.sorted(
+            right, sorters=sorters, normalizers=normalizers, pruners=pruners
+        )
+        sorted_right = reconcile(sorted_left, sorted_right, comparators)
+        left_lines, right_lines = Differ._jsonified(
+            sorted_left, sorted_right, cls, array_rtol, array_atol
+        )
+        renderer.render(left_lines, right_lines)
+        return left_lines == right_lines
+
+    @staticmethod
+    def first_differences(
+        left: NDLElement,
+        right: NDLElement,
+        k: Optional[int] = 20,
+        sorters: LIST_SORTERS = None,
+        normalizers: NORMALIZERS = None,
+        pruners: PRUNERS = None,
+        comparators: COMPARATORS = None,
+    ) -> List[Difference]:
+        """
+        Find the first differences between two objects by path.  The sorted objects
+        are walked together and the walk stops after k differences, so nothing is
+        jsonified or line diffed.
+        :param left: Test object
+        :param right: Expected object
+        :param k: Maximum number of differences to return.  None for all of them.
+        :param sorters: Sorters for list elements.
+        :param normalizers: Normalizers for leaf elements.
+        :param pruners: Pruners for branches to drop or replace without diffing them.
+        :param comparators: Comparators for leaf elements that differ.
+        :return: Differences in path order.  Empty if match.
+        """
+        sorted_left = Sorter.sorted(
+            left, sorters=sorters, normalizers=normalizers, pruners=pruners
+        )
+        sorted_right = Sorter.sorted(
+            right, sorters=sorters, normalizers=normalizers, pruners=pruners
+        )
+        sorted_right = reconcile(sorted_left, sorted_right, comparators)
+        return list(islice(differences(sorted_left, sorted_right), k))
+
+    @staticmethod
+    def _diff_sorted(
+        sorted_left: Any,
+        sorted_right: Any,
+        cls: Optional[Type[JSONEncoder]],
+        max_col_width: Optional[int],
+        array_rtol: float = 0.0,
+        array_atol: float = 0.0,
+        section_depth: int = 0,
+        executor: Optional[Executor] = None,
+    ) -> DiffResult:
+        """
+        Line diff two objects that have already been sorted and normalized.
+        :param sorted_left: Sorted test object.
+        :param sorted_right: Sorted expected object.
+        :param cls: JSON Encoder if any fields aren't JSON encodable.
+        :param max_col_width: Maximum column width of diff output.
+        :param array_rtol: Relative tolerance for floats in NumPy array leaves.
+        :param array_atol: Absolute tolerance for floats in NumPy array leaves.
+        :param section_depth: Depth of the mapping keys to line diff on their own.
+        :param executor: Optional pool to line diff the sections in.
+        :return: True if match.
+        """
+        left_lines, right_lines = Differ._jsonified(
+            sorted_left, sorted_right, cls, array_rtol, array_atol
+        )
+        if section_depth <= 0:
+            return DiffResult(*_render_section(left_lines, right_lines, max_col_width))
+
+        sections = _sections(left_lines, right_lines, section_depth, 0)
+        widths = [max_col_width] * len(sections)
+        if executor is None:
+            rendered = map(_render_section, *zip(*sections), widths)
+        else:
+            rendered = executor.map(_render_section, *zip(*sections), widths)
+        match = True
+        rows = []
+        for section_match, support in rendered:
+            match = match and section_match
+            rows.append(support)
+        return DiffResult(match, "\n".join(rows))
+
+    @staticmethod
+    def _jsonified(
+        sorted_left: Any,
+        sorted_right: Any,
+        cls: Optional[Type[JSONEncoder]],
+        array_rtol: float = 0.0,
+        array_atol: float = 0.0,
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Jsonify two sorted objects into lines.  NumPy array and bytes-like leaves
+        are compared and replaced with summaries, but only if there are any.
+        :param sorted_left: Sorted test object.
+        :param sorted_right: Sorted expected object.
+        :param cls: JSON Encoder if any fields aren't JSON encodable.
+        :param array_rtol: Relative tolerance for floats in NumPy array leaves.
+        :param array_atol: Absolute tolerance for floats in NumPy array leaves.
+        :return: Left and right lines.
+        """
+        buffers_found = []
+
+        def dumps(data: Any) -> List[str]:
+            encoder = (cls or JSONEncoder)(indent=2)
+            encoder_default = encoder.default
+
+            def default(o: Any) -> Any:
+                if is_buffer(o):
+                    buffers_found.append(o)
+                    return None
+                return encoder_default(o)
+
+            encoder.default = default
+            try:
+                return encoder.encode(data).split("\n")
+            except RecursionError:
+                return _encode_lines(data, encoder)
+
+        left_lines = dumps(sorted_left)
+        right_lines = dumps(sorted_right)
+        if buffers_found:
+            sorted_left, sorted_right = summarize_buffers(
+                sorted_left, sorted_right, array_rtol, array_atol
+            )
+            left_lines = dumps(sorted_left)
+            right_lines = dumps(sorted_right)
+        return left_lines, right_lines
+
+    @staticmethod
+    def _diff_budgeted(
+        left: NDLElement,
+        right: NDLElement,
+        cls: Optional[Type[JSONEncoder]],
+        sorters: LIST_SORTERS,
+        normalizers: NORMALIZERS,
+        pruners: PRUNERS,
+        max_col_width: Optional[int],
+        budget: DiffBudget,
+        array_rtol: float = 0.0,
+        array_atol: float = 0.0,
+        comparators: COMPARATORS = None,
+    ) -> DiffResult:
+        """
+        Diff two objects within the limits of the budget.  If the objects can't be
+        sorted within the budget the match is only reported if the unsorted objects
+        are equal.  Once they are sorted the match is always known and only the
+        support is limited.  The support only covers the changed region of the
+        jsonified objects and a few lines of context around it.
+        """
+        budget.start()
+        reason = None
+        if budget.too_many_nodes(left) or budget.too_many_nodes(right):
+            reason = f"more than {budget.max_nodes} nodes"
+        else:
+            sorted_left = Sorter.sorted(
+                left, sorters=sorters, normalizers=normalizers, pruners=pruners
+            )
+            if budget.expired():
+                reason = f"{budget.max_seconds}s time limit hit while sorting"
+            else:
+                sorted_right = Sorter.sorted(
+                    right, sorters=sorters, normalizers=normalizers, pruners=pruners
+                )
+        if reason:
+            # Equal unsorted objects are still equal after sorting.
+            match = equal(left, right)
+            verdict = "match" if match else "match undetermined, reported as mismatch"
+            return DiffResult(match, partial_marker(f"{reason}; {verdict}"), True)
+
+        sorted_right = reconcile(sorted_left, sorted_right, comparators)
+        left_lines, right_lines = Differ._jsonified(
+            sorted_left, sorted_right, cls, array_rtol, array_atol
+        )
+        match = left_lines == right_lines
+
+        # Only the changed region, plus a little context, needs to be line diffed.
+        prefix = 0
+        for left_line, right_line in zip(left_lines, right_lines):
+            if left_line != right_line:
+                break
+            prefix += 1
+        suffix = 0
+        max_suffix = min(len(left_lines), len(right_lines)) - prefix
+        while (
+            suffix < max_suffix and left_lines[-1 - suffix] == right_lines[-1 - suffix]
+        ):
+            suffix += 1
+        start = max(0, prefix - CONTEXT_LINES)
+        suffix = max(0, suffix - CONTEXT_LINES)
+        left_lines = left_lines[start : len(left_lines) - suffix]
+        right_lines = right_lines[start : len(right_lines) - suffix]
+
+        notes = []
+        num_lines = max(len(left_lines), len(right_lines))
+        if budget.max_lines is not None and num_lines > budget.max_lines:
+            notes.append(
+                f"{budget.max_lines} of {num_lines} changed lines from line {start + 1}"
+            )
+            left_lines = left_lines[: budget.max_lines]
+            right_lines = right_lines[: budget.max_lines]
+            num_lines = budget.max_lines
+
+        rows = []
+        left_start = right_start = 0
+        for left_end, right_end in _chunk_ends(
+            left_lines, right_lines, budget.chunk_lines
+        ):
+            try:
+                result = _line_diff(
+                    left_lines[left_start:left_end],
+                    right_lines[right_start:right_end],
+                    budget.expired,
+                )
+            except _DiffStopped:
+                notes.append(
+                    f"{budget.max_seconds}s time limit hit after {left_start} lines"
+                )
+                break
+            left_start, right_start = left_end, right_end
+            _, support = Formatter(max_col_width=max_col_width).format(result)
+            rows.extend(support.split("\n"))
+            if budget.max_rows is not None and len(rows) > budget.max_rows:
+                notes.append(f"first {budget.max_rows} rows")
+                rows = rows[: budget.max_rows]
+                break
+            if budget.expired() and left_end < len(left_lines):
+                notes.append(
+                    f"{budget.max_seconds}s time limit hit after {left_end} lines"
+                )
+                break
+
+        if notes:
+            rows.insert(0, partial_marker("; ".join(notes)))
+        return DiffResult(match, "\n".join(rows), bool(notes))
+
+
+def _chunk_ends(
+    left_lines: List[str], right_lines: List[str], chunk_lines: int
+) -> List[Tuple[int, int]]:
+    """
+    Split two sequences of lines into chunks of about chunk_lines lines that can be
+    line diffed one at a time.  The chunks are cut at lines that one matcher pass
+    over all the lines found equal, so an insertion doesn't shift the lines of the
+    following chunks out of step.  Regions where nothing was found equal, like
+    those of many repeated lines, are cut every chunk_lines lines on each side.
+
+    :param left_lines: Left lines.
+    :param right_lines: Right lines.
+    :param chunk_lines: Maximum lines on either side of a chunk.
+    :return: (left end, right end) of each chunk.
+    """
+    chunk_lines = max(chunk_lines, 1)
+    ends = []
+    left_start = right_start = 0
+    matcher = SequenceMatcher(None, left_lines, right_lines)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            while max(i2 - left_start, j2 - right_start) > chunk_lines:
+                left_start = min(left_start + chunk_lines, i2)
+                right_start = min(right_start + chunk_lines, j2)
+                ends.append((left_start, right_start))
+            continue
+        i = i1
+        while True:
+            longest = max(i - left_start, j1 + i - i1 - right_start)
+            cut = i + max(chunk_lines - longest, 0)
+            if cut > i2:
+                break
+            left_start, right_start = cut, j1 + cut - i1
+            ends.append((left_start, right_start))
+            i = cut
+    if (left_start, right_start) != (len(left_lines), len(right_lines)) or not ends:
+        ends.append((len(left_lines), len(right_lines)))
+    return ends
+
+
+class _DiffStopped(Exception):
+    """Raised to stop a diff that is no longer needed."""
+
+
+class _CancelToken:
+    """
+    Cancels a diff running in a thread.  A diff sent to a process gets a copy of
+    the token, which is never cancelled.
+    """
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def __call__(self) -> bool:
+        return self.cancelled
+
+
+def _line_diff(
+    left_lines: List[str], right_lines: List[str], stop: Callable[[], bool]
+) -> str:
+    """
+    HtmlDiff two sequences of lines, checking stop() as it goes.  One line diff of
+    many similar lines can take minutes, so waiting for it to end isn't enough.
+    stop() is checked each time a changed line is compared with the lines it may
+    be a change of, through the character junk test.
+
+    :param left_lines: Left lines.
+    :param right_lines: Right lines.
+    :param stop: Returns True when the diff should stop.
+    :return: HtmlDiff file.
+    :raises _DiffStopped: If stop() returned True.
+    """
+
+    def charjunk(ch: str) -> bool:
+        if stop():
+            raise _DiffStopped()
+        return IS_CHARACTER_JUNK(ch)
+
+    return HtmlDiff(charjunk=charjunk).make_file(left_lines, right_lines)
+
+
+def _encode_lines(data: Any, encoder: JSONEncoder) -> List[str]:
+    """
+    Encode an object into the same lines as encoder.encode() but with an explicit
+    stack instead of recursion, so there is no limit on the depth.
+
+    :param data: Object to encode.
+    :param encoder: Encoder with the options and default().
+    :return: Lines.
+    """
+    indent = encoder.indent
+    if indent is not None and not isinstance(indent, str):
+        indent = " " * indent
+    encode_str = encode_basestring_ascii if encoder.ensure_ascii else encode_basestring
+
+    def encode_float(o: float) -> str:
+        if o != o:
+            text = "NaN"
+        elif o == float("inf"):
+            text = "Infinity"
+        elif o == -float("inf"):
+            text = "-Infinity"
+        else:
+            return float.__repr__(o)
+        if not encoder.allow_nan:
+            raise ValueError(f"Out of range float values are not JSON compliant: {o}")
+        return text
+
+    def encode_key(key: Any) -> Optional[str]:
+        if isinstance(key, str):
+            return encode_str(key)
+        if isinstance(key, float):
+            return encode_str(encode_float(key))
+        if key is True or key is False or key is None:
+            return encode_str(encode_leaf(key))
+        if isinstance(key, int):
+            return encode_str(int.__repr__(key))
+        if encoder.skipkeys:
+            return None
+        raise TypeError(
+            f"keys must be str, int, float, bool or None, not {type(key).__name__}"
+        )
+
+    def encode_leaf(o: Any) -> Optional[str]:
+        if isinstance(o, str):
+            return encode_str(o)
+        if o is None:
+            return "null"
+        if o is True:
+            return "true"
+        if o is False:
+            return "false"
+        if isinstance(o, int):
+            return int.__repr__(o)
+        if isinstance(o, float):
+            return encode_float(o)
+        return None
+
+    chunks: List[str] = []
+    # [container id, closing bracket, depth, iterator, is a dict, items written]
+    stack: List[List] = []
+    open_ids = set()
+
+    def start(o: Any) -> None:
+        while True:
+            text = encode_leaf(o)
+            if text is not None:
+                chunks.append(text)
+                return
+            if isinstance(o, (list, tuple, dict)):
+                break
+            o = encoder.default(o)
+        is_dict = isinstance(o, dict)
+        if not o:
+            chunks.append("{}" if is_dict else "[]")
+            return
+        if encoder.check_circular:
+            if id(o) in open_ids:
+                raise ValueError("Circular reference detected")
+            open_ids.add(id(o))
+        if not is_dict:
+            items = iter(o)
+        elif encoder.sort_keys:
+            items = iter(sorted(o.items()))
+        else:
+            items = iter(o.items())
+        chunks.append("{" if is_dict else "[")
+        close = "}" if is_dict else "]"
+        stack.append([id(o), close, len(stack) + 1, items, is_dict, 0])
+
+    start(data)
+    while stack:
+        entry = stack[-1]
+        container_id, close, depth, items, is_dict, written = entry
+        item = next(items, stack)
+        if item is stack:
+            stack.pop()
+            open_ids.discard(container_id)
+            if indent is not None:
+                chunks.append("\n" + indent * (depth - 1))
+            chunks.append(close)
+            continue
+        if is_dict:
+            key = encode_key(item[0])
+            if key is None:
+                continue
+        separator = encoder.item_separator if written else ""
+        entry[5] = written + 1
+        chunks.append(separator)
+        if indent is not None:
+            chunks.append("\n" + indent * depth)
+        if is_dict:
+            chunks.append(key + encoder.key_separator)
+            start(item[1])
+        else:
+            start(item)
+    return "".join(chunks).split("\n")
+
+
+def _render_section(
+    left_lines: List[str],
+    right_lines: List[str],
+    max_col_width: Optional[int],
+    stop: Optional[Callable[[], bool]] = None,
+) -> Tuple[bool, str]:
+    """
+    Line diff and format one section.  Equal sections are formatted directly.
+    Runs in the executor for sectioned diffs.
+
+    :param stop: Returns True when the line diff should stop, see _line_diff().
+    :return: Match and rows.
+    """
+    if left_lines == right_lines:
+        rows = []
+        for line in left_lines:
+            row = Row(max_col_width)
+            for column in (None, None, line, None, None, line):
+                row.add(column)
+            rows.append(row.finalize())
+        return True, "\n".join(rows)
+    if stop is None:
+        result = HtmlDiff().make_file(left_lines, right_lines)
+    else:
+        result = _line_diff(left_lines, right_lines, stop)
+    return Formatter(max_col_width=max_col_width).format(result)
+
+
+def _sections(
+    left_lines: List[str], right_lines: List[str], depth: int, indent: int
+) -> List[Tuple[List[str], List[str]]]:
+    """
+    Split the jsonified lines of a value on each side into matching sections.  If
+    the value is a mapping on both sides, the lines of each key with the same key
+    on the other side are a section, split again to the depth.  Keys on only one
+    side are grouped with their neighbours that don't match either.
+
+    :param left_lines: Lines of the left value.
+    :param right_lines: Lines of the right value.
+    :param depth: Levels of mapping keys left to split on.
+    :param indent: Indent of the value's first line.
+    :return: (left lines, right lines) of each section in order.
+    """
+    if not (
+        depth > 0
+        and len(left_lines) > 2
+        and len(right_lines) > 2
+        and left_lines[0].endswith("{")
+        and right_lines[0].endswith("{")
+    ):
+        return [(left_lines, right_lines)]
+
+    left_keys, left_values = _split_keys(left_lines[1:-1], indent + 2)
+    right_keys, right_values = _split_keys(right_lines[1:-1], indent + 2)
+    sections = [([left_lines[0]], [right_lines[0]])]
+    matcher = SequenceMatcher(None, left_keys, right_keys, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            pairs = zip(left_values[i1:i2], right_values[j1:j2])
+            for left_value, right_value in pairs:
+                sections.extend(
+                    _sections(left_value, right_value, depth - 1, indent + 2)
+                )
+        else:
+            sections.append(
+                (
+                    [line for value in left_values[i1:i2] for line in value],
+                    [line for value in right_values[j1:j2] for line in value],
+                )
+            )
+    sections.append(([left_lines[-1]], [right_lines[-1]]))
+    return sections
+
+
+def _split_keys(lines: List[str], indent: int) -> Tuple[List[str], List[List[str]]]:
+    """
+    Split the lines inside the braces of a jsonified mapping into its keys.
+
+    :param lines: Lines between the braces.
+    :param indent: Indent of the key lines.
+    :return: Keys and the lines of each key's value.
+    """
+    key_line = re.compile(" " * indent + r'("(?:[^"\\]|\\.)*"): ')
+    keys = []
+    values = []
+    for line in lines:
+        match = key_line.match(line)
+        if match is not None:
+            keys.append(match.group(1))
+            values.append([line])
+        else:
+            values[-1].append(line)
+    return keys, values
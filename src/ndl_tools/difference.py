@@ -0,0 +1,224 @@
+"""
+Structural differences between two sorted NDLs.  Rather than jsonifying the
+NDLs and diffing the lines, the sorted dicts and lists are walked together and
+each leaf or branch that differs is reported with its path.
+"""
+import math
+from difflib import SequenceMatcher
+from json import JSONEncoder
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .buffers import buffers_equal, is_buffer
+from .sorter import CompactList
+
+
+class _Missing:
+    """Marker for an element that is only on one side."""
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+_ENCODER = JSONEncoder()
+
+
+class Difference:
+    """
+    One element that differs between the left and right NDL.
+    """
+
+    def __init__(
+        self, path: Path, left: Any, right: Any, keys: Optional[Tuple] = None
+    ):
+        """
+        :param path: Path to the element.
+        :param left: Element in the left (test) NDL or MISSING.
+        :param right: Element in the right (expected) NDL or MISSING.
+        :param keys: Mapping keys and list indexes to the element, unlike the path
+            not converted to strings.  A list index is the element's position when
+            the differences before it have been applied to the left NDL in order,
+            so the keys can be used for JSON patch paths.
+        """
+        self.path = path
+        self.left = left
+        self.right = right
+        self.keys = keys
+
+    @property
+    def kind(self) -> str:
+        """'added' if only in right, 'removed' if only in left, otherwise 'changed'."""
+        if self.left is MISSING:
+            return "added"
+        if self.right is MISSING:
+            return "removed"
+        return "changed"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Difference) and (
+            (self.path, self.left, self.right) == (other.path, other.left, other.right)
+        )
+
+    def __repr__(self) -> str:
+        return f"Difference({str(self.path)!r}, {self.left!r}, {self.right!r})"
+
+
+def differences(left: Any, right: Any, path: Path = Path()) -> Iterator[Difference]:
+    """
+    Walk two sorted NDLs together and yield the differences in path order.  Equal
+    branches are skipped without walking them.  Leaves are compared the way they
+    are jsonified for Differ.diff(), so 1, 1.0 and True differ, 0.0 and -0.0 differ
+    and NaN equals NaN.  The elements of lists are aligned first, so an inserted or
+    removed element is one difference instead of a change at every following
+    index.  This is a generator, so stopping early stops the walk.
+
+    :param left: Sorted left NDL.
+    :param right: Sorted right NDL.
+    :param path: Path to the elements.
+    :return: Iterator of differences.
+    """
+    fingerprints: Dict[int, bytes] = {}
+    stack = [(path, (), left, right)]
+    while stack:
+        path, keys, left, right = stack.pop()
+        if is_buffer(left) or is_buffer(right):
+            both = is_buffer(left) and is_buffer(right)
+            if not (both and buffers_equal(left, right)):
+                yield Difference(path, left, right, keys)
+            continue
+        if left is right:
+            continue
+
+        if isinstance(left, Mapping) and isinstance(right, Mapping):
+            if _same_branch(left, right):
+                continue
+            children = [
+                (
+                    path / str(k),
+                    keys + (k,),
+                    left.get(k, MISSING),
+                    right.get(k, MISSING),
+                )
+                for k in _union_keys(left, right)
+            ]
+        elif isinstance(left, (list, CompactList)) and isinstance(
+            right, (list, CompactList)
+        ):
+            if _same_branch(left, right):
+                continue
+            children = _aligned(path, keys, left, right, fingerprints)
+        else:
+            if not _same_leaf(left, right):
+                yield Difference(path, left, right, keys)
+            continue
+        stack.extend(reversed(children))
+
+
+def _union_keys(left: Mapping, right: Mapping) -> List:
+    """
+    Keys of either mapping, sorted.  Keys of mixed types that can't be sorted,
+    which only unsorted mappings can have, are in the order of the mappings.
+    """
+    try:
+        return sorted(set(left.keys()) | set(right.keys()))
+    except TypeError:
+        return list(left.keys()) + [k for k in right.keys() if k not in left]
+
+
+def _same_branch(left: Any, right: Any) -> bool:
+    """
+    True if two mappings or lists are jsonified the same.  == finds most branches
+    that differ quickly, but finds 1, 1.0 and True equal, so branches that are ==
+    are compared as JSON too.  Branches that aren't ==, like those with NaN, or
+    that can't be jsonified are walked.
+    """
+    try:
+        return bool(left == right) and _ENCODER.encode(left) == _ENCODER.encode(right)
+    except (TypeError, ValueError, RecursionError):
+        return False
+
+
+def _same_leaf(left: Any, right: Any) -> bool:
+    """
+    True if two leaves are jsonified the same.  == alone finds 1, 1.0 and True
+    equal, and 0.0 and -0.0, but not NaN and NaN.
+    """
+    if isinstance(left, float) or isinstance(right, float):
+        if not (isinstance(left, float) and isinstance(right, float)):
+            return False
+        if math.isnan(left) or math.isnan(right):
+            return math.isnan(left) and math.isnan(right)
+        return left == right and math.copysign(1.0, left) == math.copysign(1.0, right)
+    if isinstance(left, bool) or isinstance(right, bool):
+        return left is right
+    try:
+        return bool(left == right)
+    except ValueError:
+        return False
+
+
+def _aligned(
+    path: Path,
+    keys: Tuple,
+    left: Sequence,
+    right: Sequence,
+    fingerprints: Dict[int, bytes],
+) -> List[Tuple[Path, Tuple, Any, Any]]:
+    """
+    Pair up the elements of two lists by matching their fingerprints.  Runs of
+    elements that don't match are paired by position and the rest are added or
+    removed.  Removed and changed elements have the path of their index on the
+    left, added elements the path of their index on the right.  The keys have the
+    index on the right, where a removed element is once the elements before it
+    have been patched.
+
+    :param path: Path to the lists.
+    :param keys: Keys to the lists.
+    :param left: Left list.
+    :param right: Right list.
+    :param fingerprints: Fingerprints of the containers already seen by id.
+    :return: (path, keys, left element, right element) for each pair.
+    """
+    from .snapshot import fingerprint
+
+    try:
+        left_keys = [fingerprint(v, fingerprints) for v in left]
+        right_keys = [fingerprint(v, fingerprints) for v in right]
+        opcodes = SequenceMatcher(
+            None, left_keys, right_keys, autojunk=False
+        ).get_opcodes()
+    except TypeError:
+        # A leaf that can't be fingerprinted, pair the elements by position.
+        opcodes = [("replace", 0, len(left), 0, len(right))]
+
+    children = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        paired = min(i2 - i1, j2 - j1) if tag != "delete" else 0
+        for i, j in zip(range(i1, i1 + paired), range(j1, j1 + paired)):
+            children.append((path / f"[{i}]", keys + (j,), left[i], right[j]))
+        for i in range(i1 + paired, i2):
+            children.append((path / f"[{i}]", keys + (j1 + paired,), left[i], MISSING))
+        for j in range(j1 + paired, j2):
+            children.append((path / f"[{j}]", keys + (j,), MISSING, right[j]))
+    return children
+
+
+def equal(left: Any, right: Any) -> bool:
+    """
+    True if two NDLs are equal the way differences() compares them.  NDLs that
+    aren't == are taken to differ without walking them, so NDLs only equal because
+    NaN equals NaN are reported as different.
+
+    :param left: Left NDL.
+    :param right: Right NDL.
+    :return: True if equal.
+    """
+    try:
+        if not left == right:
+            return False
+    except (ValueError, RecursionError):
+        # Arrays compare elementwise and == recurses too deep on deep NDLs.
+        pass
+    return next(differences(left, right), None) is None
@@ -0,0 +1,313 @@
+"""
+Diff a directory of golden JSON documents against a directory of fresh outputs.
+An index file remembers the size, mtime, content hash and canonical fingerprint
+of every file that has been read.  A file that hasn't changed since the last run
+isn't read again, a file whose content hash hasn't changed isn't sorted again, and
+only the pairs whose canonical fingerprints differ are diffed, in a process pool.
+"""
+import functools
+import hashlib
+import json
+import os
+import types
+from concurrent.futures import ProcessPoolExecutor
+from json import JSONEncoder
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from .differ import DiffResult, Differ
+from .list_sorter import LIST_SORTERS
+from .normalizer import NORMALIZERS
+from .pruner import PRUNERS
+from .sorter import Sorter
+
+INDEX_VERSION = 1
+
+PATH = Union[str, Path]
+
+
+class DirectoryDiffResult:
+    """
+    Result of a directory diff.  Acts like a bool for testing purposes.
+    """
+
+    def __init__(
+        self,
+        added: List[str],
+        removed: List[str],
+        changed: Dict[str, DiffResult],
+        unchanged: List[str],
+    ):
+        """
+        :param added: Documents only in the actual directory.
+        :param removed: Documents only in the baseline directory.
+        :param changed: Diff results of the documents that don't match.
+        :param unchanged: Documents that match.
+        """
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.unchanged = unchanged
+
+    def __bool__(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    def report(self, support: bool = False) -> str:
+        """
+        Summary of the added, removed and changed documents.
+
+        :param support: Include the diff of each changed document.
+        :return: Report.
+        """
+        lines = [
+            f"{len(self.unchanged)} unchanged, {len(self.added)} added, "
+            f"{len(self.removed)} removed, {len(self.changed)} changed"
+        ]
+        lines.extend(f"added: {name}" for name in self.added)
+        lines.extend(f"removed: {name}" for name in self.removed)
+        for name, result in self.changed.items():
+            lines.append(f"changed: {name}")
+            if support:
+                lines.append(result.support)
+        return "\n".join(lines)
+
+
+class DirectoryDiffer:
+    """
+    Diff the JSON documents with the same relative path in two directories.
+    """
+
+    def __init__(
+        self,
+        cls: Optional[Type[JSONEncoder]] = None,
+        sorters: LIST_SORTERS = None,
+        normalizers: NORMALIZERS = None,
+        max_col_width: Optional[int] = 20,
+        pruners: PRUNERS = None,
+        pattern: str = "*.json",
+    ):
+        """
+        :param cls: JSON Encoder if any fields aren't JSON encodable.
+        :param sorters: Sorters for list elements.
+        :param normalizers: Normalizers for leaf elements.
+        :param max_col_width: Maximum column width of diff output.
+        :param pruners: Pruners for branches to drop or replace without diffing them.
+        :param pattern: Glob pattern for the documents in each directory and its
+            subdirectories.
+        """
+        self.cls = cls
+        self.sorters = sorters
+        self.normalizers = normalizers
+        self.max_col_width = max_col_width
+        self.pruners = pruners
+        self.pattern = pattern
+
+    def diff(
+        self,
+        baseline: PATH,
+        actual: PATH,
+        index: Optional[PATH] = None,
+        workers: Optional[int] = None,
+    ) -> DirectoryDiffResult:
+        """
+        Diff the documents in two directories.
+
+        :param baseline: Directory of expected documents.
+        :param actual: Directory of test documents.
+        :param index: Index file to read and update.  No index is kept if None.
+        :param workers: Processes for the diffs.  None for one per CPU, 0 or 1 to
+            diff in this process.
+        :return: Added, removed, changed and unchanged documents.
+        """
+        entries = self._read_index(index)
+        baseline_files = self._files(Path(baseline))
+        actual_files = self._files(Path(actual))
+
+        candidates = []
+        unchanged = []
+        for name in sorted(set(baseline_files) & set(actual_files)):
+            baseline_fingerprint = self._fingerprint(baseline_files[name], entries)
+            actual_fingerprint = self._fingerprint(actual_files[name], entries)
+            if baseline_fingerprint == actual_fingerprint:
+                unchanged.append(name)
+            else:
+                candidates.append(name)
+
+        if index is not None:
+            self._write_index(index, entries)
+
+        jobs = [
+            (
+                str(actual_files[name]),
+                str(baseline_files[name]),
+                self.cls,
+                self.sorters,
+                self.normalizers,
+                self.max_col_width,
+                self.pruners,
+            )
+            for name in candidates
+        ]
+        if (workers is not None and workers <= 1) or len(jobs) <= 1:
+            results = list(map(_diff_files, jobs))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_diff_files, jobs))
+
+        changed = {}
+        for name, result in zip(candidates, results):
+            if result:
+                unchanged.append(name)
+            else:
+                changed[name] = result
+
+        return DirectoryDiffResult(
+            added=sorted(set(actual_files) - set(baseline_files)),
+            removed=sorted(set(baseline_files) - set(actual_files)),
+            changed=changed,
+            unchanged=sorted(unchanged),
+        )
+
+    def _files(self, directory: Path) -> Dict[str, Path]:
+        """Documents in the directory by their relative path."""
+        return {
+            path.relative_to(directory).as_posix(): path
+            for path in directory.rglob(self.pattern)
+            if path.is_file()
+        }
+
+    def _fingerprint(self, path: Path, entries: Dict[str, Dict]) -> str:
+        """
+        Canonical fingerprint of a document.  The document isn't read if its size
+        and mtime match the index and isn't sorted if its content hash matches.
+
+        :param path: Document.
+        :param entries: Index entries by absolute path.  Updated for the document.
+        :return: Fingerprint.
+        """
+        key = str(path.resolve())
+        stat = path.stat()
+        entry = entries.get(key)
+        if (
+            entry is not None
+            and entry["size"] == stat.st_size
+            and entry["mtime"] == stat.st_mtime_ns
+        ):
+            return entry["fingerprint"]
+
+        raw = path.read_bytes()
+        content_hash = hashlib.sha256(raw).hexdigest()
+        if entry is not None and entry["hash"] == content_hash:
+            fingerprint = entry["fingerprint"]
+        else:
+            sorted_ = Sorter.loads(
+                raw,
+                sorters=self.sorters,
+                normalizers=self.normalizers,
+                pruners=self.pruners,
+            )
+            canonical = json.dumps(sorted_, cls=self.cls, separators=(",", ":"))
+            fingerprint = hashlib.sha256(canonical.encode()).hexdigest()
+        entries[key] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": content_hash,
+            "fingerprint": fingerprint,
+        }
+        return fingerprint
+
+    def _config(self) -> Optional[str]:
+        """
+        Description of the configuration.  Fingerprints in an index that was built
+        with a different configuration, or with one that can't be described,
+        aren't used.
+        """
+        return describe_config([self.sorters, self.normalizers, self.pruners])
+
+    def _read_index(self, index: Optional[PATH]) -> Dict[str, Dict]:
+        """Index entries by absolute path, empty if the index can't be used."""
+        config = self._config()
+        if index is None or config is None or not os.path.exists(index):
+            return {}
+        try:
+            with open(index) as fp:
+                data = json.load(fp)
+        except ValueError:
+            return {}
+        if data.get("version") != INDEX_VERSION or data.get("config") != config:
+            return {}
+        return data["files"]
+
+    def _write_index(self, index: PATH, entries: Dict[str, Dict]):
+        """Replace the index so a reader never sees a partly written file."""
+        data = {"version": INDEX_VERSION, "config": self._config(), "files": entries}
+        temp = f"{index}.tmp"
+        with open(temp, "w") as fp:
+            json.dump(data, fp)
+        os.replace(temp, index)
+
+
+class _NotDescribable(Exception):
+    """A component that can't be told apart from others by its description."""
+
+
+def describe_config(config: Any) -> Optional[str]:
+    """
+    JSON description of a configuration, like a list of the components and
+    options of a diff.  Equal configurations have the same description, so it
+    can be hashed into cache keys.  Lambdas, local functions and local classes
+    are only known by a name they can share with others that do something else,
+    so configurations holding them have no description.
+
+    :param config: Components, classes and JSON encodable options.
+    :return: Description, or None if the configuration can't be described.
+    """
+    try:
+        return json.dumps(config, default=_describe, sort_keys=True)
+    except _NotDescribable:
+        return None
+
+
+def _describe(component: Any) -> Any:
+    """
+    JSON description of a class, function, sorter, normalizer, pruner or selector.
+
+    :raises _NotDescribable: For lambdas, local functions and local classes.
+    """
+    if isinstance(component, (type, types.FunctionType, types.BuiltinFunctionType)):
+        name = f"{component.__module__}.{component.__qualname__}"
+        if "<" in component.__qualname__:
+            raise _NotDescribable(name)
+        owner = getattr(component, "__self__", None)
+        if owner is None or isinstance(owner, types.ModuleType):
+            return name
+        return [name, owner]
+    if isinstance(component, types.MethodType):
+        return [_describe(component.__func__), component.__self__]
+    if isinstance(component, functools.partial):
+        return [
+            _describe(type(component)),
+            component.func,
+            component.args,
+            component.keywords,
+        ]
+    if hasattr(component, "__dict__"):
+        return [_describe(type(component)), vars(component)]
+    return repr(component)
+
+
+def _diff_files(
+    job: Tuple[str, str, Any, Any, Any, Optional[int], Any]
+) -> DiffResult:
+    """Diff two documents.  Runs in the worker processes."""
+    left, right, cls, sorters, normalizers, max_col_width, pruners = job
+    with open(left, "rb") as left_fp, open(right, "rb") as right_fp:
+        return Differ.diff_json(
+            left_fp.read(),
+            right_fp.read(),
+            cls=cls,
+            sorters=sorters,
+            normalizers=normalizers,
+            max_col_width=max_col_width,
+            pruners=pruners,
+        )
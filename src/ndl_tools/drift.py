@@ -0,0 +1,263 @@
+"""
+Aggregate the structural differences of many diffs into counters by path
+template, like orders/[*]/price, so a large batch of diffs is summarized by which
+fields drift instead of keeping the support of every diff.
+
+    index = DriftIndex()
+    for left, right in pairs:
+        index.add(Differ.first_differences(left, right, k=None))
+    print(index.report())
+
+Indexes built in worker processes are merged with merge() and saved with
+to_dict().
+"""
+import json
+import random
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .difference import Difference
+
+# Version of the to_dict() format.
+VERSION = 1
+# Longest repr of an example value.
+MAX_EXAMPLE_CHARS = 80
+
+_INDEX_PART = re.compile(r"\[\d+\]")
+
+
+def path_template(path: Path) -> str:
+    """
+    Path with the list indexes replaced by [*].
+
+    :param path: Path of a difference.
+    :return: Template like orders/[*]/price.
+    """
+    return "/".join(
+        "[*]" if _INDEX_PART.fullmatch(part) else part for part in path.parts
+    )
+
+
+def _example(value: Any) -> str:
+    """Short repr of an example value."""
+    text = repr(value)
+    if len(text) > MAX_EXAMPLE_CHARS:
+        text = text[: MAX_EXAMPLE_CHARS - 3] + "..."
+    return text
+
+
+class DriftCounts:
+    """
+    Counts and example values of the differences with one path template.
+    """
+
+    __slots__ = ("changed", "added", "removed", "documents", "seen", "examples")
+
+    def __init__(self):
+        self.changed = 0
+        self.added = 0
+        self.removed = 0
+        # Diffs with at least one difference with the template.
+        self.documents = 0
+        # Differences the examples were sampled from.
+        self.seen = 0
+        # Reservoir sample of (left, right) reprs.
+        self.examples: List[Tuple[str, str]] = []
+
+    @property
+    def total(self) -> int:
+        return self.changed + self.added + self.removed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DriftCounts":
+        counts = cls()
+        for key in cls.__slots__:
+            setattr(counts, key, data[key])
+        counts.examples = [tuple(example) for example in counts.examples]
+        return counts
+
+    def __repr__(self) -> str:
+        return (
+            f"DriftCounts(changed={self.changed}, added={self.added}, "
+            f"removed={self.removed}, documents={self.documents})"
+        )
+
+
+class DriftIndex:
+    """
+    Counters of the differences of many diffs by path template.
+    """
+
+    def __init__(self, examples: int = 5, seed: Optional[int] = None):
+        """
+        :param examples: Example values kept for each path template.
+        :param seed: Seed for sampling the examples.
+        """
+        self.max_examples = examples
+        self.diffs = 0
+        self.mismatches = 0
+        self.templates: Dict[str, DriftCounts] = {}
+        self._random = random.Random(seed)
+
+    def add(self, differences: Iterable[Difference]):
+        """
+        Count the differences of one diff.
+
+        :param differences: Differences like Differ.first_differences(k=None).
+        """
+        self.diffs += 1
+        found = set()
+        for difference in differences:
+            template = path_template(difference.path)
+            counts = self.templates.get(template)
+            if counts is None:
+                counts = self.templates[template] = DriftCounts()
+            kind = difference.kind
+            if kind == "changed":
+                counts.changed += 1
+            elif kind == "added":
+                counts.added += 1
+            else:
+                counts.removed += 1
+            if template not in found:
+                found.add(template)
+                counts.documents += 1
+            self._sample(counts, difference)
+        if found:
+            self.mismatches += 1
+
+    def _sample(self, counts: DriftCounts, difference: Difference):
+        """Reservoir sample the example values."""
+        counts.seen += 1
+        if len(counts.examples) < self.max_examples:
+            slot = len(counts.examples)
+            counts.examples.append(None)
+        else:
+            slot = self._random.randrange(counts.seen)
+            if slot >= self.max_examples:
+                return
+        counts.examples[slot] = (_example(difference.left), _example(difference.right))
+
+    def merge(self, other: "DriftIndex") -> "DriftIndex":
+        """
+        Add the counters of another index, like one from a worker process.
+
+        :param other: Index to merge into this one.
+        :return: This index.
+        """
+        self.diffs += other.diffs
+        self.mismatches += other.mismatches
+        for template, theirs in other.templates.items():
+            ours = self.templates.get(template)
+            if ours is None:
+                ours = self.templates[template] = DriftCounts()
+            ours.changed += theirs.changed
+            ours.added += theirs.added
+            ours.removed += theirs.removed
+            ours.documents += theirs.documents
+            ours.examples = self._merge_examples(ours, theirs)
+            ours.seen += theirs.seen
+        return self
+
+    def _merge_examples(
+        self, ours: DriftCounts, theirs: DriftCounts
+    ) -> List[Tuple[str, str]]:
+        """
+        Sample from both reservoirs in proportion to the differences they were
+        sampled from.
+        """
+        left, right = list(ours.examples), list(theirs.examples)
+        left_seen, right_seen = ours.seen, theirs.seen
+        examples = []
+        while len(examples) < self.max_examples and (left or right):
+            take_left = right_seen == 0 or (
+                self._random.random() * (left_seen + right_seen) < left_seen
+            )
+            if take_left and left:
+                examples.append(left.pop(self._random.randrange(len(left))))
+                left_seen -= 1
+            elif right:
+                examples.append(right.pop(self._random.randrange(len(right))))
+                right_seen -= 1
+            else:
+                examples.append(left.pop(self._random.randrange(len(left))))
+                left_seen -= 1
+        return examples
+
+    def most_drifted(self, n: Optional[int] = 10) -> List[Tuple[str, DriftCounts]]:
+        """
+        Path templates with the most differences.
+
+        :param n: Number of templates.  None for all of them.
+        :return: (template, counts) with the most differences first.
+        """
+        ranked = sorted(
+            self.templates.items(), key=lambda item: (-item[1].total, item[0])
+        )
+        return ranked[:n] if n is not None else ranked
+
+    def report(self, n: Optional[int] = 10) -> str:
+        """
+        Table of the path templates with the most differences.
+
+        :param n: Number of templates.  None for all of them.
+        :return: Report.
+        """
+        lines = [
+            f"{self.mismatches} of {self.diffs} diffs with differences",
+            f"{'changed':>8} {'added':>8} {'removed':>8} {'diffs':>8}  path",
+        ]
+        for template, counts in self.most_drifted(n):
+            lines.append(
+                f"{counts.changed:8} {counts.added:8} {counts.removed:8} "
+                f"{counts.documents:8}  {template}"
+            )
+            for left, right in counts.examples:
+                lines.append(f"{'':36}  {left} -> {right}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON serializable counters."""
+        return {
+            "version": VERSION,
+            "examples": self.max_examples,
+            "diffs": self.diffs,
+            "mismatches": self.mismatches,
+            "templates": {
+                template: counts.to_dict()
+                for template, counts in self.templates.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: Dict[str, Any], seed: Optional[int] = None
+    ) -> "DriftIndex":
+        """
+        Index from the counters of to_dict().
+
+        :param data: Counters from to_dict().
+        :param seed: Seed for sampling the examples.
+        :return: Index.
+        """
+        if data.get("version") != VERSION:
+            raise ValueError(f"Unsupported drift index version {data.get('version')}")
+        index = cls(data["examples"], seed)
+        index.diffs = data["diffs"]
+        index.mismatches = data["mismatches"]
+        index.templates = {
+            template: DriftCounts.from_dict(counts)
+            for template, counts in data["templates"].items()
+        }
+        return index
+
+    def dumps(self) -> str:
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def loads(cls, raw: str, seed: Optional[int] = None) -> "DriftIndex":
+        return cls.from_dict(json.loads(raw), seed)
@@ -47,7 +47,7 @@ class BaseListSorter:
         :return: Sorted list.
         """
         if not sorters:
-            return sorted(list_)
+            return _default_sorted(list_)
 
         for sorter in sorters:
             if BaseSelector.match(path, sorter._selectors):
@@ -55,7 +55,7 @@ class BaseListSorter:
                     return sorter._sorted(list_)
                 except NotSortedError:
                     continue
-        return sorted(list_)
+        return _default_sorted(list_)
 
     @abstractmethod
     def _sorted(self, list_: List) -> List:
@@ -71,6 +71,28 @@ class BaseListSorter:
 LIST_SORTERS = Optional[Union[BaseListSorter, List[BaseListSorter]]]
 
 
+def _default_sorted(list_: List) -> List:
+    """
+    Python sorted(), except that lists that can't be ordered with < because of
+    NumPy array or bytes-like leaves are sorted with a key that orders them by
+    contents.  The leaves are only looked for once sorted() fails, so lists without
+    them cost no more than sorted().
+
+    :param list_: List to sort.
+    :return: Sorted list.
+    """
+    try:
+        return sorted(list_)
+    except (TypeError, ValueError) as e:
+        # The buffers module imports the sorter, which imports this module.
+        from .buffers import has_buffers, sort_key
+
+        # Arrays compare elementwise, also inside mappings and lists.
+        if isinstance(e, ValueError) or has_buffers(list_):
+            return sorted(list_, key=sort_key)
+        raise
+
+
 class DefaultListSorter(BaseListSorter):
     def __init__(
         self, *, selectors: SELECTORS = None,
@@ -85,7 +107,7 @@ class DefaultListSorter(BaseListSorter):
 
     def _sorted(self, list_: List) -> List:
         """Default Python sorted()."""
-        return sorted(list_)
+        return _default_sorted(list_)
 
 
 class NoSortListSorter(BaseListSorter):
@@ -4,13 +4,21 @@ with another NDL.  Normalizers are applied to leaf elements using
 the Selector associated with the Normalizer.   Normalizers can be chained
 so that they are all tried until one succeeds.
 """
+import array
 import datetime
+import math
 from abc import abstractmethod
 from pathlib import Path
-from typing import Any, Optional, List, Union
+from typing import Any, Iterable, Optional, List, Tuple, Union
 
+from .optional import import_numpy
 from .selector import BaseSelector, SELECTORS
 
+# Leaf types that lists are batch normalized for.  These are never containers.
+BATCH_TYPES = frozenset((float, int, str, bool, type(None)))
+# Largest power of ten that is exact as a float.
+MAX_EXACT_POWER = 22
+
 
 class NotNormalizedError(Exception):
     """The normalizer wasn't applied to the element."""
@@ -60,6 +68,46 @@ class BaseNormalizer:
                     continue
         return element
 
+    @staticmethod
+    def normalize_batch(
+        elements: Iterable,
+        path: Path,
+        normalizers: Optional[List["BaseNormalizer"]] = None,
+    ) -> Optional[List]:
+        """
+        Normalize all the elements of a list at once.  This only applies if all the
+        elements have the same leaf type and the selectors match every element of the
+        list the same way.  Otherwise each element has to be normalized on its own.
+
+        :param elements: Elements of the list to normalize, or an array.array or
+            one dimensional memoryview of them.
+        :param path: Path to the list.
+        :param normalizers: Normalizers to apply to the elements.
+        :return: New list of the normalized elements or None if they can't be
+            normalized as a batch.
+        """
+        if isinstance(elements, memoryview) and elements.ndim != 1:
+            return None
+        if isinstance(elements, (array.array, memoryview)):
+            elements = elements.tolist()
+        element_types = set(map(type, elements))
+        if len(element_types) > 1 or not element_types <= BATCH_TYPES:
+            return None
+        elements = list(elements)
+        if not normalizers or not elements:
+            return elements
+
+        for normalizer in normalizers:
+            matched = BaseSelector.match_elements(path, normalizer._selectors)
+            if matched is None:
+                return None
+            if matched:
+                try:
+                    return normalizer._normalize_batch(elements)
+                except NotNormalizedError:
+                    continue
+        return elements
+
     @abstractmethod
     def _normalize(self, element: Any) -> Any:
         """
@@ -70,6 +118,27 @@ class BaseNormalizer:
         """
         pass  # pragma: no cover
 
+    def _normalize_batch(self, elements: List) -> Optional[List]:
+        """
+        Normalize a list of elements that all have the same type.  Subclasses can
+        override this with a vectorized version of _normalize().
+
+        :param elements: Elements to normalize.
+        :return: Normalized elements or None if only some of them were normalized.
+        :raises NotNormalizedError: If none of the elements were normalized.
+        """
+        normalized = []
+        not_normalized = 0
+        for element in elements:
+            try:
+                normalized.append(self._normalize(element))
+            except NotNormalizedError:
+                normalized.append(element)
+                not_normalized += 1
+        if not_normalized == len(elements):
+            raise NotNormalizedError()
+        return normalized if not not_normalized else None
+
 
 NORMALIZERS = Optional[Union[BaseNormalizer, List[BaseNormalizer]]]
 
@@ -91,27 +160,113 @@ class DefaultNormalizer(BaseNormalizer):
         return element
 
 
-# ToDo: Extend this to be smarter about exponential notation
-#       and maybe something that adjusts based on the size or places of number being normalize.
+def _round_significant(element: float, significant_figures: int) -> float:
+    """Round a float to a number of significant figures."""
+    if element == 0 or not math.isfinite(element):
+        return element
+    magnitude = math.floor(math.log10(abs(element)))
+    return round(element, significant_figures - 1 - magnitude)
+
+
 class FloatRoundNormalizer(BaseNormalizer):
     def __init__(
-        self, places: int, *, selectors: SELECTORS = None,
+        self,
+        places: Optional[int] = None,
+        *,
+        significant_figures: Optional[int] = None,
+        selectors: SELECTORS = None,
     ):
         """
-        Round a floating point number to a set number of places.
+        Round a floating point number to a set number of places or significant figures.
+        Significant figures suit numbers that vary in size or use exponential notation.
+
+        Lists of floats are rounded as a batch, with NumPy if it is installed.  The
+        floats NumPy can't round exactly like round(), like those within an ulp of a
+        rounding boundary, are rounded with round().
 
         :param places:  Number of places to round the floating point number to.
+        :param significant_figures:  Number of significant figures to round to instead.
         :param selectors: Optional slist of elector to use to select which
             elements this normalizer runs.
         """
+        if (places is None) == (significant_figures is None):
+            raise ValueError("Specify one of places or significant_figures.")
         self._places = places
+        self._significant_figures = significant_figures
         super().__init__(selectors)
 
     def _normalize(self, element: Any) -> Any:
         if isinstance(element, float):
+            if self._significant_figures is not None:
+                return _round_significant(element, self._significant_figures)
             return round(element, self._places)
         raise NotNormalizedError()
 
+    def _normalize_batch(self, elements: List) -> Optional[List]:
+        if not isinstance(elements[0], float):
+            raise NotNormalizedError()
+        places = self._places
+        numpy = import_numpy()
+        if numpy is None or (places is not None and abs(places) > MAX_EXACT_POWER):
+            return [self._normalize(element) for element in elements]
+
+        values = numpy.asarray(elements, dtype=numpy.float64)
+        with numpy.errstate(all="ignore"):
+            if self._significant_figures is None:
+                rounded, exact = _round_array(values, numpy.int64(self._places))
+            else:
+                rounded, exact = self._round_significant_array(values)
+        normalized = rounded.tolist()
+        for i in numpy.flatnonzero(~exact).tolist():
+            normalized[i] = self._normalize(elements[i])
+        return normalized
+
+    def _round_significant_array(self, values: Any) -> Tuple[Any, Any]:
+        """
+        Round an array to the significant figures like _round_significant().
+
+        :param values: Float array.
+        :return: Rounded array and the mask of the values rounded exactly.
+        """
+        numpy = import_numpy()
+        finite = numpy.isfinite(values) & (values != 0)
+        log10 = numpy.log10(numpy.abs(numpy.where(finite, values, 1.0)))
+        # The magnitude of a value near a power of ten depends on the last bit of
+        # the logarithm, which can differ from math.log10().
+        magnitude_known = numpy.abs(log10 - numpy.rint(log10)) > 1e-9
+        digits = self._significant_figures - 1 - numpy.floor(log10).astype(numpy.int64)
+        rounded, exact = _round_array(values, digits)
+        return (
+            numpy.where(finite, rounded, values),
+            ~finite | (exact & magnitude_known),
+        )
+
+
+def _round_array(values: Any, digits: Any) -> Tuple[Any, Any]:
+    """
+    Round an array of floats to a number of decimal digits with NumPy.  The value
+    is scaled, rounded to an integer and scaled back.  Each of these steps is
+    correctly rounded, so the result is the same as round() unless the scaled value
+    is too close to a half to know which way the exact value rounds, is too large
+    to have a fraction, or the power of ten isn't exact.
+
+    :param values: Float array.
+    :param digits: Decimal digits, an integer or an integer array like values.
+    :return: Rounded array and the mask of the values rounded the same as round().
+    """
+    numpy = import_numpy()
+    powers = 10.0 ** numpy.abs(numpy.clip(digits, -MAX_EXACT_POWER, MAX_EXACT_POWER))
+    scaled = numpy.where(digits >= 0, values * powers, values / powers)
+    integers = numpy.rint(scaled)
+    rounded = numpy.where(digits >= 0, integers / powers, integers * powers)
+    distance = numpy.abs(numpy.abs(scaled - numpy.floor(scaled)) - 0.5)
+    exact = (
+        (numpy.abs(digits) <= MAX_EXACT_POWER)
+        & (numpy.abs(scaled) < 2.0 ** 52)
+        & (distance > numpy.spacing(numpy.abs(scaled)))
+    )
+    return rounded, exact
+
 
 class TodayDateNormalizer(BaseNormalizer):
     def __init__(
@@ -152,6 +307,22 @@ class StrTodayDateNormalizer(BaseNormalizer):
                 pass
         raise NotNormalizedError()
 
+    def _normalize_batch(self, elements: List) -> Optional[List]:
+        if not isinstance(elements[0], str):
+            raise NotNormalizedError()
+        dates = 0
+        for element in elements:
+            try:
+                datetime.date.fromisoformat(element)
+                dates += 1
+            except ValueError:
+                pass
+        if not dates:
+            raise NotNormalizedError()
+        if dates < len(elements):
+            return None
+        return [datetime.date.today().isoformat()] * len(elements)
+
 
 class PathNormalizer(BaseNormalizer):
     def __init__(
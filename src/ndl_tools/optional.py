@@ -0,0 +1,27 @@
+"""
+Optional dependencies.  NumPy is imported the first time an array operation needs
+it instead of when the package is imported, so the command line tool and diffs
+without arrays start quickly.
+"""
+import functools
+import sys
+from types import ModuleType
+from typing import Optional
+
+
+def loaded_numpy() -> Optional[ModuleType]:
+    """
+    NumPy if it has already been imported.  There can't be any arrays before it is,
+    so this is enough to check whether an element is an array.
+    """
+    return sys.modules.get("numpy")
+
+
+@functools.lru_cache(maxsize=None)
+def import_numpy() -> Optional[ModuleType]:
+    """NumPy, or None if it isn't installed."""
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover
+        return None
+    return numpy
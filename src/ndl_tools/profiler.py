@@ -0,0 +1,176 @@
+"""
+Profile the selectors, normalizers, list sorters, pruners and comparators of a
+diff to find which custom component makes it slow.
+
+    with ComponentProfiler(sorters, normalizers) as profiler:
+        Differ.diff(left, right, sorters=sorters, normalizers=normalizers)
+    print(profiler.report())
+
+While the profiler is active the core method of every component, like _match()
+or _normalize(), is wrapped on the instance to count the calls and measure their
+time and the memory they allocate with tracemalloc.  Selectors attached to the
+components are found and profiled too.  The time of a call includes the calls it
+makes to other components.  Profile diffs in this process; wrapped components
+can't be sent to worker processes.
+"""
+import time
+import tracemalloc
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .comparator import BaseComparator
+from .list_sorter import BaseListSorter
+from .normalizer import BaseNormalizer
+from .pruner import BasePruner
+from .selector import BaseSelector
+
+# Methods wrapped for each kind of component.
+PROFILED_METHODS = (
+    (BaseSelector, ("_match",)),
+    (BaseNormalizer, ("_normalize", "_normalize_batch")),
+    (BaseListSorter, ("_sorted",)),
+    (BasePruner, ("_prune",)),
+    (BaseComparator, ("_compare",)),
+)
+_COMPONENT_TYPES = tuple(base for base, _ in PROFILED_METHODS)
+
+
+class ComponentStats:
+    """
+    Calls, time and memory of one method of one component.
+    """
+
+    __slots__ = ("name", "component", "method", "calls", "seconds", "allocated")
+
+    def __init__(self, name: str, component: Any, method: str):
+        self.name = name
+        self.component = component
+        self.method = method
+        self.calls = 0
+        self.seconds = 0.0
+        # Net bytes allocated by the calls and still allocated when they returned.
+        self.allocated = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"ComponentStats({self.name}.{self.method}, calls={self.calls}, "
+            f"seconds={self.seconds:.6f}, allocated={self.allocated})"
+        )
+
+
+class ComponentProfiler:
+    """
+    Context manager that profiles the components of a diff.
+    """
+
+    def __init__(self, *components: Any, memory: bool = True):
+        """
+        :param components: Components, lists of components or a config from
+            cli.load_config().
+        :param memory: Measure the memory allocated with tracemalloc.  This slows
+            down the diff a lot more than counting calls and time.
+        """
+        self.memory = memory
+        self.stats: List[ComponentStats] = []
+        self._components = list(_components(components))
+        self._wrapped: List[Tuple[Any, str, Any]] = []
+        self._started_tracemalloc = False
+
+    def __enter__(self) -> "ComponentProfiler":
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        names: Dict[str, int] = {}
+        for component in self._components:
+            type_name = type(component).__name__
+            names[type_name] = names.get(type_name, 0) + 1
+            name = f"{type_name}#{names[type_name]}"
+            for base, methods in PROFILED_METHODS:
+                if isinstance(component, base):
+                    for method in methods:
+                        self._wrap(component, method, name)
+        return self
+
+    def __exit__(self, *exc_info):
+        for component, method, previous in reversed(self._wrapped):
+            if previous is None:
+                delattr(component, method)
+            else:
+                setattr(component, method, previous)
+        self._wrapped = []
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _wrap(self, component: Any, method: str, name: str):
+        stats = ComponentStats(name, component, method)
+        self.stats.append(stats)
+        call = getattr(component, method)
+        memory = self.memory
+        get_traced_memory = tracemalloc.get_traced_memory
+        perf_counter = time.perf_counter
+
+        def profiled(*args, **kwargs):
+            start_memory = get_traced_memory()[0] if memory else 0
+            start = perf_counter()
+            try:
+                return call(*args, **kwargs)
+            finally:
+                stats.seconds += perf_counter() - start
+                stats.calls += 1
+                if memory:
+                    stats.allocated += get_traced_memory()[0] - start_memory
+
+        self._wrapped.append((component, method, vars(component).get(method)))
+        setattr(component, method, profiled)
+
+    def ranked(self) -> List[ComponentStats]:
+        """Stats of the methods that were called, the most time first."""
+        called = [stats for stats in self.stats if stats.calls]
+        return sorted(called, key=lambda stats: stats.seconds, reverse=True)
+
+    def report(self, n: Optional[int] = None) -> str:
+        """
+        Table of the methods that were called, the most time first.
+
+        :param n: Number of methods.  None for all of them.
+        :return: Report.
+        """
+        ranked = self.ranked()
+        total = sum(stats.seconds for stats in ranked) or 1.0
+        lines = [
+            f"{'calls':>10} {'seconds':>10} {'%':>6} {'us/call':>10} "
+            f"{'KiB':>10}  component"
+        ]
+        for stats in ranked[:n] if n is not None else ranked:
+            allocated = f"{stats.allocated / 1024:10.1f}" if self.memory else f"{'':10}"
+            lines.append(
+                f"{stats.calls:10} {stats.seconds:10.4f} "
+                f"{100 * stats.seconds / total:6.1f} "
+                f"{1e6 * stats.seconds / stats.calls:10.2f} "
+                f"{allocated}  {stats.name}.{stats.method}"
+            )
+        return "\n".join(lines)
+
+
+def _components(values: Any) -> Iterator[Any]:
+    """
+    Components in the values and the components attached to them, like their
+    selectors, each once.
+    """
+    seen = set()
+    stack = list(reversed(values))
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(reversed(list(value.values())))
+        elif isinstance(value, (list, tuple)):
+            stack.extend(reversed(value))
+        elif isinstance(value, _COMPONENT_TYPES) and id(value) not in seen:
+            seen.add(id(value))
+            yield value
+            attached = [
+                attribute
+                for attribute in vars(value).values()
+                if isinstance(attribute, (list, tuple) + _COMPONENT_TYPES)
+            ]
+            stack.extend(reversed(attached))
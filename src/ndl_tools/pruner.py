@@ -0,0 +1,124 @@
+"""
+Pruners used to remove branches of an NDL before they are sorted and normalized.
+A pruned element is replaced, or dropped from its parent, without visiting any
+of its children, so ignoring a large volatile branch costs the same as ignoring
+a leaf.  Pruners are applied to elements using the Selector associated with the
+Pruner.  Pruners can be chained so that they are all tried until one succeeds.
+"""
+from abc import abstractmethod
+from pathlib import Path
+from typing import Any, List, Optional, Union
+
+from .selector import BaseSelector, SELECTORS
+
+
+class NotPrunedError(Exception):
+    """The pruner wasn't applied to the element."""
+
+
+class _Drop:
+    """Marker for an element that is removed from its parent."""
+
+    def __repr__(self) -> str:
+        return "DROP"
+
+    def __reduce__(self) -> str:
+        # Unpickled as the module's DROP, so a DROP returned by a process pool
+        # worker is still found with "is DROP".
+        return "DROP"
+
+
+# Returned by a pruner to remove the element from its parent.
+DROP = _Drop()
+# Returned by BasePruner.prune() when no pruner was applied.
+NOT_PRUNED = object()
+
+
+class BasePruner:
+    """
+    Base pruner implements the chaining logic.
+    """
+
+    def __init__(
+        self, selectors: SELECTORS,
+    ):
+        """
+        Initialize the pruner with the selectors for the branches it prunes.
+
+        :param selectors: Selectors to use to select which elements this pruner
+            runs on.  Unlike normalizers there is no default of all elements.
+        """
+        self._selectors = selectors if isinstance(selectors, list) else [selectors]
+
+    @staticmethod
+    def prune(
+        element: Any, path: Path, pruners: Optional[List["BasePruner"]] = None
+    ) -> Any:
+        """
+        Run all the pruners until one is applied to prune the element.  The root
+        element is never pruned.
+
+        :param element: Element to prune.
+        :param path: Path to the element.
+        :param pruners: Pruners to apply to the element.
+        :return: Replacement element, DROP or NOT_PRUNED.
+        """
+        if not pruners or not path.parts:
+            return NOT_PRUNED
+
+        for pruner in pruners:
+            if BaseSelector.match(path, pruner._selectors):
+                try:
+                    return pruner._prune(element)
+                except NotPrunedError:
+                    continue
+        return NOT_PRUNED
+
+    @abstractmethod
+    def _prune(self, element: Any) -> Any:
+        """
+        Prototype for the core pruning logic implemented in the subclass.  The
+        element is the raw unsorted branch and should not be traversed.
+
+        :param element: Element to prune.
+        :return: Replacement element or DROP.
+        """
+        pass  # pragma: no cover
+
+
+PRUNERS = Optional[Union[BasePruner, List[BasePruner]]]
+
+
+class DropPruner(BasePruner):
+    def __init__(
+        self, *, selectors: SELECTORS,
+    ):
+        """
+        Remove the selected elements from their parent dict or list.
+
+        :param selectors: Selectors to use to select which elements are dropped.
+        """
+        super().__init__(selectors)
+
+    def _prune(self, element: Any) -> Any:
+        """Drop the element."""
+        return DROP
+
+
+class PlaceholderPruner(BasePruner):
+    def __init__(
+        self, *, selectors: SELECTORS, placeholder: Any = "<pruned>",
+    ):
+        """
+        Replace the selected elements with a placeholder so it is still
+        visible in the diff that the element was there.
+
+        :param selectors: Selectors to use to select which elements are replaced.
+        :param placeholder: Value that replaces the element.
+        """
+        self._placeholder = placeholder
+        super().__init__(selectors)
+
+    def _prune(self, element: Any) -> Any:
+        """Replace the element with the placeholder."""
+        return self._placeholder
@@ -0,0 +1,246 @@
+"""
+pytest plugin with an ndl_diff fixture that asserts a test object matches an
+expected object or a JSON baseline file.
+
+The components are built once per session from the --ndl-config file, in the
+ndl-diff config schema.  Baseline files are sorted once and the sorted baselines
+are pickled to the pytest cache, so other pytest-xdist workers and later runs
+load them instead of sorting them again.  The slowest diffs and the baseline
+cache hit rates are reported at the end of the session.
+
+The plugin is registered in every pytest session once ndl-tools is installed, so
+it only imports the diff code and creates its cache directory when a test uses
+it.
+
+    def test_orders(ndl_diff, client):
+        ndl_diff(client.get("/orders").json(), Path("golden/orders.json"))
+"""
+import hashlib
+import json
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+
+import pytest
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .differ import DiffResult
+
+CACHE_DIR = "ndl-baselines"
+# pytest cache key of the path of the cache directory once it has been created.
+CACHE_DIR_KEY = f"{CACHE_DIR}/path"
+BASELINE = os.PathLike
+_MISSING = object()
+
+
+class NdlDiffPlugin:
+    """
+    Components, sorted baselines and statistics shared by the tests of a session.
+    """
+
+    def __init__(self, config: Any):
+        self.config = config
+        self.components = {}
+        path = config.getoption("ndl_config") or config.getini("ndl_config")
+        if path:
+            from .cli import ConfigError, load_config
+
+            try:
+                self.components = load_config(path)
+            except ConfigError as e:
+                raise pytest.UsageError(str(e))
+        self.slowest = config.getoption("ndl_slowest")
+        self.cache = getattr(config, "cache", None)
+        self._description: Any = _MISSING
+        self._baselines: Dict[Tuple[str, int, int], Any] = {}
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self.timings: List[Tuple[float, str]] = []
+
+    def sorted(self, data: Any) -> Any:
+        from .sorter import Sorter
+
+        return Sorter.sorted(
+            data,
+            sorters=self.components.get("sorters"),
+            normalizers=self.components.get("normalizers"),
+            pruners=self.components.get("pruners"),
+        )
+
+    def baseline(self, path: BASELINE) -> Any:
+        """
+        Sorted baseline from memory, the disk cache or sorted from the file.
+
+        :param path: JSON baseline file.
+        :return: Sorted baseline.
+        """
+        path = Path(path).resolve()
+        stat = path.stat()
+        memory_key = (str(path), stat.st_size, stat.st_mtime_ns)
+        sorted_baseline = self._baselines.get(memory_key, _MISSING)
+        if sorted_baseline is not _MISSING:
+            self.stats["memory_hits"] += 1
+            return sorted_baseline
+
+        raw = path.read_bytes()
+        cache_name = None
+        description = self.description() if self.cache is not None else None
+        if description is not None:
+            digest = hashlib.sha256(description.encode())
+            digest.update(raw)
+            cache_name = f"{digest.hexdigest()}.pickle"
+            cache_dir = self.cache.get(CACHE_DIR_KEY, None)
+            if cache_dir is not None:
+                try:
+                    with open(Path(cache_dir, cache_name), "rb") as fp:
+                        sorted_baseline = pickle.load(fp)
+                    self.stats["disk_hits"] += 1
+                except Exception:
+                    # Missing, truncated or written by an incompatible version.
+                    pass
+
+        if sorted_baseline is _MISSING:
+            self.stats["misses"] += 1
+            sorted_baseline = self.sorted(json.loads(raw))
+            if cache_name is not None:
+                self._write(cache_name, sorted_baseline)
+
+        self._baselines[memory_key] = sorted_baseline
+        return sorted_baseline
+
+    def description(self) -> Optional[str]:
+        """
+        Description of the components that is part of every cache key.  None if
+        they can't be described and baselines aren't cached on disk.
+        """
+        if self._description is _MISSING:
+            from .directory import describe_config
+
+            keys = ("sorters", "normalizers", "pruners")
+            components = [self.components.get(key) for key in keys]
+            self._description = describe_config(components)
+        return self._description
+
+    def _write(self, cache_name: str, sorted_baseline: Any):
+        """Pickle a sorted baseline to the cache directory, creating it if needed."""
+        # Cache.makedir() was renamed to mkdir() in pytest 7.
+        mkdir = getattr(self.cache, "mkdir", None) or self.cache.makedir
+        cache_dir = Path(mkdir(CACHE_DIR))
+        if self.cache.get(CACHE_DIR_KEY, None) != str(cache_dir):
+            self.cache.set(CACHE_DIR_KEY, str(cache_dir))
+        # Workers may write the same file, each replaces it whole.
+        cache_file = cache_dir / cache_name
+        temp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp, "wb") as fp:
+            pickle.dump(sorted_baseline, fp, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, cache_file)
+
+    def pytest_sessionfinish(self, session: Any):
+        # pytest-xdist workers send their statistics to the controller.
+        workeroutput = getattr(self.config, "workeroutput", None)
+        if workeroutput is not None:
+            workeroutput["ndl_diff"] = {"stats": self.stats, "timings": self.timings}
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node: Any, error: Any):
+        output = getattr(node, "workeroutput", {}).get("ndl_diff")
+        if output is not None:
+            for key, value in output["stats"].items():
+                self.stats[key] += value
+            self.timings.extend(tuple(timing) for timing in output["timings"])
+
+    def pytest_terminal_summary(self, terminalreporter: Any):
+        if not self.timings:
+            return
+        terminalreporter.section("ndl-tools diffs")
+        baselines = sum(self.stats.values())
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        rate = f" ({hits / baselines:.0%} hit rate)" if baselines else ""
+        terminalreporter.write_line(
+            f"{len(self.timings)} diffs, baselines: "
+            f"{self.stats['memory_hits']} memory hits, "
+            f"{self.stats['disk_hits']} disk hits, "
+            f"{self.stats['misses']} sorted{rate}"
+        )
+        if self.slowest:
+            terminalreporter.write_line("slowest diffs:")
+            for seconds, nodeid in sorted(self.timings, reverse=True)[: self.slowest]:
+                terminalreporter.write_line(f"  {seconds:.3f}s {nodeid}")
+
+
+class NdlDiff:
+    """
+    Diff helper for one test.  Call it to assert that a test object matches.
+    """
+
+    def __init__(self, plugin: NdlDiffPlugin, nodeid: str):
+        self._plugin = plugin
+        self._nodeid = nodeid
+
+    def diff(self, actual: Any, expected: Union[Any, BASELINE]) -> "DiffResult":
+        """
+        Diff a test object against an expected object or a JSON baseline file.
+
+        :param actual: Test object.
+        :param expected: Expected object, or the path of a JSON baseline as a
+            pathlib.Path or os.PathLike.
+        :return: Result of the diff.
+        """
+        from .comparator import reconcile
+        from .differ import Differ
+
+        start = time.perf_counter()
+        if isinstance(expected, os.PathLike):
+            sorted_expected = self._plugin.baseline(expected)
+        else:
+            sorted_expected = self._plugin.sorted(expected)
+        sorted_actual = self._plugin.sorted(actual)
+        comparators = self._plugin.components.get("comparators")
+        result = Differ._diff_sorted(
+            sorted_actual,
+            reconcile(sorted_actual, sorted_expected, comparators),
+            None,
+            self._plugin.components.get("max_col_width", 20),
+        )
+        self._plugin.timings.append((time.perf_counter() - start, self._nodeid))
+        return result
+
+    def __call__(self, actual: Any, expected: Union[Any, BASELINE]) -> "DiffResult":
+        """
+        Assert that a test object matches an expected object or a JSON baseline.
+
+        :param actual: Test object.
+        :param expected: Expected object, or the path of a JSON baseline as a
+            pathlib.Path or os.PathLike.
+        :return: Result of the diff.
+        """
+        result = self.diff(actual, expected)
+        if not result:
+            raise AssertionError(f"NDLs don't match\n{result.support}")
+        return result
+
+
+def pytest_addoption(parser: Any):
+    group = parser.getgroup("ndl-tools")
+    group.addoption(
+        "--ndl-config", help="TOML or JSON config of the ndl_diff components."
+    )
+    group.addoption(
+        "--ndl-slowest",
+        type=int,
+        default=5,
+        help="Number of the slowest ndl_diff diffs to report.",
+    )
+    parser.addini("ndl_config", "TOML or JSON config of the ndl_diff components.")
+
+
+def pytest_configure(config: Any):
+    config.pluginmanager.register(NdlDiffPlugin(config), "ndl_diff_plugin")
+
+
+@pytest.fixture
+def ndl_diff(request: Any) -> NdlDiff:
+    """Assert that a test object matches an expected object or JSON baseline."""
+    plugin = request.config.pluginmanager.get_plugin("ndl_diff_plugin")
+    return NdlDiff(plugin, request.node.nodeid)
@@ -0,0 +1,317 @@
+"""
+Renderers write the line diff of two jsonified objects to a text stream as it is
+made.  The rows are written in batches, so only a batch of rows is held in memory
+instead of the HTML, the rows and the joined support of the whole diff.
+"""
+import html
+import re
+from abc import abstractmethod
+from collections import deque
+from difflib import ndiff, unified_diff
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+from .formatter import (
+    ADD_FORMAT_ON,
+    CHANGE_FORMAT_ON,
+    FORMAT_OFF,
+    SUB_FORMAT_ON,
+    Row,
+)
+
+# Rows written to the stream at a time.
+BUFFER_ROWS = 1000
+
+# Markers difflib puts around the changed parts of a line.
+ANSI_MARKS = {
+    "\0+": ADD_FORMAT_ON,
+    "\0-": SUB_FORMAT_ON,
+    "\0^": CHANGE_FORMAT_ON,
+    "\1": FORMAT_OFF,
+}
+PLAIN_MARKS = {mark: "" for mark in ANSI_MARKS}
+HTML_MARKS = {
+    "\0+": '<span class="diff_add">',
+    "\0-": '<span class="diff_sub">',
+    "\0^": '<span class="diff_chg">',
+    "\1": "</span>",
+}
+
+HTML_HEADER = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>ndl-tools diff</title>
+<style>
+table.diff {font-family: monospace; border-collapse: collapse}
+td {white-space: pre; padding: 0 0.5em}
+.diff_header {background-color: #e0e0e0; text-align: right}
+.diff_add {background-color: #aaffaa}
+.diff_chg {background-color: #ffff77}
+.diff_sub {background-color: #ffaaaa}
+</style>
+</head>
+<body>
+<table class="diff">"""
+HTML_FOOTER = """</table>
+</body>
+</html>"""
+
+# Line number and text of one side of a side by side row.
+_SIDE = Tuple[str, str]
+# Empty side across from a line on the other side.
+_BLANK = ("", "\n")
+# Runs of the changed characters in a "? " line of ndiff().
+_CHANGED_CHARS = re.compile(r"(\++|-+|\^+)")
+
+
+class BaseRenderer:
+    """
+    Write the rows of a line diff to a text stream.  Override rows() to make the
+    rows.
+    """
+
+    def __init__(self, stream: TextIO, buffer_rows: int = BUFFER_ROWS):
+        """
+        :param stream: Text stream like sys.stdout or an open file.
+        :param buffer_rows: Number of rows to write to the stream at a time.
+        """
+        self.stream = stream
+        self.buffer_rows = buffer_rows
+
+    def render(self, left_lines: List[str], right_lines: List[str]):
+        """
+        Line diff and write the rows to the stream.
+
+        :param left_lines: Lines of the jsonified test object.
+        :param right_lines: Lines of the jsonified expected object.
+        """
+        batch = []
+        for row in self.rows(left_lines, right_lines):
+            batch.append(row)
+            if len(batch) >= self.buffer_rows:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    @abstractmethod
+    def rows(self, left_lines: List[str], right_lines: List[str]) -> Iterator[str]:
+        """
+        Rows of the line diff.
+
+        :param left_lines: Lines of the jsonified test object.
+        :param right_lines: Lines of the jsonified expected object.
+        :return: Iterator of rows.
+        """
+        pass  # pragma: no cover
+
+    def _write(self, batch: List[str]):
+        batch.append("")
+        self.stream.write("\n".join(batch))
+
+    @staticmethod
+    def _side_by_side(
+        left_lines: List[str], right_lines: List[str]
+    ) -> Iterator[Tuple[_SIDE, _SIDE, bool]]:
+        """
+        Side by side lines with the same markers as HtmlDiff.  The lines of
+        ndiff() are paired up the same way HtmlDiff does, so the rows match the
+        support of a DiffResult.
+
+        :return: Iterator of (left side, right side, changed).
+        """
+        left_sides = deque()
+        right_sides = deque()
+        for left, right, changed in _sides(ndiff(left_lines, right_lines)):
+            if left is not None:
+                left_sides.append((left, changed))
+            if right is not None:
+                right_sides.append((right, changed))
+            while left_sides and right_sides:
+                left, left_changed = left_sides.popleft()
+                right, right_changed = right_sides.popleft()
+                yield left, right, left_changed or right_changed
+
+    @staticmethod
+    def _marked(text: str, marks: dict) -> str:
+        """Replace the difflib markers in a line.  Missing lines are empty."""
+        text = text.rstrip("\n")
+        for mark, replacement in marks.items():
+            text = text.replace(mark, replacement)
+        return text
+
+
+class AnsiRenderer(BaseRenderer):
+    """
+    Side by side rows with ANSI colors.  The same rows as the support of a
+    DiffResult.
+    """
+
+    MARKS = ANSI_MARKS
+
+    def __init__(
+        self,
+        stream: TextIO,
+        max_col_width: Optional[int] = 20,
+        buffer_rows: int = BUFFER_ROWS,
+    ):
+        """
+        :param stream: Text stream like sys.stdout or an open file.
+        :param max_col_width: Width of each side.
+        :param buffer_rows: Number of rows to write to the stream at a time.
+        """
+        super().__init__(stream, buffer_rows)
+        self.max_col_width = max_col_width
+
+    def rows(self, left_lines: List[str], right_lines: List[str]) -> Iterator[str]:
+        for (_, left), (_, right), _ in self._side_by_side(left_lines, right_lines):
+            row = Row(self.max_col_width)
+            left = self._marked(left, self.MARKS)
+            right = self._marked(right, self.MARKS)
+            for column in (None, None, left, None, None, right):
+                row.add(column)
+            yield row.finalize()
+
+
+class PlainRenderer(AnsiRenderer):
+    """Side by side rows without colors."""
+
+    MARKS = PLAIN_MARKS
+
+
+class UnifiedRenderer(BaseRenderer):
+    """Unified diff like diff -u."""
+
+    def __init__(
+        self,
+        stream: TextIO,
+        context: int = 3,
+        fromfile: str = "left",
+        tofile: str = "right",
+        buffer_rows: int = BUFFER_ROWS,
+    ):
+        """
+        :param stream: Text stream like sys.stdout or an open file.
+        :param context: Number of lines of context around each change.
+        :param fromfile: Name of the test object in the header.
+        :param tofile: Name of the expected object in the header.
+        :param buffer_rows: Number of rows to write to the stream at a time.
+        """
+        super().__init__(stream, buffer_rows)
+        self.context = context
+        self.fromfile = fromfile
+        self.tofile = tofile
+
+    def rows(self, left_lines: List[str], right_lines: List[str]) -> Iterator[str]:
+        return unified_diff(
+            left_lines,
+            right_lines,
+            self.fromfile,
+            self.tofile,
+            n=self.context,
+            lineterm="",
+        )
+
+
+class HtmlRenderer(BaseRenderer):
+    """Standalone HTML page with a side by side table."""
+
+    def rows(self, left_lines: List[str], right_lines: List[str]) -> Iterator[str]:
+        yield HTML_HEADER
+        for left, right, _ in self._side_by_side(left_lines, right_lines):
+            yield f"<tr>{self._cells(left)}{self._cells(right)}</tr>"
+        yield HTML_FOOTER
+
+    def _cells(self, side: _SIDE) -> str:
+        number, text = side
+        text = self._marked(html.escape(text, quote=False), HTML_MARKS)
+        return f'<td class="diff_header">{number}</td><td>{text}</td>'
+
+
+def _sides(
+    diff: Iterator[str],
+) -> Iterator[Tuple[Optional[_SIDE], Optional[_SIDE], bool]]:
+    """
+    Left and right sides of the lines of an ndiff(), one or both at a time.  Blank
+    sides are added to a run of deleted or added lines so that the lines after the
+    run line up.
+
+    :param diff: Lines of ndiff().
+    :return: Iterator of (left side or None, right side or None, changed).
+    """
+    numbers = [0, 0]
+
+    def side(lines: List[str], mark: Optional[str], index: int) -> _SIDE:
+        # Take a line, and its "? " line, off the front of lines and mark the
+        # changes like HtmlDiff.
+        numbers[index] += 1
+        text = lines.pop(0)
+        if mark == "?":
+            changes = lines.pop(0)
+            for match in reversed(list(_CHANGED_CHARS.finditer(changes))):
+                begin, end = match.span()
+                kind = match.group(1)[0]
+                text = f"{text[:begin]}\0{kind}{text[begin:end]}\1{text[end:]}"
+            text = text[2:]
+        elif mark is not None:
+            text = f"\0{mark}{text[2:] or ' '}\1"
+        else:
+            text = text[2:]
+        return str(numbers[index]), text
+
+    lines: List[str] = []
+    pending = 0
+    blanks = 0
+    while True:
+        # The kinds of the next four lines, X at the end.
+        while len(lines) < 4:
+            lines.append(next(diff, "X"))
+        kinds = "".join(line[0] for line in lines)
+        left = right = None
+        if kinds.startswith("X"):
+            blanks = pending
+        elif kinds.startswith("-?+?"):
+            yield side(lines, "?", 0), side(lines, "?", 1), True
+            continue
+        elif kinds.startswith("--++"):
+            pending -= 1
+            yield side(lines, "-", 0), None, True
+            continue
+        elif kinds.startswith(("--?+", "--+", "- ")):
+            # The last deleted line before a changed or unchanged line.
+            left = side(lines, "-", 0)
+            blanks, pending = pending - 1, 0
+        elif kinds.startswith("-+?"):
+            yield side(lines, None, 0), side(lines, "?", 1), True
+            continue
+        elif kinds.startswith("-?+"):
+            yield side(lines, "?", 0), side(lines, None, 1), True
+            continue
+        elif kinds.startswith("-"):
+            pending -= 1
+            yield side(lines, "-", 0), None, True
+            continue
+        elif kinds.startswith("+--"):
+            pending += 1
+            yield None, side(lines, "+", 1), True
+            continue
+        elif kinds.startswith(("+ ", "+-")):
+            # The last added line before a deleted or unchanged line.
+            right = side(lines, "+", 1)
+            blanks, pending = pending + 1, 0
+        elif kinds.startswith("+"):
+            pending += 1
+            yield None, side(lines, "+", 1), True
+            continue
+        elif kinds.startswith(" "):
+            yield side(lines[:], None, 0), side(lines, None, 1), False
+            continue
+
+        # Blanks across from the deleted or added lines of the run that ended.
+        for _ in range(-blanks):
+            yield None, _BLANK, True
+        for _ in range(blanks):
+            yield _BLANK, None, True
+        if kinds.startswith("X"):
+            return
+        yield left, right, True
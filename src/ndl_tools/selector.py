@@ -39,6 +39,26 @@ class BaseSelector:
                 return True
         return False
 
+    @staticmethod
+    def match_elements(
+        path: Path, selectors: Optional[List["BaseSelector"]] = None
+    ) -> Optional[bool]:
+        """
+        Match the elements of the list at the given path against the chain of
+        selectors with a single match.
+
+        :param path: Path to the list.
+        :param selectors: List of selectors.
+        :return: True if every element matched, False if none matched or None
+            if the match may depend on the element's index.
+        """
+        if not selectors:
+            return True
+
+        if not all(selector._same_for_elements() for selector in selectors):
+            return None
+        return BaseSelector.match(path / "[0]", selectors)
+
     @abstractmethod
     def _match(self, path: Path) -> bool:
         """
@@ -49,6 +69,15 @@ class BaseSelector:
         """
         pass  # pragma: no cover
 
+    def _same_for_elements(self) -> bool:
+        """
+        Subclasses that can tell their match doesn't depend on the index of a list
+        element override this so lists can be normalized as a batch.
+
+        :return: True if the match is the same for every element of a list.
+        """
+        return False
+
 
 SELECTORS = Optional[Union[BaseSelector, List[BaseSelector]]]
 
@@ -76,6 +105,10 @@ class ListLastComponentSelector(BaseSelector):
         """
         return path.parts[-1] in self._component_names
 
+    def _same_for_elements(self) -> bool:
+        """Only the index component of a list element can differ."""
+        return not any(str(name).startswith("[") for name in self._component_names)
+
 
 class ListAnyComponentSelector(BaseSelector):
     """
@@ -100,6 +133,10 @@ class ListAnyComponentSelector(BaseSelector):
         """
         return any((part in self._component_names for part in path.parts))
 
+    def _same_for_elements(self) -> bool:
+        """Only the index component of a list element can differ."""
+        return not any(str(name).startswith("[") for name in self._component_names)
+
 
 class RegExSelector(BaseSelector):
     """
@@ -148,6 +185,10 @@ class NegativeSelector(BaseSelector):
         """
         return not self._selector.match(path, [self._selector])
 
+    def _same_for_elements(self) -> bool:
+        """Negating doesn't change whether the match depends on the index."""
+        return self._selector._same_for_elements()
+
 
 class EndsWithSelector(BaseSelector):
     """
@@ -172,4 +213,8 @@ class EndsWithSelector(BaseSelector):
         """
         return str(path).endswith(self._end_of_path)
 
+    def _same_for_elements(self) -> bool:
+        """List element paths all end in an index like '[0]'."""
+        return "]" not in self._end_of_path
+
 
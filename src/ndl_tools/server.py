@@ -0,0 +1,335 @@
+"""
+Local diff server.  Test processes that diff against the same configuration and
+baselines can share one server on a Unix domain socket instead of each paying for
+the imports, building the components and sorting the baselines.
+
+    python -m ndl_tools.server SOCKET [-j N]
+
+Requests and responses are JSON objects, one per line.  Configurations use the
+same schema as the ndl-diff config and are identified by a hash of their JSON, so
+every client that sends the same configuration shares its components and sorted
+baselines.  The diffs run in a pool of worker processes and each worker keeps the
+components and sorted baselines it has built, so a baseline is only sent to a
+worker the first time the worker diffs against it.
+"""
+import argparse
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cli import ConfigError, build_config
+from .comparator import reconcile
+from .differ import DiffResult, Differ
+from .sorter import Sorter
+
+# Baselines kept by the server and sorted baselines kept by each process.  The
+# least recently used are dropped.
+MAX_BASELINES = 256
+
+# Components and sorted baselines built by this process, by id.
+_CONFIGS: Dict[str, Dict[str, Any]] = {}
+_BASELINES: "OrderedDict[str, Any]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+class DiffServerError(Exception):
+    """The server couldn't handle a request."""
+
+
+def _id(*values: Any) -> str:
+    """Stable id of JSON values."""
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode()).hexdigest()
+
+
+def _components(config_id: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Components for a configuration, built the first time they are used."""
+    components = _CONFIGS.get(config_id)
+    if components is None:
+        components = _CONFIGS[config_id] = build_config(config)
+    return components
+
+
+def _sorted_baseline(
+    baseline_id: str, document: Any, components: Dict[str, Any], sent: bool
+) -> Tuple[bool, Any]:
+    """
+    Sorted baseline, sorted the first time it is used.
+
+    :return: False if the document wasn't sent and isn't kept, and the baseline.
+    """
+    with _LOCK:
+        if baseline_id in _BASELINES:
+            _BASELINES.move_to_end(baseline_id)
+            return True, _BASELINES[baseline_id]
+    if not sent:
+        return False, None
+    sorted_ = _sort(document, components)
+    with _LOCK:
+        _BASELINES[baseline_id] = sorted_
+        while len(_BASELINES) > MAX_BASELINES:
+            _BASELINES.popitem(last=False)
+    return True, sorted_
+
+
+def _sort(document: Any, components: Dict[str, Any]) -> Any:
+    return Sorter.sorted(
+        document,
+        sorters=components.get("sorters"),
+        normalizers=components.get("normalizers"),
+        pruners=components.get("pruners"),
+    )
+
+
+def _diff(
+    job: Tuple[str, Dict[str, Any], Any, Any, Optional[str], bool]
+) -> Optional[Tuple[bool, str, bool]]:
+    """
+    Diff a document against another document or a baseline.  Runs in the worker
+    processes.
+
+    :param job: Config id, config, left document, right document or baseline, the
+        baseline id or None and False if the baseline wasn't sent because the
+        process should already have it.
+    :return: Match, support and partial of the DiffResult, or None if the baseline
+        wasn't sent and the process doesn't have it.
+    """
+    config_id, config, left, right, baseline_id, sent = job
+    components = _components(config_id, config)
+    if baseline_id is None:
+        sorted_right = _sort(right, components)
+    else:
+        found, sorted_right = _sorted_baseline(baseline_id, right, components, sent)
+        if not found:
+            return None
+    sorted_left = _sort(left, components)
+    sorted_right = reconcile(sorted_left, sorted_right, components.get("comparators"))
+    result = Differ._diff_sorted(
+        sorted_left,
+        sorted_right,
+        None,
+        components.get("max_col_width", 20),
+    )
+    return bool(result), result.support, result.partial
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Handle the requests of one client connection until it is closed."""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.respond(json.loads(line))
+            except (ConfigError, KeyError, TypeError, ValueError) as e:
+                response = {"error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class DiffServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Serve diffs on a Unix domain socket.  Each client connection has its own
+    thread and the diffs run in a pool of worker processes.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str, workers: Optional[int] = None):
+        """
+        :param path: Path of the socket.
+        :param workers: Worker processes.  None for one per CPU, 0 to diff in the
+            connection threads.
+        """
+        super().__init__(path, _Handler)
+        self.path = path
+        self._executor = ProcessPoolExecutor(workers) if workers != 0 else None
+        self._configs: Dict[str, Dict[str, Any]] = {}
+        self._baselines: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.respond({"op": "configure", "config": {}})
+
+    def respond(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Handle one request.
+
+        configure: {"config": {...}} -> {"config_id": ...}
+        baseline: {"config_id": ..., "document": ...} -> {"baseline_id": ...}
+        diff: {"config_id": ..., "left": ..., "right" or "baseline_id": ...}
+            -> {"match": ..., "support": ..., "partial": ...}
+
+        :param request: Decoded request.
+        :return: Response.
+        """
+        op = request["op"]
+        if op == "configure":
+            config = request["config"]
+            config_id = _id(config)
+            if config_id not in self._configs:
+                # Build the components here so a bad config fails this request.
+                _components(config_id, config)
+                self._configs[config_id] = config
+            return {"config_id": config_id}
+
+        config_id = request.get("config_id") or _id({})
+        if config_id not in self._configs:
+            raise KeyError(f"Unknown config_id {config_id}")
+        if op == "baseline":
+            document = request["document"]
+            baseline_id = _id(config_id, document)
+            with self._lock:
+                self._baselines[baseline_id] = (config_id, document)
+                self._baselines.move_to_end(baseline_id)
+                while len(self._baselines) > MAX_BASELINES:
+                    self._baselines.popitem(last=False)
+            return {"baseline_id": baseline_id}
+        if op != "diff":
+            raise ValueError(f"Unknown op {op}")
+
+        baseline_id = request.get("baseline_id")
+        if baseline_id is None:
+            right = request["right"]
+        else:
+            with self._lock:
+                if baseline_id not in self._baselines:
+                    raise KeyError(f"Unknown or dropped baseline_id {baseline_id}")
+                self._baselines.move_to_end(baseline_id)
+                baseline_config_id, right = self._baselines[baseline_id]
+            if baseline_config_id != config_id:
+                raise ValueError("The baseline was added with a different config_id.")
+        config = self._configs[config_id]
+        left = request["left"]
+        if baseline_id is None:
+            result = self._run((config_id, config, left, right, None, True))
+        else:
+            # Workers keep the baselines they have sorted, so the baseline is only
+            # sent to a worker that doesn't have it yet.
+            result = self._run((config_id, config, left, None, baseline_id, False))
+            if result is None:
+                result = self._run((config_id, config, left, right, baseline_id, True))
+        match, support, partial = result
+        return {"match": match, "support": support, "partial": partial}
+
+    def _run(self, job: Tuple) -> Optional[Tuple[bool, str, bool]]:
+        """Diff in a worker process, or in this thread without workers."""
+        if self._executor is None:
+            return _diff(job)
+        return self._executor.submit(_diff, job).result()
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        if self._executor is not None:
+            self._executor.shutdown()
+
+
+class DiffClient:
+    """
+    Connection to a DiffServer.  A client can be shared by threads, their requests
+    are sent one at a time.
+    """
+
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        """
+        :param path: Path of the server's socket.
+        :param timeout: Seconds to wait for a response.  None to wait forever.
+        """
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(path)
+        self._file = self._socket.makefile("rwb")
+        self._lock = threading.Lock()
+
+    def configure(self, config: Dict[str, Any]) -> str:
+        """
+        Send a configuration in the ndl-diff config schema.
+
+        :param config: Configuration like {"normalizers": [{"type": ...}]}.
+        :return: Id of the configuration.
+        """
+        return self._request({"op": "configure", "config": config})["config_id"]
+
+    def baseline(self, document: Any, config_id: Optional[str] = None) -> str:
+        """
+        Send a baseline that documents will be diffed against.
+
+        :param document: Expected document.
+        :param config_id: Configuration to sort it with.  None for the default.
+        :return: Id of the baseline.
+        """
+        request = {"op": "baseline", "config_id": config_id, "document": document}
+        return self._request(request)["baseline_id"]
+
+    def diff(
+        self,
+        left: Any,
+        right: Any = None,
+        *,
+        baseline_id: Optional[str] = None,
+        config_id: Optional[str] = None,
+    ) -> DiffResult:
+        """
+        Diff a document against another document or a baseline.
+
+        :param left: Test document.
+        :param right: Expected document if there is no baseline_id.
+        :param baseline_id: Baseline to diff against.
+        :param config_id: Configuration for the diff.  None for the default.
+        :return: Result of the diff.
+        """
+        request = {"op": "diff", "config_id": config_id, "left": left}
+        if baseline_id is None:
+            request["right"] = right
+        else:
+            request["baseline_id"] = baseline_id
+        response = self._request(request)
+        return DiffResult(response["match"], response["support"], response["partial"])
+
+    def _request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self._file.write(json.dumps(request).encode() + b"\n")
+            self._file.flush()
+            line = self._file.readline()
+        if not line:
+            raise DiffServerError("The server closed the connection.")
+        response = json.loads(line)
+        if "error" in response:
+            raise DiffServerError(response["error"])
+        return response
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self) -> "DiffClient":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m ndl_tools.server", description="Serve diffs on a socket."
+    )
+    parser.add_argument("socket", help="Path of the Unix domain socket.")
+    parser.add_argument("-j", "--workers", type=int, help="Worker processes.")
+    args = parser.parse_args(argv)
+
+    with DiffServer(args.socket, workers=args.workers) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
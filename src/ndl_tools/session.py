@@ -0,0 +1,270 @@
+"""
+Incremental re-diff of a pair of NDLs that change a little between diffs, like a
+contract test loop where one side is edited and diffed again.  The session keeps
+the sorted subtrees from the last diff by fingerprint and the rendered rows of
+each top level section, so only the edited subtrees are sorted again and only
+the edited sections are line diffed again.
+"""
+from difflib import HtmlDiff
+from json import JSONEncoder
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from .differ import DiffResult, Differ
+from .formatter import Formatter
+from .list_sorter import BaseListSorter, LIST_SORTERS
+from .normalizer import BaseNormalizer, NORMALIZERS
+from .pruner import BasePruner, DROP, NOT_PRUNED, PRUNERS
+from .snapshot import raw_fingerprint
+from .sorter import Sorter, SortedList, SortedMapping
+
+_MISSING = object()
+# Sections for the braces around the top level keys.
+_OPEN = ("{",)
+_CLOSE = ("}",)
+
+
+class DiffSession:
+    """
+    Diff the same pair of NDLs repeatedly, reusing the work from the last diff.
+    """
+
+    def __init__(
+        self,
+        cls: Optional[Type[JSONEncoder]] = None,
+        sorters: LIST_SORTERS = None,
+        normalizers: NORMALIZERS = None,
+        max_col_width: Optional[int] = 20,
+        pruners: PRUNERS = None,
+    ):
+        """
+        Set up the configuration used for every diff in the session.
+
+        :param cls: JSON Encoder if any fields aren't JSON encodable.
+        :param sorters: Sorters for list elements.
+        :param normalizers: Normalizers for leaf elements.
+        :param max_col_width: Maximum column width of diff output.
+        :param pruners: Pruners for branches to drop or replace without diffing them.
+        """
+        self._cls = cls
+        if sorters:
+            sorters = sorters if isinstance(sorters, list) else [sorters]
+        if normalizers:
+            normalizers = (
+                normalizers if isinstance(normalizers, list) else [normalizers]
+            )
+        if pruners:
+            pruners = pruners if isinstance(pruners, list) else [pruners]
+        self._sorters = sorters
+        self._normalizers = normalizers
+        self._pruners = pruners
+        self._max_col_width = max_col_width
+
+        # Without selectors a subtree sorts the same wherever it is, so it can be
+        # reused by fingerprint alone.  Otherwise the path is part of the key.
+        components = (
+            (self._sorters or []) + (self._normalizers or []) + (self._pruners or [])
+        )
+        self._path_independent = not any(c._selectors for c in components)
+
+        # Sorted subtrees and rendered sections from the last diff and this one.
+        self._last_sorted: Dict[Tuple, Any] = {}
+        self._next_sorted: Dict[Tuple, Any] = {}
+        self._last_sections: Dict[Tuple, Tuple] = {}
+        self._next_sections: Dict[Tuple, Tuple] = {}
+
+        # Counts for the last diff.
+        self.reused_subtrees = 0
+        self.sorted_subtrees = 0
+        self.reused_sections = 0
+        self.diffed_sections = 0
+
+    def diff(self, left: Any, right: Any) -> DiffResult:
+        """
+        Show the difference of two objects.  The result is the same as Differ.diff()
+        except that the line diff is done one top level key at a time.
+
+        :param left: Test object
+        :param right: Expected object
+        :return: True if match.
+        """
+        self.reused_subtrees = self.sorted_subtrees = 0
+        self.reused_sections = self.diffed_sections = 0
+
+        fingerprints: Dict[int, bytes] = {}
+        sorted_left = self._sorted(left, Path(), fingerprints)
+        sorted_right = self._sorted(right, Path(), fingerprints)
+        self._last_sorted, self._next_sorted = self._next_sorted, {}
+
+        match, rows = self._rows(sorted_left, sorted_right)
+        self._last_sections, self._next_sections = self._next_sections, {}
+        return DiffResult(match, "\n".join(rows))
+
+    def _sorted(self, data: Any, path: Path, fingerprints: Dict[int, bytes]) -> Any:
+        """
+        Sort an element, reusing the sorted subtree from the last diff if its
+        fingerprint hasn't changed.  Mirrors Sorter._sorted().
+
+        :param data: Object to sort.
+        :param path: Path to the current element.
+        :param fingerprints: Fingerprints of the raw containers in this diff by id.
+        :return: Sorted object.
+        """
+        if self._pruners:
+            pruned = BasePruner.prune(data, path, self._pruners)
+            if pruned is not NOT_PRUNED:
+                return pruned
+
+        handler = Sorter._handler(data)
+        if handler is None:
+            return BaseNormalizer.normalize(data, path, self._normalizers)
+
+        try:
+            key = (
+                None if self._path_independent else str(path),
+                raw_fingerprint(data, fingerprints),
+            )
+        except TypeError:
+            # A leaf that can't be fingerprinted, the subtree is always sorted.
+            key = None
+        node = _MISSING
+        if key is not None:
+            node = self._next_sorted.get(key, _MISSING)
+            if node is _MISSING:
+                node = self._last_sorted.get(key, _MISSING)
+        if node is not _MISSING:
+            self.reused_subtrees += 1
+            self._next_sorted[key] = node
+            return node
+
+        self.sorted_subtrees += 1
+        if handler is SortedMapping:
+            items = (
+                (k, self._sorted(data[k], path / str(k), fingerprints))
+                for k in sorted(data.keys())
+            )
+            node = SortedMapping._from_sorted((k, v) for k, v in items if v is not DROP)
+        elif handler is SortedList:
+            children = None
+            if not self._pruners:
+                children = BaseNormalizer.normalize_batch(
+                    data, path, self._normalizers
+                )
+            if children is None:
+                children = [
+                    self._sorted(v, path / f"[{i}]", fingerprints)
+                    for i, v in enumerate(data)
+                ]
+                children = [v for v in children if v is not DROP]
+            node = SortedList._from_sorted(
+                BaseListSorter.sorted(children, path, self._sorters)
+            )
+        else:
+            node = handler(data, path, self._sorters, self._normalizers, self._pruners)
+        if key is not None:
+            self._next_sorted[key] = node
+        return node
+
+    def _rows(self, sorted_left: Any, sorted_right: Any) -> Tuple[bool, List[str]]:
+        """
+        Render the diff rows.  If both sides are mappings each top level key is a
+        section that is line diffed on its own, otherwise the whole object is.
+
+        :param sorted_left: Sorted test object.
+        :param sorted_right: Sorted expected object.
+        :return: Match and rows.
+        """
+        if not (
+            isinstance(sorted_left, dict)
+            and isinstance(sorted_right, dict)
+            and sorted_left
+            and sorted_right
+        ):
+            return self._section(None, sorted_left, sorted_right, True, True)
+
+        match, rows = self._section(_OPEN, None, None, True, True)
+        left_last = list(sorted_left)[-1]
+        right_last = list(sorted_right)[-1]
+        for k in sorted(set(sorted_left) | set(sorted_right)):
+            section_match, section_rows = self._section(
+                k,
+                sorted_left.get(k, _MISSING),
+                sorted_right.get(k, _MISSING),
+                k == left_last,
+                k == right_last,
+            )
+            match = match and section_match
+            rows.extend(section_rows)
+        _, closing_rows = self._section(_CLOSE, None, None, True, True)
+        return match, rows + closing_rows
+
+    def _section(
+        self, key: Any, left: Any, right: Any, left_last: bool, right_last: bool
+    ) -> Tuple[bool, List[str]]:
+        """
+        Line diff one section, reusing the rows from the last diff if both sides
+        of the section are the same sorted subtrees as last time.
+
+        :param key: Top level key, None for the whole object or _OPEN and _CLOSE for
+            the braces around the sections.
+        :param left: Left value or _MISSING.
+        :param right: Right value or _MISSING.
+        :param left_last: True if this is the last key on the left.
+        :param right_last: True if this is the last key on the right.
+        :return: Match and rows.
+        """
+        cache_key = (key, _identity(left), _identity(right), left_last, right_last)
+        cached = self._next_sections.get(cache_key) or self._last_sections.get(
+            cache_key
+        )
+        if cached is not None:
+            self.reused_sections += 1
+            self._next_sections[cache_key] = cached
+            return cached[2], list(cached[3])
+
+        self.diffed_sections += 1
+        if key is _OPEN or key is _CLOSE:
+            left_lines = right_lines = list(key)
+        elif key is None:
+            left_lines, right_lines = Differ._jsonified(left, right, self._cls)
+        else:
+            left_lines, right_lines = Differ._jsonified(
+                _one_key_mapping(key, left), _one_key_mapping(key, right), self._cls
+            )
+            left_lines = _inner_lines(left_lines, left_last)
+            right_lines = _inner_lines(right_lines, right_last)
+
+        html = HtmlDiff().make_file(left_lines, right_lines)
+        match, support = Formatter(max_col_width=self._max_col_width).format(html)
+        rows = support.split("\n") if support else []
+        # The subtrees are held so that their ids can't be reused by other objects.
+        self._next_sections[cache_key] = (left, right, match, rows)
+        return match, list(rows)
+
+
+def _identity(value: Any) -> Any:
+    """
+    Key for a sorted value in the section cache.  Sorted containers are reused
+    between diffs so they are identified by id, leaves are normalized again on each
+    diff so they are identified by value when they can be hashed.
+    """
+    if isinstance(value, (SortedMapping, SortedList)):
+        return id(value)
+    try:
+        hash(value)
+    except TypeError:
+        return id(value)
+    return type(value), value
+
+
+def _one_key_mapping(key: Any, value: Any) -> SortedMapping:
+    """Mapping of just the key, empty if the value is _MISSING."""
+    return SortedMapping._from_sorted([] if value is _MISSING else [(key, value)])
+
+
+def _inner_lines(lines: List[str], last: bool) -> List[str]:
+    """Lines of a one key mapping without the braces, with a comma unless last."""
+    lines = lines[1:-1]
+    if lines and not last:
+        lines[-1] = f"{lines[-1]},"
+    return lines
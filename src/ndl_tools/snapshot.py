@@ -0,0 +1,666 @@
+"""
+Binary snapshots of sorted NDLs.  A snapshot is written once from a baseline and
+opened with mmap, so opening it doesn't read or parse the file.  Elements are
+read from the snapshot as they are used: mappings and lists are views that find
+their children by offset, and NumPy arrays are read only views of the mapped file.
+
+Every element has a fingerprint of its sorted contents.  Differ.diff_snapshot()
+compares a test object against a snapshot by fingerprint and only reads the
+elements of the snapshot that differ.
+
+Layout, little endian:
+
+    header:  b"NDLSNAP\\0", version u32, reserved u32, root offset u64
+    element: tag u8, fingerprint 16 bytes, payload
+
+The children of an element are written before it, so a mapping or list payload is
+the number of children and their offsets, (key offset, value offset) pairs for a
+mapping.  A snapshot has to be compared with objects sorted with the same sorters,
+normalizers and pruners it was written with.
+
+Leaves that aren't JSON types, NumPy arrays or bytes-like are pickled.  Unpickling
+can run any code in the file, so a Snapshot only reads pickled leaves when it is
+opened with allow_pickle=True.
+"""
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+from collections.abc import Mapping as AbcMapping, Sequence
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .list_sorter import LIST_SORTERS
+from .normalizer import NORMALIZERS
+from .pruner import PRUNERS
+from .optional import import_numpy, loaded_numpy
+from .sorter import CompactList, NDLElement, Sorter, SortedList, SortedMapping
+
+MAGIC = b"NDLSNAP\0"
+VERSION = 1
+FINGERPRINT_SIZE = 16
+# Alignment of the data of NumPy arrays in the file.
+ARRAY_ALIGNMENT = 16
+
+_HEADER = struct.Struct("<8sIIQ")
+_U64 = struct.Struct("<Q")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+_ELEMENT_HEAD = 1 + FINGERPRINT_SIZE
+
+NONE = b"N"
+TRUE = b"T"
+FALSE = b"F"
+INT = b"I"
+BIG_INT = b"J"
+FLOAT = b"D"
+STR = b"S"
+BYTES = b"B"
+ARRAY = b"A"
+PICKLE = b"P"
+MAPPING = b"M"
+LIST = b"L"
+
+_MISSING = object()
+
+_I64_MIN = -(2 ** 63)
+_I64_MAX = 2 ** 63 - 1
+
+
+class NotSnapshotError(Exception):
+    """The file isn't a snapshot or was written by an unsupported version."""
+
+
+def _digest(*parts: Any) -> bytes:
+    digest = hashlib.blake2b(digest_size=FINGERPRINT_SIZE)
+    for part in parts:
+        digest.update(part)
+    return digest.digest()
+
+
+def _is_mapping(data: Any) -> bool:
+    return type(data) is SortedMapping or isinstance(data, AbcMapping)
+
+
+def _is_list(data: Any) -> bool:
+    return type(data) is SortedList or isinstance(data, (list, CompactList))
+
+
+def _is_array(data: Any) -> bool:
+    numpy = loaded_numpy()
+    return (
+        numpy is not None
+        and isinstance(data, numpy.ndarray)
+        and not data.dtype.hasobject
+    )
+
+
+def _leaf(data: Any) -> Tuple[bytes, Any]:
+    """
+    Tag and payload of a leaf.  The payload of an array is (header, array).
+
+    :raises TypeError: If the leaf isn't a known type and can't be pickled.
+    """
+    if data is None:
+        return NONE, b""
+    if data is True:
+        return TRUE, b""
+    if data is False:
+        return FALSE, b""
+    if type(data) is int:
+        if _I64_MIN <= data <= _I64_MAX:
+            return INT, _I64.pack(data)
+        return BIG_INT, _sized(str(data).encode())
+    if type(data) is float:
+        return FLOAT, _F64.pack(data)
+    if type(data) is str:
+        return STR, _sized(data.encode("utf-8", "surrogatepass"))
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return BYTES, _sized(bytes(data))
+    if _is_array(data):
+        data = loaded_numpy().ascontiguousarray(data)
+        dtype = data.dtype.str.encode()
+        header = b"".join(
+            [
+                _U64.pack(len(dtype)),
+                dtype,
+                _U64.pack(data.ndim),
+                *(_U64.pack(n) for n in data.shape),
+                _U64.pack(data.nbytes),
+            ]
+        )
+        return ARRAY, (header, data)
+    try:
+        return PICKLE, _sized(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+    except Exception as e:
+        raise TypeError(f"Can't encode {type(data).__name__} leaf: {e}") from e
+
+
+def _sized(payload: bytes) -> bytes:
+    return _U64.pack(len(payload)) + payload
+
+
+def _leaf_fingerprint(tag: bytes, payload: Any) -> bytes:
+    if tag == ARRAY:
+        header, data = payload
+        return _digest(tag, header, data.reshape(-1).view("u1").data)
+    return _digest(tag, payload)
+
+
+def _encoded(
+    data: Any,
+    memo: Dict[int, bytes],
+    container_fingerprint: Optional[Callable[[Any, Dict[int, bytes]], bytes]] = None,
+) -> bytes:
+    """
+    Element as it is hashed into the fingerprint of its parent.  The tag and
+    payload of a leaf, or the tag and fingerprint of a mapping, list or array, so
+    the leaves of a mapping or list are hashed with one call.  Mappings and lists
+    are fingerprinted with container_fingerprint, _fingerprint() by default.
+    """
+    # The common leaves first.
+    type_ = type(data)
+    if type_ is str:
+        payload = data.encode("utf-8", "surrogatepass")
+        return b"".join((STR, _U64.pack(len(payload)), payload))
+    if type_ is float:
+        return FLOAT + _F64.pack(data)
+    if type_ is int and _I64_MIN <= data <= _I64_MAX:
+        return INT + _I64.pack(data)
+    if _is_mapping(data):
+        return MAPPING + (container_fingerprint or _fingerprint)(data, memo)
+    if _is_list(data):
+        return LIST + (container_fingerprint or _fingerprint)(data, memo)
+    tag, payload = _leaf(data)
+    if tag == ARRAY:
+        return tag + _leaf_fingerprint(tag, payload)
+    return tag + payload
+
+
+def fingerprint(data: NDLElement, memo: Optional[Dict[int, bytes]] = None) -> bytes:
+    """
+    Fingerprint of a sorted element.  The same as the fingerprint of the element
+    in a snapshot.
+
+    :param data: Sorted element.
+    :param memo: Fingerprints of the containers already seen by id.  The
+        containers must stay alive while the memo is used.
+    :return: Fingerprint.
+    """
+    if memo is None:
+        memo = {}
+    try:
+        return _fingerprint(data, memo)
+    except RecursionError:
+        return _children_first(data, memo, _fingerprint)
+
+
+def _fingerprint(data: NDLElement, memo: Dict[int, bytes]) -> bytes:
+    if _is_mapping(data):
+        found = memo.get(id(data))
+        if found is None:
+            parts = [MAPPING]
+            for key, value in data.items():
+                parts.append(_encoded(key, memo))
+                parts.append(_encoded(value, memo))
+            found = memo[id(data)] = _digest(b"".join(parts))
+        return found
+    if _is_list(data):
+        found = memo.get(id(data))
+        if found is None:
+            parts = [LIST]
+            parts.extend(_encoded(value, memo) for value in data)
+            found = memo[id(data)] = _digest(b"".join(parts))
+        return found
+    return _leaf_fingerprint(*_leaf(data))
+
+
+def raw_fingerprint(data: Any, memo: Optional[Dict[int, bytes]] = None) -> bytes:
+    """
+    Fingerprint of an unsorted element that doesn't depend on the order of the
+    keys of its mappings.  Leaves are encoded with their type like in a snapshot,
+    so leaves that aren't the same, like -1 and -2 or 1 and 1.0, never share a
+    fingerprint even if their hashes collide.
+
+    :param data: Raw element.
+    :param memo: Fingerprints of the containers already seen by id.  The
+        containers must stay alive and unchanged while the memo is used.
+    :return: Fingerprint.
+    :raises TypeError: If a leaf isn't a known type and can't be pickled.
+    """
+    if memo is None:
+        memo = {}
+    try:
+        return _raw_fingerprint(data, memo)
+    except RecursionError:
+        return _children_first(data, memo, _raw_fingerprint)
+
+
+def _raw_fingerprint(data: Any, memo: Dict[int, bytes]) -> bytes:
+    if _is_mapping(data):
+        found = memo.get(id(data))
+        if found is None:
+            # Each encoding is self delimiting, so the sorted pairs are too.
+            pairs = sorted(
+                _encoded(key, memo, _raw_fingerprint)
+                + _encoded(value, memo, _raw_fingerprint)
+                for key, value in data.items()
+            )
+            found = memo[id(data)] = _digest(MAPPING, *pairs)
+        return found
+    if _is_list(data):
+        found = memo.get(id(data))
+        if found is None:
+            parts = [LIST]
+            parts.extend(_encoded(value, memo, _raw_fingerprint) for value in data)
+            found = memo[id(data)] = _digest(b"".join(parts))
+        return found
+    return _leaf_fingerprint(*_leaf(data))
+
+
+def _children_first(
+    data: Any,
+    memo: Dict[int, bytes],
+    container_fingerprint: Callable[[Any, Dict[int, bytes]], bytes],
+) -> bytes:
+    """
+    Fingerprint an element too deep to fingerprint recursively.  The mappings and
+    lists in it are fingerprinted children first with an explicit stack, so each
+    one finds the fingerprints of its children in the memo.
+    """
+    stack = [(data, False)]
+    while stack:
+        element, children_done = stack.pop()
+        if children_done:
+            container_fingerprint(element, memo)
+        elif (_is_mapping(element) or _is_list(element)) and id(element) not in memo:
+            stack.append((element, True))
+            children = element.values() if _is_mapping(element) else element
+            stack.extend((child, False) for child in children)
+    return container_fingerprint(data, memo)
+
+
+class _Writer:
+    """Write the elements of a sorted NDL, children before their parents."""
+
+    def __init__(self, fp: BinaryIO):
+        self.fp = fp
+        self.offset = 0
+        # Fingerprint of the element written last, the root at the end.
+        self.last_fingerprint = b""
+
+    def write(self, *parts: Any):
+        for part in parts:
+            self.fp.write(part)
+            self.offset += len(part)
+
+    def element(self, data: Any) -> Tuple[int, bytes]:
+        """
+        Write an element.
+
+        :return: Offset of the element and the element as it is hashed into the
+            fingerprint of its parent.
+        """
+        if _is_mapping(data):
+            offsets = []
+            parts = [MAPPING]
+            for key, value in data.items():
+                key_offset, key_encoded = self.element(key)
+                value_offset, value_encoded = self.element(value)
+                offsets.extend((key_offset, value_offset))
+                parts.extend((key_encoded, value_encoded))
+            return self.container(MAPPING, parts, len(data), offsets)
+        if _is_list(data):
+            offsets = []
+            parts = [LIST]
+            for value in data:
+                offset, value_encoded = self.element(value)
+                offsets.append(offset)
+                parts.append(value_encoded)
+            return self.container(LIST, parts, len(data), offsets)
+
+        tag, payload = _leaf(data)
+        element_fingerprint = self.last_fingerprint = _leaf_fingerprint(tag, payload)
+        offset = self.offset
+        if tag == ARRAY:
+            header, array = payload
+            self.write(tag, element_fingerprint, header)
+            self.write(b"\0" * (-self.offset % ARRAY_ALIGNMENT))
+            self.write(array.reshape(-1).view("u1").data)
+            return offset, tag + element_fingerprint
+        self.write(tag, element_fingerprint, payload)
+        return offset, tag + payload
+
+    def container(
+        self, tag: bytes, parts: List[bytes], count: int, offsets: List[int]
+    ) -> Tuple[int, bytes]:
+        offset = self.offset
+        element_fingerprint = self.last_fingerprint = _digest(b"".join(parts))
+        self.write(
+            tag,
+            element_fingerprint,
+            _U64.pack(count),
+            struct.pack(f"<{len(offsets)}Q", *offsets),
+        )
+        return offset, tag + element_fingerprint
+
+
+def write_snapshot(
+    data: NDLElement,
+    path: Union[str, Path],
+    sorters: LIST_SORTERS = None,
+    normalizers: NORMALIZERS = None,
+    pruners: PRUNERS = None,
+) -> bytes:
+    """
+    Sort an object and write it as a snapshot.  Leaves that aren't JSON types,
+    NumPy arrays or bytes-like are pickled, and the snapshot has to be opened with
+    allow_pickle=True to read them.
+
+    :param data: Object like a baseline.
+    :param path: Snapshot file.
+    :param sorters: Sorters for list elements.
+    :param normalizers: Normalizers for leaf elements.
+    :param pruners: Pruners for branches to drop or replace.
+    :return: Fingerprint of the sorted object.
+    """
+    sorted_data = Sorter.sorted(
+        data, sorters=sorters, normalizers=normalizers, pruners=pruners
+    )
+    with open(path, "wb") as fp:
+        writer = _Writer(fp)
+        writer.write(_HEADER.pack(MAGIC, VERSION, 0, 0))
+        root, _ = writer.element(sorted_data)
+        fp.seek(0)
+        fp.write(_HEADER.pack(MAGIC, VERSION, 0, root))
+    return writer.last_fingerprint
+
+
+class SnapshotMapping(AbcMapping):
+    """Mapping in a snapshot.  The values are read when they are used."""
+
+    def __init__(self, snapshot: "Snapshot", offset: int):
+        self._snapshot = snapshot
+        self.offset = offset
+        self._offsets: Optional[Dict[Any, int]] = None
+
+    @property
+    def fingerprint(self) -> bytes:
+        return self._snapshot.fingerprint(self.offset)
+
+    def _value_offsets(self) -> Dict[Any, int]:
+        if self._offsets is None:
+            self._offsets = {
+                self._snapshot.element(key_offset): value_offset
+                for key_offset, value_offset in self._snapshot._items(self.offset)
+            }
+        return self._offsets
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._snapshot.element(self._value_offsets()[key])
+
+    def __iter__(self) -> Iterator:
+        return iter(self._value_offsets())
+
+    def __len__(self) -> int:
+        return self._snapshot._count(self.offset)
+
+    def __repr__(self) -> str:
+        return f"SnapshotMapping({len(self)} keys at {self.offset})"
+
+
+class SnapshotList(Sequence):
+    """List in a snapshot.  The elements are read when they are used."""
+
+    def __init__(self, snapshot: "Snapshot", offset: int):
+        self._snapshot = snapshot
+        self.offset = offset
+
+    @property
+    def fingerprint(self) -> bytes:
+        return self._snapshot.fingerprint(self.offset)
+
+    def __getitem__(self, i: Any) -> Any:
+        offsets = self._snapshot._offsets(self.offset)
+        if isinstance(i, slice):
+            return [self._snapshot.element(offset) for offset in offsets[i]]
+        return self._snapshot.element(offsets[i])
+
+    def __len__(self) -> int:
+        return self._snapshot._count(self.offset)
+
+    def __repr__(self) -> str:
+        return f"SnapshotList({len(self)} elements at {self.offset})"
+
+
+class Snapshot:
+    """
+    Snapshot file opened with mmap.
+
+        with Snapshot("baseline.ndls") as baseline:
+            price = baseline.get("orders/[3]/price")
+    """
+
+    def __init__(self, path: Union[str, Path], allow_pickle: bool = False):
+        """
+        :param path: Snapshot file written by write_snapshot().
+        :param allow_pickle: Read pickled leaves.  Only for trusted files, since
+            unpickling can run any code.
+        """
+        self.path = Path(path)
+        self.allow_pickle = allow_pickle
+        with open(self.path, "rb") as fp:
+            if os.fstat(fp.fileno()).st_size < _HEADER.size:
+                raise NotSnapshotError(f"{path} is too short to be a snapshot.")
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self._root = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise NotSnapshotError(f"{path} isn't a version {VERSION} snapshot.")
+
+    @property
+    def root(self) -> Any:
+        """Root element of the snapshot."""
+        return self.element(self._root)
+
+    def get(self, path: Union[str, Path]) -> Any:
+        """
+        Element by path.  Only the mappings and lists on the path are read.
+
+        :param path: Path like orders/[3]/price.
+        :return: Element.
+        """
+        element = self.root
+        for part in Path(path).parts:
+            if isinstance(element, SnapshotList):
+                if not (part.startswith("[") and part.endswith("]")):
+                    raise KeyError(path)
+                try:
+                    element = element[int(part[1:-1])]
+                except (ValueError, IndexError):
+                    raise KeyError(path)
+            elif isinstance(element, SnapshotMapping):
+                element = element[part]
+            else:
+                raise KeyError(path)
+        return element
+
+    def fingerprint(self, offset: Optional[int] = None) -> bytes:
+        """
+        Fingerprint of an element.
+
+        :param offset: Offset of the element.  None for the root.
+        :return: Fingerprint.
+        """
+        offset = self._root if offset is None else offset
+        return self._mmap[offset + 1 : offset + _ELEMENT_HEAD]
+
+    def element(self, offset: int) -> Any:
+        """
+        Element at an offset.  Mappings and lists are views.
+
+        :param offset: Offset of the element.
+        :return: Element.
+        """
+        tag = self._mmap[offset : offset + 1]
+        if tag == MAPPING:
+            return SnapshotMapping(self, offset)
+        if tag == LIST:
+            return SnapshotList(self, offset)
+        return self._leaf(tag, offset + _ELEMENT_HEAD)
+
+    def materialize(self, offset: Optional[int] = None) -> Any:
+        """
+        Read an element and all of its children into a SortedMapping or
+        SortedList.
+
+        :param offset: Offset of the element.  None for the root.
+        :return: Sorted element.
+        """
+        offset = self._root if offset is None else offset
+        tag = self._mmap[offset : offset + 1]
+        if tag == MAPPING:
+            return SortedMapping._from_sorted(
+                (self.element(key_offset), self.materialize(value_offset))
+                for key_offset, value_offset in self._items(offset)
+            )
+        if tag == LIST:
+            return SortedList._from_sorted(
+                self.materialize(child) for child in self._offsets(offset)
+            )
+        return self._leaf(tag, offset + _ELEMENT_HEAD)
+
+    def rebuild(self, other: NDLElement, memo: Optional[Dict[int, bytes]] = None):
+        """
+        Sorted object of the snapshot built from the elements of another sorted
+        object wherever their fingerprints match.  Only the elements that differ
+        are read from the snapshot.
+
+        :param other: Sorted object, like a test object.
+        :param memo: Fingerprints of the containers of other by id.
+        :return: Sorted object equal to the snapshot's.
+        """
+        return self._rebuild(self._root, other, {} if memo is None else memo)
+
+    def _rebuild(self, offset: int, other: Any, memo: Dict[int, bytes]) -> Any:
+        if fingerprint(other, memo) == self.fingerprint(offset):
+            return other
+        tag = self._mmap[offset : offset + 1]
+        if tag == MAPPING and _is_mapping(other):
+            items = []
+            for key_offset, value_offset in self._items(offset):
+                key = self.element(key_offset)
+                if key in other:
+                    items.append((key, self._rebuild(value_offset, other[key], memo)))
+                else:
+                    items.append((key, self.materialize(value_offset)))
+            return SortedMapping._from_sorted(items)
+        if tag == LIST and _is_list(other):
+            # Elements are matched by fingerprint since an added or removed
+            # element shifts the ones after it.
+            by_fingerprint = {fingerprint(value, memo): value for value in other}
+            children = []
+            for i, child in enumerate(self._offsets(offset)):
+                value = by_fingerprint.get(self.fingerprint(child), _MISSING)
+                if value is not _MISSING:
+                    children.append(value)
+                elif i < len(other):
+                    children.append(self._rebuild(child, other[i], memo))
+                else:
+                    children.append(self.materialize(child))
+            return SortedList._from_sorted(children)
+        return self.materialize(offset)
+
+    def _count(self, offset: int) -> int:
+        return _U64.unpack_from(self._mmap, offset + _ELEMENT_HEAD)[0]
+
+    def _offsets(self, offset: int) -> Tuple[int, ...]:
+        count = self._count(offset)
+        if self._mmap[offset : offset + 1] == MAPPING:
+            count *= 2
+        start = offset + _ELEMENT_HEAD + _U64.size
+        return struct.unpack_from(f"<{count}Q", self._mmap, start)
+
+    def _items(self, offset: int) -> Iterator[Tuple[int, int]]:
+        offsets = self._offsets(offset)
+        return zip(offsets[::2], offsets[1::2])
+
+    def _leaf(self, tag: bytes, start: int) -> Any:
+        if tag == NONE:
+            return None
+        if tag == TRUE:
+            return True
+        if tag == FALSE:
+            return False
+        if tag == INT:
+            return _I64.unpack_from(self._mmap, start)[0]
+        if tag == FLOAT:
+            return _F64.unpack_from(self._mmap, start)[0]
+        if tag == ARRAY:
+            return self._array(start)
+
+        size = _U64.unpack_from(self._mmap, start)[0]
+        start += _U64.size
+        payload = self._mmap[start : start + size]
+        if tag == STR:
+            return payload.decode("utf-8", "surrogatepass")
+        if tag == BIG_INT:
+            return int(payload)
+        if tag == BYTES:
+            return payload
+        if tag == PICKLE:
+            if not self.allow_pickle:
+                raise ValueError(
+                    f"{self.path} has a pickled leaf, open it with allow_pickle=True "
+                    "if it is trusted."
+                )
+            return pickle.loads(payload)
+        raise NotSnapshotError(f"Unknown element tag {tag!r} in {self.path}")
+
+    def _array(self, start: int) -> Any:
+        """Read only NumPy array on the mapped file."""
+        dtype_size = _U64.unpack_from(self._mmap, start)[0]
+        start += _U64.size
+        dtype = self._mmap[start : start + dtype_size].decode()
+        start += dtype_size
+        ndim = _U64.unpack_from(self._mmap, start)[0]
+        start += _U64.size
+        shape = struct.unpack_from(f"<{ndim}Q", self._mmap, start)
+        start += ndim * _U64.size
+        nbytes = _U64.unpack_from(self._mmap, start)[0]
+        start += _U64.size
+        start += -start % ARRAY_ALIGNMENT
+        numpy = import_numpy()
+        if nbytes == 0:
+            return numpy.empty(shape, dtype=dtype)
+        array = numpy.frombuffer(
+            self._mmap, dtype=numpy.uint8, count=nbytes, offset=start
+        )
+        return array.view(dtype).reshape(shape)
+
+    def close(self):
+        """
+        Close the mapped file.  If arrays read from the snapshot are still in use
+        the file is closed when they are garbage collected.
+        """
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
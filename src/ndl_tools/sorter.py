@@ -5,11 +5,29 @@ just that it is consistent.
 Alternative ListSorters can be applied to elements selected by the
 by Selectors.
 """
+import dataclasses
+import json
+from bisect import bisect_left
+from concurrent.futures import Executor
+from collections.abc import Mapping as AbcMapping, Sequence
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Union, Mapping, Optional, List, Dict
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Tuple,
+    Union,
+    Mapping,
+    Optional,
+    List,
+    Dict,
+)
 
 from .list_sorter import BaseListSorter, LIST_SORTERS
 from .normalizer import BaseNormalizer, NORMALIZERS
+from .pruner import BasePruner, DROP, NOT_PRUNED, PRUNERS
 
 NDLElement = Union[Mapping, List, Any]
 
@@ -27,6 +45,7 @@ class SortedMapping(dict):
         path: Path,
         sorters: Optional[List[BaseListSorter]] = None,
         normalizers: Optional[List[BaseNormalizer]] = None,
+        pruners: Optional[List[BasePruner]] = None,
     ):
         """
         Construct a new dict that is sorted.
@@ -34,13 +53,25 @@ class SortedMapping(dict):
         :param path: Path to current element.
         :param sorters: Sorters for list elements.
         :param normalizers: Normalizers for leaf nodes.
+        :param pruners: Pruners for branches to skip.
         """
-        super().__init__(
-            **{
-                k: Sorter._sorted(data[k], path / k, sorters, normalizers)
-                for k in sorted(data.keys())
-            }
+        items = (
+            (k, Sorter._sorted(data[k], path / str(k), sorters, normalizers, pruners))
+            for k in sorted(data.keys())
         )
+        super().__init__((k, v) for k, v in items if v is not DROP)
+
+    @classmethod
+    def _from_sorted(cls, items: Iterable[Tuple[Any, Any]]) -> "SortedMapping":
+        """
+        Build a SortedMapping from key/value pairs that are already in sorted
+        key order and whose values have already been sorted and normalized.
+        :param items: Sorted key/value pairs.
+        :return: SortedMapping
+        """
+        mapping = cls.__new__(cls)
+        dict.__init__(mapping, items)
+        return mapping
 
     def __lt__(self, other) -> bool:
         """
@@ -70,6 +101,7 @@ class SortedList(list):
         path: Path,
         sorters: Optional[List[BaseListSorter]] = None,
         normalizers: Optional[List[BaseNormalizer]] = None,
+        pruners: Optional[List[BasePruner]] = None,
     ):
         """
         Construct a new list that is sorted.
@@ -77,13 +109,31 @@ class SortedList(list):
         :param path: Path to the current element.
         :param sorters: Sorters for list elements.
         :param normalizers: Normalizers for leaf elements.
+        :param pruners: Pruners for branches to skip.
         """
-        sorted_children = [
-            Sorter._sorted(v, path / f"[{i}]", sorters, normalizers)
-            for i, v in enumerate(list_)
-        ]
+        sorted_children = None
+        if not pruners:
+            sorted_children = BaseNormalizer.normalize_batch(list_, path, normalizers)
+        if sorted_children is None:
+            sorted_children = [
+                Sorter._sorted(v, path / f"[{i}]", sorters, normalizers, pruners)
+                for i, v in enumerate(list_)
+            ]
+        if pruners:
+            sorted_children = [v for v in sorted_children if v is not DROP]
         super().__init__(BaseListSorter.sorted(sorted_children, path, sorters))
 
+    @classmethod
+    def _from_sorted(cls, list_: Iterable) -> "SortedList":
+        """
+        Build a SortedList from elements that have already been sorted and normalized.
+        :param list_: Sorted elements.
+        :return: SortedList
+        """
+        sorted_list = cls.__new__(cls)
+        list.__init__(sorted_list, list_)
+        return sorted_list
+
     def __lt__(self, other) -> bool:
         """
         Compare two objects.  If they are both SortedList then compare them
@@ -99,13 +149,381 @@ class SortedList(list):
             return str(self.__class__) < str(other.__class__)
 
 
+class CompactMapping(AbcMapping):
+    """
+    Immutable, hashable sorted mapping.  Slotted, so there is no per-instance
+    __dict__.  The keys are stored as a tuple that is shared by all the mappings
+    with the same keys and the values as a tuple in key order.  The hash is
+    cached so using a large subtree as a dict key only hashes it once.
+    """
+
+    __slots__ = ("_keys", "_values", "_hash")
+
+    def __init__(self, keys: Tuple, values: Tuple):
+        """
+        :param keys: Keys in sorted order.
+        :param values: Values in key order.
+        """
+        self._keys = keys
+        self._values = values
+        self._hash = None
+
+    def __getitem__(self, key: Any) -> Any:
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self._values[i]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def keys(self) -> Tuple:
+        """Keys in sorted order."""
+        return self._keys
+
+    def values(self) -> Tuple:
+        """Values in key order."""
+        return self._values
+
+    def items(self) -> Iterable[Tuple[Any, Any]]:
+        """(key, value) pairs in key order."""
+        return zip(self._keys, self._values)
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        return (
+            type(other) is CompactMapping
+            and not _hashes_differ(self, other)
+            and self._keys == other._keys
+            and self._values == other._values
+        )
+
+    def __ne__(self, other) -> bool:
+        return not self == other
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash((self._keys, self._values))
+        return self._hash
+
+    def __lt__(self, other) -> bool:
+        """
+        Compare two objects.  If they are both CompactMapping then compare their
+        items the same way SortedMapping does.  Otherwise, just compare their
+        class types.
+        :param other: Object to compare.
+        :return: bool
+        """
+        if isinstance(other, CompactMapping):
+            return list(self.items()) < list(other.items())
+        else:
+            # The order doesn't really matter here as long as it is consistent.
+            return str(self.__class__) < str(other.__class__)
+
+    def __repr__(self) -> str:
+        return f"CompactMapping({dict(self.items())!r})"
+
+
+class CompactList(Sequence):
+    """
+    Immutable, hashable sorted list.  Slotted, so there is no per-instance
+    __dict__.  The hash is cached.
+    """
+
+    __slots__ = ("_values", "_hash")
+
+    def __init__(self, values: Tuple):
+        """
+        :param values: Values in sorted order.
+        """
+        self._values = values
+        self._hash = None
+
+    def __getitem__(self, i: Any) -> Any:
+        return self._values[i]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        return (
+            type(other) is CompactList
+            and not _hashes_differ(self, other)
+            and self._values == other._values
+        )
+
+    def __ne__(self, other) -> bool:
+        return not self == other
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(self._values)
+        return self._hash
+
+    def __lt__(self, other) -> bool:
+        """
+        Compare two objects.  If they are both CompactList then compare them
+        as tuples.  Otherwise, just compare their class types.
+        :param other: Object to compare.
+        :return: bool
+        """
+        if isinstance(other, CompactList):
+            return self._values < other._values
+        else:
+            # The order doesn't really matter here as long as it is consistent.
+            return str(self.__class__) < str(other.__class__)
+
+    def __repr__(self) -> str:
+        return f"CompactList({list(self._values)!r})"
+
+
+_COMPACT_TYPES = (CompactMapping, CompactList)
+
+
+def _hashes_differ(left: Any, right: Any) -> bool:
+    """
+    True if two compact nodes have different hashes, so they can't be equal.
+    False if either can't be hashed because it has an unhashable leaf, like a
+    NumPy array, and the values have to be compared.
+    """
+    try:
+        return hash(left) != hash(right)
+    except TypeError:
+        return False
+
+
+def _identity(value: Any) -> Tuple:
+    """
+    Identity of a leaf or mapping key by type and value.  1, 1.0 and True are ==,
+    and so are 0.0 and -0.0, so floats are identified by their hex form.
+    """
+    if isinstance(value, float):
+        return type(value), value.hex()
+    return type(value), value
+
+
+class InternTable:
+    """
+    Table of shared CompactMapping/CompactList nodes for hash-consing.  Nodes are
+    built bottom up, so a node is identified by its keys and the identity of its
+    already shared children, and equal subtrees become the same object.  Pass the
+    same table to several Sorter.sorted() calls, like the left and right side of
+    a diff, to share nodes between them so equal subtrees compare by identity.
+    """
+
+    def __init__(self):
+        self._keys: Dict[Tuple, Tuple] = {}
+        self._nodes: Dict[Tuple, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def keys(self, keys: Tuple) -> Tuple:
+        """Shared tuple of mapping keys."""
+        return self._keys.setdefault(tuple(_identity(k) for k in keys), keys)
+
+    def mapping(self, keys: Tuple, values: Tuple) -> CompactMapping:
+        """Shared CompactMapping with the keys and values."""
+        return self._intern(CompactMapping, self.keys(keys), values)
+
+    def list_(self, values: Tuple) -> CompactList:
+        """Shared CompactList with the values."""
+        return self._intern(CompactList, None, values)
+
+    def _intern(self, cls: type, keys: Optional[Tuple], values: Tuple) -> Any:
+        """
+        Look up or add a node.  Shared children are identified by identity.  Leaves
+        are identified by type and value so that 1, 1.0 and True stay distinct.
+        """
+        try:
+            key = (
+                cls,
+                id(keys),
+                tuple(
+                    id(v) if type(v) in _COMPACT_TYPES else _identity(v)
+                    for v in values
+                ),
+            )
+            node = self._nodes.get(key)
+        except TypeError:
+            # Unhashable leaf, like a NumPy array.  The node can't be shared.
+            return cls(keys, values) if keys is not None else cls(values)
+        if node is None:
+            self.misses += 1
+            node = cls(keys, values) if keys is not None else cls(values)
+            self._nodes[key] = node
+        else:
+            self.hits += 1
+        return node
+
+
+# Sorts a container: handler(data, path, sorters, normalizers, pruners).
+CONTAINER_HANDLER = Callable[
+    [
+        Any,
+        Path,
+        Optional[List[BaseListSorter]],
+        Optional[List[BaseNormalizer]],
+        Optional[List[BasePruner]],
+    ],
+    Any,
+]
+
+# Registered container handlers by type.
+_HANDLERS: Dict[type, CONTAINER_HANDLER] = {dict: SortedMapping, list: SortedList}
+# Handler for every type seen so far, including None for leaf types.
+# Cleared on registration.
+_RESOLVED: Dict[type, Optional[CONTAINER_HANDLER]] = dict(_HANDLERS)
+_UNRESOLVED = object()
+
+
+def _resolve_handler(type_: type) -> Optional[CONTAINER_HANDLER]:
+    """
+    Find the handler for a type that hasn't been seen yet.  The closest registered
+    base class in the MRO wins, then any registered abstract base class.
+
+    :param type_: Type of the element.
+    :return: Handler or None if the type is a leaf.
+    """
+    handler = None
+    for base in type_.__mro__:
+        if base in _HANDLERS:
+            handler = _HANDLERS[base]
+            break
+    else:
+        for registered_type, registered_handler in _HANDLERS.items():
+            if issubclass(type_, registered_type):
+                handler = registered_handler
+                break
+    _RESOLVED[type_] = handler
+    return handler
+
+
+def _to_mapping(data: Any) -> Mapping:
+    """Fields of a dataclass or namedtuple as a mapping.  Mappings are unchanged."""
+    if dataclasses.is_dataclass(data):
+        return {f.name: getattr(data, f.name) for f in dataclasses.fields(data)}
+    if hasattr(data, "_asdict"):
+        return data._asdict()
+    return data
+
+
+def _count_nodes(data: Any, limit: int) -> int:
+    """
+    Number of dict/list/leaf nodes.  Counting stops once the limit is passed so
+    the cost is bounded by the limit and not by the size of the object.
+    """
+    count = 0
+    stack = [data]
+    while stack and count <= limit:
+        count += 1
+        element = stack.pop()
+        if isinstance(element, dict):
+            stack.extend(element.values())
+        elif isinstance(element, list):
+            stack.extend(element)
+    return count
+
+
+def _sort_chunk(
+    chunk: List[Tuple[Any, Path]],
+    sorters: Optional[List[BaseListSorter]],
+    normalizers: Optional[List[BaseNormalizer]],
+    pruners: Optional[List[BasePruner]],
+) -> List[Any]:
+    """Sort subtrees at their paths.  Runs in the executor."""
+    return [
+        Sorter._sorted(data, path, sorters, normalizers, pruners)
+        for data, path in chunk
+    ]
+
+
+# Kinds of node in the plan of a parallel sort.
+_TASK, _VALUE, _SPLIT = range(3)
+
+
 class Sorter:
+    @staticmethod
+    def register(type_: type, handler: CONTAINER_HANDLER) -> None:
+        """
+        Register the handler used to sort a container type and its subclasses.
+
+        :param type_: Container type.
+        :param handler: Called as handler(data, path, sorters, normalizers, pruners)
+            to sort the container.
+        """
+        _HANDLERS[type_] = handler
+        _RESOLVED.clear()
+        _RESOLVED.update(_HANDLERS)
+
+    @staticmethod
+    def unregister(type_: type) -> None:
+        """
+        Remove the handler for a container type so that it is treated as a leaf again.
+
+        :param type_: Container type.
+        """
+        _HANDLERS.pop(type_, None)
+        _RESOLVED.clear()
+        _RESOLVED.update(_HANDLERS)
+
+    @staticmethod
+    def register_list(type_: type) -> None:
+        """
+        Sort an iterable container type, like set or tuple, as a list.
+
+        :param type_: Container type.
+        """
+        Sorter.register(type_, SortedList)
+
+    @staticmethod
+    def register_mapping(
+        type_: type, to_mapping: Optional[Callable[[Any], Mapping]] = None
+    ) -> None:
+        """
+        Sort a container type as a mapping.  Dataclasses and namedtuples are
+        converted to a mapping of their fields by default.
+
+        :param type_: Container type.
+        :param to_mapping: Optional conversion of the container to a mapping.
+        """
+        to_mapping = to_mapping or _to_mapping
+
+        def handler(data, path, sorters, normalizers, pruners):
+            return SortedMapping(to_mapping(data), path, sorters, normalizers, pruners)
+
+        Sorter.register(type_, handler)
+
+    @staticmethod
+    def _handler(data: Any) -> Optional[CONTAINER_HANDLER]:
+        """
+        Handler used to sort a container.
+        :param data: Element to sort.
+        :return: Handler or None if the element is a leaf.
+        """
+        handler = _RESOLVED.get(type(data), _UNRESOLVED)
+        if handler is _UNRESOLVED:
+            handler = _resolve_handler(type(data))
+        return handler
+
     @staticmethod
     def _sorted(
         data: NDLElement,
         path: Path,
         sorters: Optional[List[BaseListSorter]] = None,
         normalizers: Optional[List[BaseNormalizer]] = None,
+        pruners: Optional[List[BasePruner]] = None,
     ) -> Union[SortedMapping, SortedList, Any]:
         """
         Sort a nested dictionary/list.  Used internally to keep the path argument from being exposed in the
@@ -114,14 +532,203 @@ class Sorter:
         :param path: Path to the current element.
         :param sorter: Sorter for list elements.
         :param normalizers: List of normalizer for leaf elements.
+        :param pruners: List of pruners for branches to skip.
         :return: Sorted object.
         """
-        if isinstance(data, Dict):
-            return SortedMapping(data, path, sorters, normalizers)
-        elif isinstance(data, List):
-            return SortedList(data, path, sorters, normalizers)
-        else:
+        if pruners:
+            pruned = BasePruner.prune(data, path, pruners)
+            if pruned is not NOT_PRUNED:
+                return pruned
+
+        handler = _RESOLVED.get(type(data), _UNRESOLVED)
+        if handler is _UNRESOLVED:
+            handler = _resolve_handler(type(data))
+        if handler is None:
             return BaseNormalizer.normalize(data, path, normalizers)
+        return handler(data, path, sorters, normalizers, pruners)
+
+    @staticmethod
+    def _sorted_iterative(
+        data: NDLElement,
+        path: Path,
+        sorters: Optional[List[BaseListSorter]] = None,
+        normalizers: Optional[List[BaseNormalizer]] = None,
+        pruners: Optional[List[BasePruner]] = None,
+    ) -> Union[SortedMapping, SortedList, Any]:
+        """
+        Sort a nested dictionary/list with an explicit stack instead of recursion,
+        so there is no limit on the depth and no Python frames per level.  The
+        result is the same as _sorted().  Containers of types registered with
+        their own handler are still sorted by the handler.
+        :param data: Object to sort.
+        :param path: Path to the current element.
+        :param sorter: Sorter for list elements.
+        :param normalizers: List of normalizer for leaf elements.
+        :param pruners: List of pruners for branches to skip.
+        :return: Sorted object.
+        """
+        node, frame = Sorter._enter(data, path, sorters, normalizers, pruners)
+        if frame is None:
+            return node
+
+        # Each frame is [handler, path, keys, unsorted children, sorted children].
+        stack = [frame]
+        while True:
+            handler, path, keys, children, results = stack[-1]
+            # Sort the children until one has children of its own to visit first.
+            for i in range(len(results), len(children)):
+                child_path = path / (str(keys[i]) if keys is not None else f"[{i}]")
+                node, frame = Sorter._enter(
+                    children[i], child_path, sorters, normalizers, pruners
+                )
+                if frame is not None:
+                    stack.append(frame)
+                    break
+                results.append(node)
+            else:
+                frame = None
+            if frame is not None:
+                continue
+
+            stack.pop()
+            if handler is SortedMapping:
+                node = SortedMapping._from_sorted(
+                    (k, v) for k, v in zip(keys, results) if v is not DROP
+                )
+            else:
+                if pruners:
+                    results = [v for v in results if v is not DROP]
+                node = SortedList._from_sorted(
+                    BaseListSorter.sorted(results, path, sorters)
+                )
+            if not stack:
+                return node
+            stack[-1][4].append(node)
+
+    @staticmethod
+    def _enter(
+        data: NDLElement,
+        path: Path,
+        sorters: Optional[List[BaseListSorter]],
+        normalizers: Optional[List[BaseNormalizer]],
+        pruners: Optional[List[BasePruner]],
+    ) -> Tuple[Any, Optional[List]]:
+        """
+        Start sorting an element for _sorted_iterative().
+        :return: (Sorted element, None) if it was sorted without visiting children,
+            otherwise (None, a stack frame for the children).
+        """
+        if pruners:
+            pruned = BasePruner.prune(data, path, pruners)
+            if pruned is not NOT_PRUNED:
+                return pruned, None
+
+        handler = _RESOLVED.get(type(data), _UNRESOLVED)
+        if handler is _UNRESOLVED:
+            handler = _resolve_handler(type(data))
+        if handler is None:
+            return BaseNormalizer.normalize(data, path, normalizers), None
+        if handler is SortedMapping:
+            keys = sorted(data.keys())
+            return None, [handler, path, keys, [data[k] for k in keys], []]
+        if handler is SortedList:
+            if not pruners:
+                children = BaseNormalizer.normalize_batch(data, path, normalizers)
+                if children is not None:
+                    sorted_list = SortedList._from_sorted(
+                        BaseListSorter.sorted(children, path, sorters)
+                    )
+                    return sorted_list, None
+            return None, [handler, path, None, list(data), []]
+        return handler(data, path, sorters, normalizers, pruners), None
+
+    @staticmethod
+    def _sorted_parallel(
+        data: NDLElement,
+        path: Path,
+        sorters: Optional[List[BaseListSorter]],
+        normalizers: Optional[List[BaseNormalizer]],
+        pruners: Optional[List[BasePruner]],
+        executor: Executor,
+        chunk_nodes: int,
+    ) -> Union[SortedMapping, SortedList, Any]:
+        """
+        Sort a nested dictionary/list with its large subtrees sorted in an executor.
+        Dicts and lists with more than chunk_nodes nodes are split into their
+        children, down to subtrees that are small enough.  Those are grouped into
+        chunks of about chunk_nodes nodes and sorted in the executor at their own
+        paths.  The split dicts and lists are then put back together here the same
+        way _sorted() builds them, so the result is the same.
+        :param data: Object to sort.
+        :param path: Path to the current element.
+        :param sorter: Sorter for list elements.
+        :param normalizers: List of normalizer for leaf elements.
+        :param pruners: List of pruners for branches to skip.
+        :param executor: Process or thread pool.
+        :param chunk_nodes: Number of nodes sorted by each task.
+        :return: Sorted object.
+        """
+        if _count_nodes(data, chunk_nodes) <= chunk_nodes:
+            return Sorter._sorted(data, path, sorters, normalizers, pruners)
+
+        chunks = []
+        chunk_sizes = []
+
+        def plan(element: Any, element_path: Path) -> Tuple:
+            size = _count_nodes(element, chunk_nodes)
+            handler = Sorter._handler(element)
+            split = size > chunk_nodes and (
+                handler is SortedMapping
+                # Lists of leaves are left whole so they are still batch normalized.
+                or handler is SortedList
+                and any(Sorter._handler(v) is not None for v in element)
+            )
+            if split:
+                if pruners:
+                    pruned = BasePruner.prune(element, element_path, pruners)
+                    if pruned is not NOT_PRUNED:
+                        return _VALUE, pruned
+                if handler is SortedMapping:
+                    keys = sorted(element.keys())
+                    children = [plan(element[k], element_path / str(k)) for k in keys]
+                else:
+                    keys = None
+                    children = [
+                        plan(v, element_path / f"[{i}]") for i, v in enumerate(element)
+                    ]
+                return _SPLIT, element_path, keys, children
+
+            if not chunks or chunk_sizes[-1] + size > chunk_nodes:
+                chunks.append([])
+                chunk_sizes.append(0)
+            chunks[-1].append((element, element_path))
+            chunk_sizes[-1] += size
+            return _TASK, len(chunks) - 1, len(chunks[-1]) - 1
+
+        def build(node: Tuple) -> Any:
+            if node[0] == _TASK:
+                return results[node[1]][node[2]]
+            if node[0] == _VALUE:
+                return node[1]
+            _, node_path, keys, children = node
+            values = [build(child) for child in children]
+            if keys is not None:
+                return SortedMapping._from_sorted(
+                    (k, v) for k, v in zip(keys, values) if v is not DROP
+                )
+            if pruners:
+                values = [v for v in values if v is not DROP]
+            return SortedList._from_sorted(
+                BaseListSorter.sorted(values, node_path, sorters)
+            )
+
+        root = plan(data, path)
+        futures = [
+            executor.submit(_sort_chunk, chunk, sorters, normalizers, pruners)
+            for chunk in chunks
+        ]
+        results = [future.result() for future in futures]
+        return build(root)
 
     @staticmethod
     def sorted(
@@ -129,12 +736,30 @@ class Sorter:
         *,
         sorters: LIST_SORTERS = None,
         normalizers: NORMALIZERS = None,
-    ) -> Union[SortedMapping, SortedList, Any]:
+        pruners: PRUNERS = None,
+        compact: bool = False,
+        intern: Union[bool, InternTable] = False,
+        iterative: bool = False,
+        executor: Optional[Executor] = None,
+        chunk_nodes: int = 100_000,
+    ) -> Union[SortedMapping, SortedList, CompactMapping, CompactList, Any]:
         """
         Sort a nested dictionary/list.
         :param data: Object to sort.
         :param sorters: Sorter for list elements.
         :param normalizers: Normalizer for leaf elements.
+        :param pruners: Pruners for branches to drop or replace without sorting them.
+        :param compact: Return immutable, hashable CompactMapping/CompactList nodes.
+        :param intern: Share equal subtrees between compact nodes.  True for a table
+            scoped to this call or an InternTable to share nodes across calls.
+        :param iterative: Sort with an explicit stack instead of recursion.  It has no
+            limit on the depth but is a little slower on wide objects.  Objects too
+            deep to sort recursively are always sorted again this way.
+        :param executor: Process or thread pool to sort large subtrees in parallel.
+            Container types registered in this process have to be registered in
+            worker processes too.  Not used with intern.
+        :param chunk_nodes: Number of nodes sorted by each task in the executor.
+            Objects with fewer nodes are sorted without the executor.
         :return: Sorted object.
         """
         if sorters:
@@ -143,5 +768,212 @@ class Sorter:
             normalizers = (
                 normalizers if isinstance(normalizers, list) else [normalizers]
             )
+        if pruners:
+            pruners = pruners if isinstance(pruners, list) else [pruners]
+
+        if intern is not False:
+            table = intern if isinstance(intern, InternTable) else InternTable()
+            # Without selectors a raw container sorts the same wherever it is, so
+            # a container that is referenced more than once is only sorted once.
+            # Raw containers are only remembered during this call because they can
+            # be changed or freed, and their ids reused, between calls.
+            components = (sorters or []) + (normalizers or []) + (pruners or [])
+            memo = (
+                None if any(component._selectors for component in components) else {}
+            )
+            return Sorter._interned(
+                data, Path(), sorters, normalizers, pruners, table, memo
+            )
+
+        if executor is not None:
+            sorted_data = Sorter._sorted_parallel(
+                data, Path(), sorters, normalizers, pruners, executor, chunk_nodes
+            )
+            return Sorter.compact(sorted_data) if compact else sorted_data
+
+        sorted_data = None
+        if not iterative:
+            try:
+                sorted_data = Sorter._sorted(
+                    data,
+                    Path(),
+                    sorters=sorters,
+                    normalizers=normalizers,
+                    pruners=pruners,
+                )
+            except RecursionError:
+                iterative = True
+        if iterative:
+            sorted_data = Sorter._sorted_iterative(
+                data, Path(), sorters=sorters, normalizers=normalizers, pruners=pruners
+            )
+        return Sorter.compact(sorted_data) if compact else sorted_data
+
+    @staticmethod
+    def compact(
+        data: Any, table: Optional[InternTable] = None
+    ) -> Union[CompactMapping, CompactList, Any]:
+        """
+        Convert a sorted object to CompactMapping/CompactList nodes.  These can be
+        used as dict keys and set members.
+        :param data: Sorted object.
+        :param table: Optional table to share equal subtrees.
+        :return: Compact sorted object.
+        """
+        return Sorter._compact(data, table, {})
+
+    @staticmethod
+    def _compact(
+        data: Any, table: Optional[InternTable], keys: Dict[Tuple, Tuple]
+    ) -> Union[CompactMapping, CompactList, Any]:
+        """
+        Convert a sorted object to compact nodes.
+        :param data: Sorted object.
+        :param table: Optional table to share equal subtrees.
+        :param keys: Shared key tuples by the types and values of the keys when
+            there isn't a table.
+        :return: Compact sorted object.
+        """
+        if isinstance(data, dict):
+            mapping_keys = tuple(data.keys())
+            values = tuple(Sorter._compact(v, table, keys) for v in data.values())
+            if table is not None:
+                return table.mapping(mapping_keys, values)
+            identity = tuple(_identity(k) for k in mapping_keys)
+            return CompactMapping(keys.setdefault(identity, mapping_keys), values)
+        elif isinstance(data, list):
+            values = tuple(Sorter._compact(v, table, keys) for v in data)
+            return table.list_(values) if table is not None else CompactList(values)
+        return data
+
+    @staticmethod
+    def _interned(
+        data: NDLElement,
+        path: Path,
+        sorters: Optional[List[BaseListSorter]],
+        normalizers: Optional[List[BaseNormalizer]],
+        pruners: Optional[List[BasePruner]],
+        table: InternTable,
+        memo: Optional[Dict[int, Any]],
+    ) -> Union[CompactMapping, CompactList, Any]:
+        """
+        Sort a nested dictionary/list into shared compact nodes.  Mirrors _sorted().
+        :param data: Object to sort.
+        :param path: Path to the current element.
+        :param sorter: Sorter for list elements.
+        :param normalizers: List of normalizer for leaf elements.
+        :param pruners: List of pruners for branches to skip.
+        :param table: Table of shared nodes.
+        :param memo: Nodes of the raw containers already sorted in this call by id,
+            or None if the configuration depends on the path.
+        :return: Sorted object.
+        """
+        if pruners:
+            pruned = BasePruner.prune(data, path, pruners)
+            if pruned is not NOT_PRUNED:
+                return pruned
+
+        handler = Sorter._handler(data)
+        if handler is None:
+            return BaseNormalizer.normalize(data, path, normalizers)
+
+        if memo is not None:
+            node = memo.get(id(data))
+            if node is not None:
+                table.hits += 1
+                return node
+
+        if handler is SortedMapping:
+            keys = []
+            values = []
+            for k in sorted(data.keys()):
+                child_path = path / str(k)
+                v = Sorter._interned(
+                    data[k], child_path, sorters, normalizers, pruners, table, memo
+                )
+                if v is not DROP:
+                    keys.append(k)
+                    values.append(v)
+            node = table.mapping(tuple(keys), tuple(values))
+        elif handler is SortedList:
+            children = None
+            if not pruners:
+                children = BaseNormalizer.normalize_batch(data, path, normalizers)
+            if children is None:
+                children = [
+                    Sorter._interned(
+                        v, path / f"[{i}]", sorters, normalizers, pruners, table, memo
+                    )
+                    for i, v in enumerate(data)
+                ]
+            if pruners:
+                children = [v for v in children if v is not DROP]
+            node = table.list_(tuple(BaseListSorter.sorted(children, path, sorters)))
+        else:
+            # Registered handlers build sorted dicts/lists that are converted after.
+            sorted_data = handler(data, path, sorters, normalizers, pruners)
+            node = Sorter.compact(sorted_data, table)
+
+        if memo is not None:
+            memo[id(data)] = node
+        return node
+
+    @staticmethod
+    def loads(
+        raw: Union[str, bytes, bytearray],
+        *,
+        sorters: LIST_SORTERS = None,
+        normalizers: NORMALIZERS = None,
+        pruners: PRUNERS = None,
+    ) -> Union[SortedMapping, SortedList, Any]:
+        """
+        Parse a JSON document and sort it.  When none of the sorters or normalizers
+        have selectors their result doesn't depend on the path, so the sorted nodes are
+        built while the document is decoded and the intermediate dict/list tree is
+        never created.  Otherwise the document is decoded and then sorted.
+        :param raw: JSON document.
+        :param sorters: Sorter for list elements.
+        :param normalizers: Normalizer for leaf elements.
+        :param pruners: Pruners for branches to drop or replace without sorting them.
+        :return: Sorted object.
+        """
+        if sorters:
+            sorters = sorters if isinstance(sorters, list) else [sorters]
+        if normalizers:
+            normalizers = (
+                normalizers if isinstance(normalizers, list) else [normalizers]
+            )
+        if pruners:
+            pruners = pruners if isinstance(pruners, list) else [pruners]
+
+        components = (sorters or []) + (normalizers or [])
+        if pruners or any(component._selectors for component in components):
+            return Sorter._sorted(
+                json.loads(raw),
+                Path(),
+                sorters=sorters,
+                normalizers=normalizers,
+                pruners=pruners,
+            )
+
+        # Without selectors the path is never inspected so one path serves every node.
+        path = Path()
+
+        def finish(value: Any) -> Any:
+            # Objects have already been built by the hook.  Lists and leaves are
+            # finished by the enclosing object or list.
+            value_type = type(value)
+            if value_type is SortedMapping:
+                return value
+            if value_type is list:
+                return SortedList._from_sorted(
+                    BaseListSorter.sorted([finish(v) for v in value], path, sorters)
+                )
+            return BaseNormalizer.normalize(value, path, normalizers)
+
+        def object_pairs_hook(pairs: List[Tuple[str, Any]]) -> SortedMapping:
+            return SortedMapping._from_sorted(
+                (k, finish(v)) for k, v in sorted(pairs, key=itemgetter(0))
+            )
 
-        return Sorter._sorted(data, Path(), sorters=sorters, normalizers=normalizers)
+        return finish(json.loads(raw, object_pairs_hook=object_pairs_hook))
@@ -0,0 +1,92 @@
+import time
+
+from ndl_tools import DiffBudget, Differ, NoSortListSorter
+
+LEFT = {"a": list(range(100)), "b": {"c": 1}}
+RIGHT = {"a": list(range(100)), "b": {"c": 2}}
+
+
+def test_no_limits():
+    result = Differ.diff(LEFT, RIGHT, budget=DiffBudget())
+    assert not result
+    assert not result.partial
+    assert "c" in result.support
+
+
+def test_too_many_nodes():
+    budget = DiffBudget(max_nodes=10)
+    assert budget.too_many_nodes(LEFT)
+    assert not budget.too_many_nodes({"a": 1})
+
+    result = Differ.diff(LEFT, RIGHT, budget=budget)
+    assert not result
+    assert result.partial
+    assert "undetermined" in result.support
+
+
+def test_too_many_nodes_equal():
+    result = Differ.diff(LEFT, dict(LEFT), budget=DiffBudget(max_nodes=10))
+    assert result
+    assert result.partial
+
+
+def test_max_lines():
+    left = {"a": list(range(100))}
+    right = {"a": list(range(1, 101))}
+    result = Differ.diff(left, right, budget=DiffBudget(max_lines=10))
+    assert not result
+    assert result.partial
+    assert result.support.startswith("*** PARTIAL DIFF: 10 of")
+    assert len(result.support.split("\n")) <= 1 + 2 * 10
+
+
+def test_max_rows():
+    left = {"a": list(range(100))}
+    right = {"a": list(range(1, 101))}
+    result = Differ.diff(left, right, budget=DiffBudget(max_rows=5, chunk_lines=3))
+    assert not result
+    assert result.partial
+    assert len(result.support.split("\n")) == 6
+
+
+def test_max_seconds():
+    budget = DiffBudget(max_seconds=0)
+    budget.start()
+    time.sleep(0.01)
+    assert budget.expired()
+
+    result = Differ.diff(LEFT, RIGHT, budget=DiffBudget(max_seconds=0))
+    assert not result
+    assert result.partial
+
+
+def test_cancel():
+    budget = DiffBudget()
+    assert not budget.expired()
+    budget.cancel()
+    assert budget.expired()
+
+
+def test_chunks_stay_in_step():
+    # Insertions at both ends of a list longer than a chunk.
+    left = {"a": list(range(1500))}
+    right = {"a": [-1] + list(range(1500)) + [1500]}
+    sorters = NoSortListSorter()
+    result = Differ.diff(left, right, sorters=sorters, budget=DiffBudget())
+    assert not result.partial
+    assert result.support == Differ.diff(left, right, sorters=sorters).support
+
+
+def test_max_seconds_repeated_lines():
+    # Nothing lines up, so one line diff of all the lines would take minutes.
+    left = {"a": ["x%d" % (i % 2) for i in range(5000)]}
+    right = {"a": ["x%d" % ((i + 1) % 3) for i in range(5000)]}
+    sorters = NoSortListSorter()
+    for chunk_lines in (1000, 50):
+        budget = DiffBudget(max_seconds=0.2, chunk_lines=chunk_lines)
+        start = time.monotonic()
+        result = Differ.diff(left, right, sorters=sorters, budget=budget)
+        assert time.monotonic() - start < 5
+        assert not result
+        assert result.partial
+        assert "time limit hit" in result.support
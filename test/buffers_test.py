@@ -0,0 +1,90 @@
+import pytest
+
+from ndl_tools import Differ
+from ndl_tools.buffers import buffers_equal, is_buffer, mismatches, summary
+
+numpy = pytest.importorskip("numpy")
+
+
+def test_is_buffer():
+    assert is_buffer(b"ab")
+    assert is_buffer(memoryview(b"ab"))
+    assert is_buffer(numpy.zeros(2))
+    assert not is_buffer("ab")
+
+
+def test_mismatches():
+    left = numpy.arange(10.0)
+    right = left.copy()
+    right[[3, 7]] = -1.0
+    assert mismatches(left, right) == (2, [(3,), (7,)])
+    assert mismatches(left, numpy.arange(9.0)) is None
+
+
+def test_mismatches_tolerance():
+    left = numpy.array([1.0, 2.0, numpy.nan])
+    right = numpy.array([1.001, 2.0, numpy.nan])
+    assert not buffers_equal(left, right)
+    assert buffers_equal(left, right, atol=0.01)
+
+
+def test_mismatches_2d():
+    left = numpy.zeros((2, 3), dtype=numpy.int64)
+    right = left.copy()
+    right[1, 2] = 5
+    assert mismatches(left, right) == (1, [(1, 2)])
+
+
+def test_mismatches_bytes():
+    assert mismatches(b"abcd", b"abxd") == (1, [(2,)])
+    assert buffers_equal(memoryview(b"abcd"), bytearray(b"abcd"))
+
+
+def test_summary():
+    left = numpy.array([1.0, 2.0])
+    right = numpy.array([1.0, 3.0])
+    assert summary(left) == "<ndarray shape=(2,) dtype=float64>"
+    mismatch = mismatches(left, right)
+    assert summary(right, mismatch) == (
+        "<ndarray shape=(2,) dtype=float64 mismatches=1 [1]=3.0>"
+    )
+
+
+def test_diff_arrays():
+    left = {"a": numpy.arange(1000.0), "b": b"abc"}
+    right = {"a": numpy.arange(1000.0) + 1e-9, "b": b"abc"}
+    assert not Differ.diff(left, right)
+    result = Differ.diff(left, right, array_atol=1e-6)
+    assert result
+    assert "shape=(1000,)" in result.support
+
+
+def test_diff_arrays_support():
+    left = {"a": numpy.arange(1000.0)}
+    right = {"a": numpy.arange(1000.0)}
+    right["a"][10] = 0.0
+    result = Differ.diff(left, right, max_col_width=100)
+    assert not result
+    assert "mismatches=1 [10]=" in result.support
+    assert "[10]=0.0" in result.support
+
+
+def test_first_differences_arrays():
+    left = {"a": numpy.arange(3), "b": numpy.arange(3)}
+    right = {"a": numpy.arange(3), "b": numpy.arange(1, 4)}
+    result = Differ.first_differences(left, right)
+    assert [str(d.path) for d in result] == ["b"]
+
+
+def test_lists_of_arrays():
+    left = {"a": [numpy.arange(3), numpy.arange(2), b"x", {"b": numpy.arange(2)}]}
+    right = {"a": [{"b": numpy.arange(2)}, b"x", numpy.arange(2), numpy.arange(3)]}
+    assert Differ.diff(left, right)
+    right["a"][2] = numpy.arange(1, 3)
+    assert not Differ.diff(left, right)
+
+
+def test_dtypes_differ():
+    assert not buffers_equal(numpy.arange(2), numpy.arange(2.0))
+    assert mismatches(numpy.arange(2), numpy.arange(2.0)) is None
+    assert not Differ.diff({"a": numpy.arange(2)}, {"a": numpy.arange(2.0)})
@@ -0,0 +1,144 @@
+import copy
+import json
+from json import JSONEncoder
+
+import pytest
+
+from ndl_tools import (
+    BaseNormalizer,
+    DiffBudget,
+    DiffCache,
+    Differ,
+    FloatRoundNormalizer,
+    ListLastComponentSelector,
+)
+from ndl_tools.directory import describe_config
+
+LEFT = {"a": 1.001, "b": [3, 1, 2], "c": {"x": "y"}}
+RIGHT = {"c": {"x": "z"}, "b": [1, 2, 3], "a": 1.0}
+
+
+def test_repeats_are_hits():
+    cache = DiffCache()
+    first = Differ.diff(LEFT, RIGHT, cache=cache)
+    # Equal objects with the keys in another order are the same diff.
+    right = dict(reversed(list(RIGHT.items())))
+    second = Differ.diff(copy.deepcopy(LEFT), right, cache=cache)
+    assert second is first
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+    assert first.support == Differ.diff(LEFT, RIGHT).support
+    assert cache.hit_rate == 0.5
+
+
+def test_configuration_is_part_of_the_key():
+    cache = DiffCache()
+    assert not Differ.diff(LEFT, RIGHT, cache=cache)
+    assert not Differ.diff(LEFT, RIGHT, max_col_width=30, cache=cache)
+    selector = ListLastComponentSelector(["a"])
+    normalizer = FloatRoundNormalizer(1, selectors=[selector])
+    Differ.diff(LEFT, RIGHT, normalizers=[normalizer], cache=cache)
+    other = FloatRoundNormalizer(2, selectors=[selector])
+    Differ.diff(LEFT, RIGHT, normalizers=[other], cache=cache)
+    assert (cache.hits, cache.misses) == (0, 4)
+
+
+def test_edits_are_misses():
+    cache = DiffCache()
+    left = copy.deepcopy(LEFT)
+    Differ.diff(left, RIGHT, cache=cache)
+    left["c"]["x"] = "z"
+    assert not Differ.diff(left, RIGHT, cache=cache)
+    assert cache.misses == 2
+
+
+def test_hash_collisions_are_misses():
+    # hash(-1) == hash(-2) and hash(2 ** 61) == hash(1).
+    cache = DiffCache()
+    assert Differ.diff({"x": -1}, {"x": -1}, cache=cache)
+    assert not Differ.diff({"x": -2}, {"x": -1}, cache=cache)
+    assert Differ.diff({"x": 1}, {"x": 1}, cache=cache)
+    assert not Differ.diff({"x": 2 ** 61}, {"x": 1}, cache=cache)
+    assert cache.hits == 0
+
+
+class _FuncNormalizer(BaseNormalizer):
+    def __init__(self, func):
+        self.func = func
+        super().__init__()
+
+    def _normalize(self, element):
+        return self.func(element)
+
+
+def _double(element):
+    return element * 2
+
+
+def test_functions_in_the_configuration():
+    cache = DiffCache()
+    assert Differ.diff(1, 2, normalizers=_FuncNormalizer(lambda e: 0), cache=cache)
+    assert not Differ.diff(1, 2, normalizers=_FuncNormalizer(lambda e: e), cache=cache)
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+    # Functions defined at module level are known by their name.
+    Differ.diff(1, 2, normalizers=_FuncNormalizer(_double), cache=cache)
+    Differ.diff(1, 2, normalizers=_FuncNormalizer(_double), cache=cache)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    assert describe_config([_FuncNormalizer(lambda e: e)]) is None
+    assert json.loads(describe_config([_FuncNormalizer(_double)])) == [
+        [
+            f"{__name__}._FuncNormalizer",
+            {"_selectors": None, "func": f"{__name__}._double"},
+        ]
+    ]
+
+
+class _NameEncoder(JSONEncoder):
+    def default(self, o):
+        return type(o).__name__
+
+
+def test_unpicklable_leaves_are_not_cached():
+    cache = DiffCache()
+    leaf = lambda: 1  # noqa: E731
+    assert Differ.diff({"a": leaf}, {"a": leaf}, cls=_NameEncoder, cache=cache)
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+
+def test_arrays_are_fingerprinted_by_contents():
+    numpy = pytest.importorskip("numpy")
+    cache = DiffCache()
+    left = {"a": numpy.arange(4)}
+    Differ.diff(left, {"a": numpy.arange(4)}, cache=cache)
+    Differ.diff({"a": numpy.arange(4)}, {"a": numpy.arange(4)}, cache=cache)
+    left["a"][0] = 10
+    assert not Differ.diff(left, {"a": numpy.arange(4)}, cache=cache)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_lru_limits():
+    cache = DiffCache(maxsize=2)
+    for i in range(3):
+        Differ.diff({"a": i}, {"a": 0}, cache=cache)
+    assert len(cache) == 2 and cache.evictions == 1
+    Differ.diff({"a": 0}, {"a": 0}, cache=cache)
+    assert cache.hits == 0
+
+    cache = DiffCache(max_bytes=cache.bytes - 1)
+    for i in range(2):
+        Differ.diff({"a": i}, {"a": 0}, cache=cache)
+    assert len(cache) == 1 and cache.bytes <= cache.max_bytes
+    cache.clear()
+    assert (len(cache), cache.bytes) == (0, 0)
+
+    # Results bigger than max_bytes aren't stored.
+    cache = DiffCache(max_bytes=10)
+    Differ.diff(LEFT, RIGHT, cache=cache)
+    assert (len(cache), cache.bytes) == (0, 0)
+
+
+def test_budgeted_diffs_are_not_cached():
+    cache = DiffCache()
+    Differ.diff(LEFT, RIGHT, budget=DiffBudget(), cache=cache)
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
@@ -0,0 +1,184 @@
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+
+from ndl_tools.cli import (
+    ConfigError,
+    build_config,
+    json_patch,
+    json_pointer,
+    load_config,
+    main,
+)
+from ndl_tools.sorter import Sorter
+
+LEFT = {"a": [3, 1, 2], "b": 1.001, "c": {"x": 1}, "d": [1, 2, 3]}
+RIGHT = {"a": [1, 2, 3], "b": 1.0, "c": {"x": 2, "y": 3}, "d": [1]}
+
+CONFIG = """
+[[normalizers]]
+type = "FloatRoundNormalizer"
+places = 1
+selectors = [{type = "EndsWithSelector", end_of_path = "b"}]
+"""
+
+
+def write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_text(data if isinstance(data, str) else json.dumps(data))
+    return str(path)
+
+
+def test_load_config(tmp_path):
+    config = load_config(write(tmp_path, "config.json", {"max_col_width": 30}))
+    assert config == {"max_col_width": 30}
+    with pytest.raises(ConfigError):
+        load_config(write(tmp_path, "bad.json", {"normalizers": [{"type": "Nope"}]}))
+    with pytest.raises(ConfigError):
+        load_config(write(tmp_path, "bad.json", {"colour": True}))
+
+
+def test_load_toml_config(tmp_path):
+    pytest.importorskip("tomllib")
+    config = load_config(write(tmp_path, "config.toml", CONFIG))
+    assert type(config["normalizers"][0]).__name__ == "FloatRoundNormalizer"
+
+
+def test_json_patch():
+    assert json_patch(LEFT, RIGHT, {}) == [
+        {"op": "replace", "path": "/b", "value": 1.0},
+        {"op": "replace", "path": "/c/x", "value": 2},
+        {"op": "add", "path": "/c/y", "value": 3},
+        {"op": "remove", "path": "/d/1"},
+        {"op": "remove", "path": "/d/1"},
+    ]
+
+
+def apply(document, patch):
+    for operation in patch:
+        *parents, last = [
+            part.replace("~1", "/").replace("~0", "~")
+            for part in operation["path"].split("/")[1:]
+        ]
+        parent = document
+        for part in parents:
+            parent = parent[int(part) if isinstance(parent, list) else part]
+        if isinstance(parent, list):
+            last = int(last)
+        if operation["op"] == "remove":
+            del parent[last]
+        elif operation["op"] == "add" and isinstance(parent, list):
+            parent.insert(last, operation["value"])
+        else:
+            parent[last] = operation["value"]
+    return document
+
+
+def test_json_pointer():
+    assert json_pointer(()) == ""
+    assert json_pointer(("",)) == "/"
+    assert json_pointer(("a/b", "m~n", 0)) == "/a~1b/m~0n/0"
+
+
+@pytest.mark.parametrize(
+    "left, right",
+    [
+        (LEFT, RIGHT),
+        ({"": 1, "a/b": 2, "m~n": 3}, {"": 2, "a/b": 3, "m~n": 4}),
+        ({"a": [1, 2, 3, 4, 5]}, {"a": [0, 2, 4, 6]}),
+        ({"a": [[1, 2, 3], [4, 5]]}, {"a": [[1], [4, 5, 6], [7]]}),
+    ],
+)
+def test_json_patch_applies(left, right):
+    patch = json_patch(left, right, {})
+    assert apply(Sorter.sorted(left), patch) == Sorter.sorted(right)
+
+
+def test_json_patch_comparators():
+    config = build_config(
+        {"comparators": [{"type": "FloatToleranceComparator", "atol": 0.01}]}
+    )
+    assert {"op": "replace", "path": "/b", "value": 1.0} not in json_patch(
+        LEFT, RIGHT, config
+    )
+
+
+def test_main(tmp_path, capsys):
+    left = write(tmp_path, "left.json", LEFT)
+    right = write(tmp_path, "right.json", RIGHT)
+    assert main([left, left]) == 0
+    assert capsys.readouterr().out == ""
+
+    assert main([left, right, "-f", "plain"]) == 1
+    out = capsys.readouterr().out
+    assert '"y": 3' in out
+    assert "\033" not in out
+
+    assert main([left, right, left, left, "-j", "2", "-f", "json-patch"]) == 1
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)["patch"] == [] for line in lines] == [False, True]
+
+    assert main([left, str(tmp_path / "missing.json")]) == 2
+
+
+@pytest.mark.parametrize("format_", ["plain", "json-patch"])
+def test_main_error(tmp_path, capsys, format_):
+    left = write(tmp_path, "left.json", {"a": [1, "a"]})
+    right = write(tmp_path, "right.json", {"a": [1]})
+    assert main([left, right, "-f", format_]) == 2
+    assert "TypeError" in capsys.readouterr().err
+
+
+def test_main_same_exit_code(tmp_path):
+    left = write(tmp_path, "left.json", {"a": 1, "b": 0.0})
+    for right in ({"a": True, "b": 0.0}, {"a": 1, "b": -0.0}):
+        right = write(tmp_path, "right.json", right)
+        assert main([left, right, "-f", "plain"]) == 1
+        assert main([left, right, "-f", "json-patch"]) == 1
+
+
+def test_main_stdin_ndjson(tmp_path, monkeypatch, capsys):
+    right = write(tmp_path, "right.ndjson", '{"a": 2}\n{"a": 1}\n')
+    stdin = io.TextIOWrapper(io.BytesIO(b'{"a": 1}\n{"a": 2}\n'))
+    monkeypatch.setattr("sys.stdin", stdin)
+    assert main(["-", right, "--ndjson"]) == 0
+
+
+def test_main_config(tmp_path):
+    left = write(tmp_path, "left.json", {"b": 1.001})
+    right = write(tmp_path, "right.json", {"b": 1.0})
+    config = {
+        "normalizers": [
+            {
+                "type": "FloatRoundNormalizer",
+                "places": 1,
+                "selectors": [{"type": "EndsWithSelector", "end_of_path": "b"}],
+            }
+        ]
+    }
+    assert main([left, right]) == 1
+    assert main([left, right, "-c", write(tmp_path, "config.json", config)]) == 0
+
+
+def test_lazy_imports():
+    code = (
+        "import sys, ndl_tools, ndl_tools.cli;"
+        "print(sorted({'numpy', 'asyncio', 'ndl_tools.session'} & set(sys.modules)))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert out.strip() == "[]"
+
+
+def test_package_exports():
+    import ndl_tools
+
+    assert set(ndl_tools.__all__) <= set(dir(ndl_tools))
+    for name in ndl_tools.__all__:
+        getattr(ndl_tools, name)
+    with pytest.raises(AttributeError):
+        ndl_tools.Nope
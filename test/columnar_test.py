@@ -0,0 +1,98 @@
+import copy
+
+from ndl_tools import (
+    ColumnarPruner,
+    ColumnTable,
+    Differ,
+    ListLastComponentSelector,
+    Sorter,
+)
+
+ROWS = [
+    {"id": i, "price": i * 1.5, "qty": i % 3, "sku": f"s{i}"} for i in range(100, 0, -1)
+]
+SELECTOR = ListLastComponentSelector(["rows"])
+
+
+def test_table():
+    table = ColumnTable(ROWS, ["id"])
+    assert len(table) == 100
+    assert table.column_names == ["id", "price", "qty", "sku"]
+    assert table.keys[:2] == [(1,), (2,)]
+    assert list(table.columns["price"][:2]) == [1.5, 3.0]
+
+
+def test_table_match():
+    shuffled = list(reversed(ROWS))
+    table = ColumnTable(ROWS, ["id"])
+    assert table.mismatches(ColumnTable(shuffled, ["id"])) == (0, [])
+
+
+def test_table_mismatch():
+    right = copy.deepcopy(ROWS)
+    right[0]["price"] = 0.0
+    right[1]["sku"] = "x"
+    del right[2]
+    right.append({"id": 500, "price": 1.0, "qty": 1, "sku": "y"})
+    count, positions = ColumnTable(ROWS, ["id"]).mismatches(ColumnTable(right, ["id"]))
+    assert count == 4
+    assert positions == [
+        ((98,), None),
+        ((99,), "sku"),
+        ((100,), "price"),
+        ((500,), None),
+    ]
+
+
+def test_table_tolerance():
+    right = copy.deepcopy(ROWS)
+    right[0]["price"] += 1e-9
+    left_table = ColumnTable(ROWS, ["id"])
+    assert left_table.mismatches(ColumnTable(right, ["id"]))[0] == 1
+    assert left_table.mismatches(ColumnTable(right, ["id"]), atol=1e-6)[0] == 0
+
+
+def test_table_different_columns():
+    right = [{"id": 1}]
+    assert ColumnTable(ROWS, ["id"]).mismatches(ColumnTable(right, ["id"])) is None
+
+
+def test_table_summary():
+    right = copy.deepcopy(ROWS)
+    right[0]["price"] = 0.0
+    left_table = ColumnTable(ROWS, ["id"])
+    right_table = ColumnTable(right, ["id"])
+    mismatch = left_table.mismatches(right_table)
+    assert left_table.summary(mismatch).endswith("mismatches=1 [id=100].price=150.0>")
+    assert right_table.summary(mismatch).endswith("mismatches=1 [id=100].price=0.0>")
+
+
+def test_pruner():
+    pruner = ColumnarPruner(key_columns=["id"], selectors=SELECTOR)
+    result = Sorter.sorted({"rows": ROWS}, pruners=pruner)
+    assert isinstance(result["rows"], ColumnTable)
+
+
+def test_pruner_not_records():
+    pruner = ColumnarPruner(key_columns=["id"], selectors=SELECTOR)
+    data = {"rows": [{"id": 2, "x": [1]}, {"id": 1, "x": [2]}]}
+    result = Sorter.sorted(data, pruners=pruner)
+    assert result == {"rows": [{"id": 1, "x": [2]}, {"id": 2, "x": [1]}]}
+
+
+def test_diff():
+    pruner = ColumnarPruner(key_columns=["id"], selectors=SELECTOR)
+    right = copy.deepcopy(ROWS)
+    assert Differ.diff({"rows": ROWS}, {"rows": list(reversed(right))}, pruners=pruner)
+
+    right[0]["qty"] = 7
+    result = Differ.diff(
+        {"rows": ROWS}, {"rows": right}, pruners=pruner, max_col_width=200
+    )
+    assert not result
+    assert "mismatches=1 [id=100].qty=" in result.support
+
+    differences = Differ.first_differences(
+        {"rows": ROWS}, {"rows": right}, pruners=pruner
+    )
+    assert [str(d.path) for d in differences] == ["rows"]
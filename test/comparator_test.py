@@ -0,0 +1,105 @@
+from pathlib import Path
+
+import pytest
+
+from ndl_tools import (
+    BaseComparator,
+    Differ,
+    EndsWithSelector,
+    FloatToleranceComparator,
+    IsoDateComparator,
+    PathSuffixComparator,
+    Sorter,
+)
+from ndl_tools.comparator import reconcile
+
+LEFT = {
+    "price": 1.05,
+    "qty": 3,
+    "created": "2020-01-02",
+    "file": "/home/a/data/x.json",
+    "items": [{"price": 2.0001, "sku": "a"}],
+}
+RIGHT = {
+    "price": 1.0499,
+    "qty": 3,
+    "created": "2021-06-07T10:00:00",
+    "file": "/tmp/b/data/x.json",
+    "items": [{"price": 2.0, "sku": "a"}],
+}
+
+
+def test_float_tolerance_across_rounding_boundary():
+    path = Path("price")
+    comparator = FloatToleranceComparator(atol=0.001)
+    assert BaseComparator.compare(1.05, 1.0499, path, [comparator])
+    assert not BaseComparator.compare(1.05, 1.04, path, [comparator])
+    relative = FloatToleranceComparator(rtol=0.1)
+    assert BaseComparator.compare(100, 95, path, [relative])
+    assert not BaseComparator.compare(True, 1.0, path, [comparator])
+    assert not BaseComparator.compare("1.05", 1.05, path, [comparator])
+
+
+def test_iso_date_comparator():
+    path = Path("created")
+    comparator = IsoDateComparator()
+    assert BaseComparator.compare(
+        "2020-01-02", "2021-06-07T10:00:00", path, [comparator]
+    )
+    assert not BaseComparator.compare("2020-01-02", "yesterday", path, [comparator])
+
+
+def test_path_suffix_comparator():
+    path = Path("file")
+    comparator = PathSuffixComparator(num_components=2)
+    assert BaseComparator.compare(
+        "/a/data/x.json", "/b/data/x.json", path, [comparator]
+    )
+    assert not BaseComparator.compare("/a/x.json", "/b/y/x.json", path, [comparator])
+
+
+def test_comparators_are_chained_by_selector():
+    comparators = [
+        FloatToleranceComparator(atol=0.01, selectors=[EndsWithSelector("price")]),
+        IsoDateComparator(),
+        PathSuffixComparator(num_components=2),
+    ]
+    assert Differ.diff(LEFT, RIGHT, comparators=comparators)
+    assert Differ.first_differences(LEFT, RIGHT, comparators=comparators) == []
+
+    different = dict(LEFT, qty=3.001)
+    result = Differ.diff(different, RIGHT, comparators=comparators)
+    assert not result
+    differences = Differ.first_differences(different, RIGHT, comparators=comparators)
+    assert [str(difference.path) for difference in differences] == ["qty"]
+
+
+def test_reconcile_only_copies_changed_branches():
+    sorted_left = Sorter.sorted(LEFT)
+    sorted_right = Sorter.sorted(dict(LEFT, items=RIGHT["items"]))
+    comparator = FloatToleranceComparator(atol=0.01)
+    reconciled = reconcile(sorted_left, sorted_right, comparator)
+    assert reconciled == sorted_left
+    assert reconciled is not sorted_right
+    assert reconcile(sorted_left, sorted_left, comparator) is sorted_left
+
+
+class CountingComparator(BaseComparator):
+    calls = 0
+
+    def _compare(self, left, right):
+        CountingComparator.calls += 1
+        return False
+
+
+def test_comparators_only_run_on_leaves_that_differ():
+    left = {"values": list(range(1000)), "x": 1}
+    right = {"values": list(range(1000)), "x": 2}
+    assert not Differ.diff(left, right, comparators=CountingComparator())
+    assert CountingComparator.calls == 1
+
+
+@pytest.mark.parametrize("rtol, atol", [(-1.0, 0.0), (0.0, -1.0)])
+def test_negative_tolerance(rtol, atol):
+    with pytest.raises(ValueError):
+        FloatToleranceComparator(rtol, atol)
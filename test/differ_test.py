@@ -1,8 +1,12 @@
+import asyncio
 import copy
 import datetime
+from concurrent.futures import ThreadPoolExecutor
+import json
 from json import JSONEncoder
 
-from ndl_tools import Differ
+from ndl_tools import MISSING, DiffBudget, Differ, NoSortListSorter
+from ndl_tools.differ import _encode_lines
 
 TEST_DICT = {
     "b": 2,
@@ -67,3 +71,167 @@ def test_html_diff_dict_fail():
     result = Differ.diff(td, SORTED_DICT)
     assert not result
     print(result.support)
+
+
+def test_diff_json():
+    result = Differ.diff_json(json.dumps(TEST_DICT), json.dumps(SORTED_DICT).encode())
+    assert result
+
+
+def test_diff_json_fail():
+    td = copy.deepcopy(TEST_DICT)
+    td["l"] = []
+    result = Differ.diff_json(json.dumps(td), json.dumps(SORTED_DICT))
+    assert not result
+
+
+def test_adiff():
+    assert asyncio.run(Differ.adiff(TEST_DICT, SORTED_DICT))
+    td = copy.deepcopy(TEST_DICT)
+    td["b"] = 3
+    assert not asyncio.run(Differ.adiff(td, SORTED_DICT))
+
+
+def test_adiff_same_as_diff():
+    left = {"a": list(range(100))}
+    right = {"a": list(range(100))}
+    right["a"][50] = -1
+    result = asyncio.run(Differ.adiff(left, right))
+    assert result.support == Differ.diff(left, right).support
+    assert not result.partial
+
+
+def test_adiff_many():
+    td = copy.deepcopy(TEST_DICT)
+    td["b"] = 3
+    pairs = [(TEST_DICT, SORTED_DICT), (td, SORTED_DICT)] * 3
+
+    async def collect(ordered):
+        return [
+            (index, bool(result))
+            async for index, result in Differ.adiff_many(pairs, limit=2, ordered=ordered)
+        ]
+
+    expected = [(i, i % 2 == 0) for i in range(6)]
+    assert asyncio.run(collect(True)) == expected
+    assert sorted(asyncio.run(collect(False))) == expected
+
+
+def test_adiff_cancel():
+    left = {"a": list(range(20000))}
+    right = {"a": list(range(1, 20001))}
+
+    async def cancel():
+        task = asyncio.ensure_future(Differ.adiff(left, right, budget=DiffBudget()))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        return False
+
+    assert asyncio.run(cancel())
+
+
+def test_adiff_cancel_stops_worker():
+    # Nothing lines up, so the line diff would take minutes.
+    left = {"a": ["x%d" % (i % 2) for i in range(3000)]}
+    right = {"a": ["x%d" % ((i + 1) % 3) for i in range(3000)]}
+    sorters = NoSortListSorter()
+
+    async def cancel(executor):
+        task = asyncio.ensure_future(
+            Differ.adiff(left, right, sorters=sorters, executor=executor)
+        )
+        await asyncio.sleep(0.2)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        asyncio.run(cancel(executor))
+        # The only worker is free again once the diff stops.
+        executor.submit(lambda: None).result(timeout=5)
+
+
+def test_section_depth():
+    left = {
+        "a": {"x": [3, 1, 2], "y": {"p": 1, "q": 2}},
+        'quote"d': 1,
+        "removed": True,
+        "z": [{"n": 1}],
+    }
+    right = copy.deepcopy(left)
+    right["a"]["y"]["q"] = 3
+    del right["removed"]
+    right["added"] = {"k": "v"}
+
+    for depth in (1, 2, 3):
+        assert Differ.diff(left, left, section_depth=depth).support == (
+            Differ.diff(left, left).support
+        )
+        result = Differ.diff(left, right, section_depth=depth)
+        assert not result
+        support = result.support
+        assert support.count("\n") == Differ.diff(left, right).support.count("\n")
+        assert '"removed": true' in support
+        assert '"added": {' in support
+        assert '"q": \x1b[0:34m2' in support
+
+    assert Differ.diff([2, 1], [1, 2], section_depth=1)
+    with ThreadPoolExecutor(2) as executor:
+        result = Differ.diff(left, right, section_depth=2, executor=executor)
+        assert result.support == Differ.diff(left, right, section_depth=2).support
+
+
+def deep(depth, leaf):
+    data = {"leaf": [2, leaf]}
+    for i in range(depth):
+        data = {"child": [data], "level": i}
+    return data
+
+
+def test_deep_documents():
+    # Deeper than the recursion limit.  A full diff of deep documents is slow to
+    # format, so the mismatch only renders the changed region.
+    assert Differ.diff(deep(1000, 1), deep(1000, 1))
+    result = Differ.diff(deep(1000, 1), deep(1000, 3), budget=DiffBudget())
+    assert not result
+    assert "3" in result.support
+    differences = Differ.first_differences(deep(1000, 1), deep(1000, 3))
+    assert [(d.left, d.right) for d in differences] == [(1, MISSING), (MISSING, 3)]
+
+
+class SetEncoder(JSONEncoder):
+    def default(self, o):
+        if isinstance(o, set):
+            return sorted(o)
+        return super().default(o)
+
+
+def test_encode_lines():
+    data = {
+        "a": [1, 2.5, {"b": []}, {}, (3, "x")],
+        "é": 'ü\n"',
+        "n": [float("nan"), float("inf"), -float("inf"), None, True, False],
+        3: 2,
+        2.5: 3,
+        True: 1,
+        False: 4,
+        None: 0,
+        "s": {3, 1, 2},
+    }
+    for encoder in (
+        SetEncoder(indent=2),
+        SetEncoder(indent=2, ensure_ascii=False),
+        SetEncoder(indent="\t"),
+        SetEncoder(),
+    ):
+        assert _encode_lines(data, encoder) == encoder.encode(data).split("\n")
+    encoder = JSONEncoder(indent=2, skipkeys=True)
+    assert _encode_lines({(1,): 1, "a": 2}, encoder) == encoder.encode(
+        {(1,): 1, "a": 2}
+    ).split("\n")
@@ -0,0 +1,92 @@
+from pathlib import Path
+
+import pytest
+
+from ndl_tools import MISSING, Difference, Differ, FloatRoundNormalizer, Sorter
+from ndl_tools.difference import differences, equal
+
+LEFT = {"a": 1, "b": {"c": [1, 2, 3]}, "d": "x", "e": 1}
+RIGHT = {"a": 2, "b": {"c": [1, 2]}, "d": "x", "f": 1}
+
+
+def test_no_differences():
+    assert list(differences(LEFT, dict(LEFT))) == []
+
+
+def test_differences():
+    result = list(differences(LEFT, RIGHT))
+    assert result == [
+        Difference(Path("a"), 1, 2),
+        Difference(Path("b/c/[2]"), 3, MISSING),
+        Difference(Path("e"), 1, MISSING),
+        Difference(Path("f"), MISSING, 1),
+    ]
+    assert [d.kind for d in result] == ["changed", "removed", "removed", "added"]
+
+
+def test_type_change():
+    result = list(differences({"a": [1]}, {"a": {"b": 1}}))
+    assert result == [Difference(Path("a"), [1], {"b": 1})]
+
+
+def test_first_differences():
+    left = {"l": [{"id": i, "v": i} for i in range(100)]}
+    right = {"l": [{"id": i, "v": -i} for i in range(100)]}
+    result = Differ.first_differences(left, right, k=3)
+    assert [str(d.path) for d in result] == ["l/[1]/v", "l/[2]/v", "l/[3]/v"]
+
+
+def test_first_differences_normalized():
+    result = Differ.first_differences(
+        {"a": 1.01}, {"a": 1.02}, normalizers=FloatRoundNormalizer(places=1)
+    )
+    assert result == []
+
+
+def test_compact_differences():
+    left = Sorter.sorted(LEFT, compact=True)
+    right = Sorter.sorted(RIGHT, compact=True)
+    assert list(differences(left, right)) == list(differences(LEFT, RIGHT))
+
+
+def test_list_insertion():
+    result = Differ.first_differences(
+        {"a": [1, 2, 3, 4, 5]}, {"a": [0, 1, 2, 3, 4, 5]}, k=None
+    )
+    assert result == [Difference(Path("a/[0]"), MISSING, 0)]
+
+    result = list(differences([1, 2, 3, 4], [1, 3, 4, 9]))
+    assert result == [
+        Difference(Path("[1]"), 2, MISSING),
+        Difference(Path("[3]"), MISSING, 9),
+    ]
+
+
+def test_unaligned_leaves():
+    # Leaves that can't be fingerprinted are paired by position.
+    left = [1, lambda: 1]
+    assert list(differences(left, [1])) == [Difference(Path("[1]"), left[1], MISSING)]
+
+
+def test_non_str_keys():
+    result = Differ.first_differences({1: "a", 2: "c"}, {1: "b", 2: "c"})
+    assert result == [Difference(Path("1"), "a", "b")]
+
+
+@pytest.mark.parametrize(
+    "left, right",
+    [
+        ({"a": 1}, {"a": True}),
+        ({"a": [1]}, {"a": [True]}),
+        ({"a": {"b": 1}}, {"a": {"b": 1.0}}),
+        (1, 1.0),
+        (0.0, -0.0),
+        ({"a": [0.0]}, {"a": [-0.0]}),
+        ({"a": [float("nan")]}, {"a": [float("nan")]}),
+        (float("nan"), float("nan")),
+    ],
+)
+def test_same_verdict_as_diff(left, right):
+    match = bool(Differ.diff(left, right))
+    assert (Differ.first_differences(left, right) == []) == match
+    assert equal(left, right) == (match and left == right)
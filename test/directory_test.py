@@ -0,0 +1,92 @@
+import json
+
+from ndl_tools import BaseNormalizer, DirectoryDiffer, FloatRoundNormalizer, Sorter
+from ndl_tools.__main__ import main
+
+
+def write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data))
+
+
+class _FuncNormalizer(BaseNormalizer):
+    def __init__(self, func):
+        self.func = func
+        super().__init__()
+
+    def _normalize(self, element):
+        return self.func(element)
+
+
+def setup_dirs(tmp_path):
+    baseline = tmp_path / "baseline"
+    actual = tmp_path / "actual"
+    write(baseline / "same.json", {"a": [2, 1], "b": 1.0})
+    write(actual / "same.json", {"b": 1.001, "a": [1, 2]})
+    write(baseline / "sub" / "changed.json", {"a": 1})
+    write(actual / "sub" / "changed.json", {"a": 2})
+    write(baseline / "removed.json", {})
+    write(actual / "added.json", {})
+    return baseline, actual
+
+
+def test_directory_diff(tmp_path):
+    baseline, actual = setup_dirs(tmp_path)
+    differ = DirectoryDiffer(normalizers=FloatRoundNormalizer(places=1))
+    result = differ.diff(baseline, actual, workers=0)
+    assert not result
+    assert result.added == ["added.json"]
+    assert result.removed == ["removed.json"]
+    assert list(result.changed) == ["sub/changed.json"]
+    assert result.unchanged == ["same.json"]
+    assert "changed: sub/changed.json" in result.report()
+
+
+def test_directory_diff_index(tmp_path, monkeypatch):
+    baseline, actual = setup_dirs(tmp_path)
+    index = tmp_path / "index.json"
+    differ = DirectoryDiffer(normalizers=FloatRoundNormalizer(places=1))
+    differ.diff(baseline, actual, index=index, workers=0)
+    assert len(json.loads(index.read_text())["files"]) == 4
+
+    # Only the changed pair is sorted again, for its diff.
+    calls = []
+    loads = Sorter.loads
+    monkeypatch.setattr(
+        Sorter, "loads", lambda raw, **kwargs: calls.append(raw) or loads(raw, **kwargs)
+    )
+    result = differ.diff(baseline, actual, index=index, workers=0)
+    assert result.unchanged == ["same.json"]
+    assert len(calls) == 2
+    monkeypatch.undo()
+
+    # A different configuration doesn't use the index.
+    result = DirectoryDiffer().diff(baseline, actual, index=index, workers=0)
+    assert list(result.changed) == ["same.json", "sub/changed.json"]
+
+
+def test_directory_diff_index_lambda(tmp_path):
+    baseline, actual = setup_dirs(tmp_path)
+    index = tmp_path / "index.json"
+    DirectoryDiffer(normalizers=_FuncNormalizer(lambda e: 0)).diff(
+        baseline, actual, index=index, workers=0
+    )
+    # Another lambda can't be told apart by name, so the index isn't used.
+    differ = DirectoryDiffer(normalizers=_FuncNormalizer(lambda e: e))
+    result = differ.diff(baseline, actual, index=index, workers=0)
+    assert list(result.changed) == ["same.json", "sub/changed.json"]
+
+
+def test_directory_diff_pool(tmp_path):
+    baseline, actual = setup_dirs(tmp_path)
+    write(baseline / "other.json", [1])
+    write(actual / "other.json", [2])
+    result = DirectoryDiffer().diff(baseline, actual, workers=2)
+    assert list(result.changed) == ["other.json", "same.json", "sub/changed.json"]
+
+
+def test_main(tmp_path, capsys):
+    baseline, actual = setup_dirs(tmp_path)
+    assert main([str(baseline), str(baseline)]) == 0
+    assert main([str(baseline), str(actual), "-j", "1"]) == 1
+    assert "removed: removed.json" in capsys.readouterr().out
@@ -0,0 +1,64 @@
+import json
+import pickle
+
+from ndl_tools import Differ, DriftIndex
+
+BASELINE = {
+    "id": 1,
+    "orders": [{"sku": "a", "price": 1.0}, {"sku": "b", "price": 2.0}],
+}
+
+
+def actual(n: int) -> dict:
+    data = json.loads(json.dumps(BASELINE))
+    data["orders"][1]["price"] += n
+    if n % 3 == 0:
+        data["orders"][0]["coupon"] = "x"
+    return data
+
+
+def build(ns, seed=0) -> DriftIndex:
+    index = DriftIndex(examples=3, seed=seed)
+    for n in ns:
+        index.add(Differ.first_differences(actual(n), BASELINE, k=None))
+    return index
+
+
+def test_counts_by_template():
+    index = build(range(6))
+    assert index.diffs == 6
+    assert index.mismatches == 6
+    price = index.templates["orders/[*]/price"]
+    assert (price.changed, price.added, price.removed) == (5, 0, 0)
+    coupon = index.templates["orders/[*]/coupon"]
+    assert (coupon.changed, coupon.added, coupon.removed) == (0, 0, 2)
+    assert [template for template, _ in index.most_drifted(1)] == [
+        "orders/[*]/price"
+    ]
+    assert len(price.examples) == 3
+    assert ("'x'", "MISSING") in coupon.examples
+
+
+def test_merge_matches_one_index():
+    merged = build(range(0, 50, 2)).merge(build(range(1, 50, 2)))
+    single = build(range(50))
+    assert merged.diffs == single.diffs
+    assert merged.mismatches == single.mismatches
+    for template, counts in single.templates.items():
+        ours = merged.templates[template]
+        assert (ours.changed, ours.added, ours.removed, ours.documents) == (
+            counts.changed,
+            counts.added,
+            counts.removed,
+            counts.documents,
+        )
+        assert ours.seen == counts.seen
+        assert len(ours.examples) == len(counts.examples)
+
+
+def test_serialization():
+    index = build(range(20))
+    loaded = DriftIndex.loads(index.dumps())
+    assert loaded.to_dict() == index.to_dict()
+    assert pickle.loads(pickle.dumps(index)).to_dict() == index.to_dict()
+    assert "orders/[*]/price" in loaded.report()
@@ -32,3 +32,12 @@ def test_no_sort_path_no_match():
     path = Path("a")
     result = sorter.sorted([2, 1], path, sorters=[sorter])
     assert result == [1, 2]
+
+
+def test_default_buffers(monkeypatch):
+    path = Path("a")
+    assert BaseListSorter.sorted([memoryview(b"b"), b"a"], path) == [b"a", b"b"]
+    # Lists that sort with < aren't searched for buffers.
+    monkeypatch.setattr("ndl_tools.buffers.has_buffers", None)
+    assert BaseListSorter.sorted([b"b", b"a"], path) == [b"a", b"b"]
+    assert BaseListSorter.sorted([2, 1], path) == [1, 2]
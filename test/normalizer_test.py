@@ -1,11 +1,19 @@
+import array
 import datetime
+import random
 from pathlib import Path
 
+import pytest
+
 from ndl_tools import (
+    BaseNormalizer,
     DefaultNormalizer,
     FloatRoundNormalizer,
     TodayDateNormalizer,
+    ListAnyComponentSelector,
     ListLastComponentSelector,
+    RegExSelector,
+    Sorter,
     StrTodayDateNormalizer,
     PathNormalizer,
 )
@@ -78,4 +86,122 @@ def test_path_not_normalized():
     normalizer = PathNormalizer(num_components=2)
     data = 5
     result = normalizer.normalize(data, path, normalizers=[normalizer])
-    assert result == data
\ No newline at end of file
+    assert result == data
+
+
+def test_round_significant_figures():
+    path = Path("a")
+    normalizer = FloatRoundNormalizer(significant_figures=3)
+    assert normalizer.normalize(123456.7, path, [normalizer]) == 123000.0
+    assert normalizer.normalize(0.00012345, path, [normalizer]) == 0.000123
+    assert normalizer.normalize(0.0, path, [normalizer]) == 0.0
+
+
+def test_round_places_or_significant_figures():
+    with pytest.raises(ValueError):
+        FloatRoundNormalizer()
+    with pytest.raises(ValueError):
+        FloatRoundNormalizer(2, significant_figures=2)
+
+
+def test_batch_no_normalizers():
+    elements = [2, 1]
+    result = BaseNormalizer.normalize_batch(elements, Path("a"))
+    assert result == elements and result is not elements
+
+
+def test_batch_array_and_memoryview():
+    normalizer = FloatRoundNormalizer(2)
+    elements = array.array("d", [1.0001, 2.3456])
+    result = BaseNormalizer.normalize_batch(elements, Path("a"), [normalizer])
+    assert result == [1.0, 2.35]
+    view = memoryview(elements)
+    assert BaseNormalizer.normalize_batch(view, Path("a"), [normalizer]) == [1.0, 2.35]
+    square = memoryview(bytes(4)).cast("B", (2, 2))
+    assert BaseNormalizer.normalize_batch(square, Path("a"), [normalizer]) is None
+
+
+def test_batch_not_homogeneous():
+    normalizer = FloatRoundNormalizer(2)
+    assert BaseNormalizer.normalize_batch([1.0, 1], Path("a"), [normalizer]) is None
+    assert BaseNormalizer.normalize_batch([[1.0]], Path("a"), [normalizer]) is None
+
+
+def test_batch_round():
+    normalizer = FloatRoundNormalizer(2)
+    result = BaseNormalizer.normalize_batch([1.0001, 2.3456], Path("a"), [normalizer])
+    assert result == [1.0, 2.35]
+
+
+def test_batch_round_significant_figures():
+    normalizer = FloatRoundNormalizer(significant_figures=2)
+    elements = [123.4, 0.0, -0.01234, float("inf")]
+    result = BaseNormalizer.normalize_batch(elements, Path("a"), [normalizer])
+    assert result == [120.0, 0.0, -0.012, float("inf")]
+
+
+def test_batch_round_numpy():
+    pytest.importorskip("numpy")
+    normalizer = FloatRoundNormalizer(significant_figures=2)
+    elements = [123.4, 0.0, -0.01234]
+    result = BaseNormalizer.normalize_batch(elements, Path("a"), [normalizer])
+    assert result == [120.0, 0.0, -0.012]
+    assert all(isinstance(element, float) for element in result)
+
+
+@pytest.mark.parametrize(
+    "normalizer",
+    [
+        FloatRoundNormalizer(2),
+        FloatRoundNormalizer(-1),
+        FloatRoundNormalizer(significant_figures=3),
+    ],
+)
+def test_batch_round_same_as_round(normalizer):
+    # Half way values where scaling and rounding can differ from round().
+    random.seed(0)
+    elements = [71.175, 0.125, 2.675, 1e300, 1e-320, 1000.0, 0.001, -5.0]
+    elements += [random.randint(-(10 ** 6), 10 ** 6) / 1000 for _ in range(5000)]
+    elements += [
+        random.uniform(-1, 1) * 10.0 ** random.randint(-30, 30) for _ in range(5000)
+    ]
+    result = BaseNormalizer.normalize_batch(elements, Path("a"), [normalizer])
+    assert result == [normalizer._normalize(element) for element in elements]
+
+    left = Sorter.sorted({"a": [71.175, 5.0]}, normalizers=normalizer)
+    right = Sorter.sorted({"a": [71.175, 5]}, normalizers=normalizer)
+    assert left["a"][1] == right["a"][1]
+
+
+def test_batch_round_not_float():
+    round_normalizer = FloatRoundNormalizer(2)
+    path_normalizer = PathNormalizer(num_components=1)
+    normalizers = [round_normalizer, path_normalizer]
+    result = BaseNormalizer.normalize_batch(["a/b", "c/d"], Path("a"), normalizers)
+    assert result == ["b", "d"]
+
+
+def test_batch_selector():
+    normalizer = FloatRoundNormalizer(2, selectors=ListLastComponentSelector(["a"]))
+    assert BaseNormalizer.normalize_batch([1.001], Path("a"), [normalizer]) == [1.001]
+    normalizer = FloatRoundNormalizer(2, selectors=ListAnyComponentSelector(["a"]))
+    assert BaseNormalizer.normalize_batch([1.001], Path("a"), [normalizer]) == [1.0]
+    normalizer = FloatRoundNormalizer(2, selectors=RegExSelector("a"))
+    assert BaseNormalizer.normalize_batch([1.001], Path("a"), [normalizer]) is None
+
+
+def test_batch_str_today_date():
+    path = Path("a")
+    normalizer = StrTodayDateNormalizer()
+    today = datetime.date.today().isoformat()
+    result = normalizer.normalize_batch(["1999-01-01", "2000-01-01"], path, [normalizer])
+    assert result == [today, today]
+    assert normalizer.normalize_batch(["1999-01-01", "x"], path, [normalizer]) is None
+    assert normalizer.normalize_batch(["x"], path, [normalizer]) == ["x"]
+
+
+def test_sorter_batch():
+    normalizer = FloatRoundNormalizer(1, selectors=ListAnyComponentSelector(["a"]))
+    data = {"a": [2.01, 1.01], "b": [2.01, 1.01]}
+    result = Sorter.sorted(data, normalizers=normalizer)
+    assert result == {"a": [1.0, 2.0], "b": [1.01, 2.01]}
@@ -0,0 +1,60 @@
+import tracemalloc
+from pathlib import Path
+
+from ndl_tools import (
+    BaseSelector,
+    ComponentProfiler,
+    DefaultListSorter,
+    Differ,
+    FloatRoundNormalizer,
+    FloatToleranceComparator,
+    NegativeSelector,
+    StrTodayDateNormalizer,
+)
+
+
+class DateSelector(BaseSelector):
+    def _match(self, path: Path) -> bool:
+        return path.parts[-1].endswith("_date")
+
+
+LEFT = {"a": 1.001, "b_date": "2020-01-01", "l": [{"c": 2.0}, {"c": 1.0}]}
+RIGHT = {"a": 1.0, "b_date": "2021-01-01", "l": [{"c": 1.0}, {"c": 2.1}]}
+
+
+def components():
+    date_selector = DateSelector()
+    return {
+        "normalizers": [
+            StrTodayDateNormalizer(selectors=[date_selector]),
+            FloatRoundNormalizer(2, selectors=[NegativeSelector(date_selector)]),
+        ],
+        "sorters": [DefaultListSorter()],
+        "comparators": [FloatToleranceComparator(atol=0.5)],
+    }
+
+
+def test_profiles_every_component():
+    config = components()
+    with ComponentProfiler(config) as profiler:
+        assert Differ.diff(LEFT, RIGHT, **config)
+
+    calls = {f"{s.name}.{s.method}": s.calls for s in profiler.ranked()}
+    assert calls["DateSelector#1._match"] > 0
+    assert calls["NegativeSelector#1._match"] > 0
+    assert calls["StrTodayDateNormalizer#1._normalize"] == 2
+    assert calls["DefaultListSorter#1._sorted"] == 2
+    assert calls["FloatToleranceComparator#1._compare"] == 1
+    assert all(stats.seconds >= 0 for stats in profiler.stats)
+    assert "DateSelector#1._match" in profiler.report()
+    assert len(profiler.report(n=1).splitlines()) == 2
+
+
+def test_components_are_restored():
+    config = components()
+    normalizer = config["normalizers"][0]
+    with ComponentProfiler(config, memory=False):
+        assert "_normalize" in vars(normalizer)
+    assert "_normalize" not in vars(normalizer)
+    assert not tracemalloc.is_tracing()
+    assert Differ.diff(LEFT, RIGHT, **config)
@@ -0,0 +1,80 @@
+import json
+from pathlib import Path
+
+from ndl_tools import (
+    Differ,
+    DropPruner,
+    ListLastComponentSelector,
+    PlaceholderPruner,
+    Sorter,
+)
+from ndl_tools.pruner import BasePruner, DROP, NOT_PRUNED, NotPrunedError
+
+UNSORTED = {"b": 2, "debug": {"trace": [3, 1, 2]}, "l": [{"c": 1}, {"debug": 1}]}
+
+
+class ExplodingList(list):
+    """List that fails the test if the sorter visits its children."""
+
+    def __iter__(self):
+        raise AssertionError("Pruned branch was traversed.")
+
+
+def test_prune_no_match():
+    selector = ListLastComponentSelector(["debug"])
+    pruner = DropPruner(selectors=selector)
+    assert BasePruner.prune(1, Path("a"), [pruner]) is NOT_PRUNED
+
+
+def test_prune_root():
+    selector = ListLastComponentSelector(["a"])
+    pruner = DropPruner(selectors=selector)
+    assert BasePruner.prune(1, Path(), [pruner]) is NOT_PRUNED
+
+
+def test_drop():
+    selector = ListLastComponentSelector(["debug"])
+    pruner = DropPruner(selectors=selector)
+    assert BasePruner.prune(1, Path("debug"), [pruner]) is DROP
+    assert Sorter.sorted({"debug": 1, "a": 2}, pruners=pruner) == {"a": 2}
+
+
+def test_drop_list_element():
+    selector = ListLastComponentSelector(["[0]"])
+    pruner = DropPruner(selectors=selector)
+    assert Sorter.sorted({"a": [3, 2, 1]}, pruners=pruner) == {"a": [1, 2]}
+
+
+def test_placeholder():
+    selector = ListLastComponentSelector(["debug"])
+    pruner = PlaceholderPruner(selectors=selector)
+    result = Sorter.sorted({"debug": ExplodingList([3, 2, 1]), "a": 2}, pruners=pruner)
+    assert json.dumps(result) == json.dumps({"a": 2, "debug": "<pruned>"})
+
+
+class IntOnlyPruner(BasePruner):
+    def __init__(self, *, selectors):
+        super().__init__(selectors)
+
+    def _prune(self, element):
+        if isinstance(element, int):
+            return DROP
+        raise NotPrunedError
+
+
+def test_chained():
+    selector = ListLastComponentSelector(["debug"])
+    pruners = [IntOnlyPruner(selectors=selector), PlaceholderPruner(selectors=selector)]
+    result = Sorter.sorted(UNSORTED, pruners=pruners)
+    expected = {"b": 2, "debug": "<pruned>", "l": [{}, {"c": 1}]}
+    assert json.dumps(result) == json.dumps(expected)
+
+
+def test_diff_pruned():
+    selector = ListLastComponentSelector(["debug"])
+    pruner = DropPruner(selectors=selector)
+    left = {"a": 1, "debug": {"trace": [1, 2]}}
+    right = {"a": 1, "debug": {"trace": [3]}}
+    assert not Differ.diff(left, right)
+    assert Differ.diff(left, right, pruners=pruner)
+    assert Differ.diff_json(json.dumps(left), json.dumps(right), pruners=pruner)
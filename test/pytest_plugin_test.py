@@ -0,0 +1,92 @@
+import json
+import os
+import subprocess
+import sys
+
+pytest_plugins = "pytester"
+
+TEST_MODULE = """
+from pathlib import Path
+
+import pytest
+
+
+def test_match(ndl_diff):
+    ndl_diff({"a": [2, 1], "b": 1.001}, Path("baseline.json"))
+    ndl_diff({"a": [2, 1], "b": 1.001}, Path("baseline.json"))
+
+
+def test_object(ndl_diff):
+    assert ndl_diff.diff({"a": [2, 1]}, {"a": [1, 2]})
+
+
+def test_mismatch(ndl_diff):
+    with pytest.raises(AssertionError, match="don't match"):
+        ndl_diff({"a": [3]}, Path("baseline.json"))
+"""
+
+CONFIG = {"normalizers": [{"type": "FloatRoundNormalizer", "places": 1}]}
+
+
+def test_plugin(pytester):
+    pytester.makepyfile(test_ndl=TEST_MODULE)
+    pytester.path.joinpath("baseline.json").write_text(
+        json.dumps({"b": 1.0, "a": [1, 2]})
+    )
+    pytester.path.joinpath("ndl.json").write_text(json.dumps(CONFIG))
+
+    args = ["-p", "ndl_tools.pytest_plugin", "--ndl-config", "ndl.json"]
+    result = pytester.runpytest(*args)
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines(
+        [
+            "*ndl-tools diffs*",
+            "4 diffs, baselines: 2 memory hits, 0 disk hits, 1 sorted (67% hit rate)",
+            "slowest diffs:",
+        ]
+    )
+
+    # The next session loads the sorted baseline from the cache.
+    result = pytester.runpytest(*args)
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines(["*2 memory hits, 1 disk hits, 0 sorted*"])
+
+
+def test_plugin_bad_config(pytester):
+    pytester.makepyfile(test_ndl=TEST_MODULE)
+    pytester.path.joinpath("ndl.json").write_text(json.dumps({"colour": True}))
+    args = ["-p", "ndl_tools.pytest_plugin", "--ndl-config", "ndl.json"]
+    result = pytester.runpytest(*args)
+    assert result.ret != 0
+
+
+def test_plugin_bad_cache(pytester):
+    pytester.makepyfile(test_ndl=TEST_MODULE)
+    pytester.path.joinpath("baseline.json").write_text(json.dumps({"a": [1, 2]}))
+    args = ["-p", "ndl_tools.pytest_plugin"]
+    pytester.runpytest(*args)
+    cache_dir = pytester.path / ".pytest_cache" / "d" / "ndl-baselines"
+    pickles = list(cache_dir.glob("*.pickle"))
+    assert len(pickles) == 1
+
+    # A pickle of a class that doesn't exist any more.
+    pickles[0].write_bytes(b"\x80\x04\x95\x0c\x00c__main__\nNope\n\x94.")
+    result = pytester.runpytest(*args)
+    result.stdout.fnmatch_lines(["*0 disk hits, 1 sorted*"])
+
+
+def test_plugin_unused(pytester):
+    pytester.makepyfile("def test_nothing():\n    pass\n")
+    code = (
+        "import sys, ndl_tools.pytest_plugin;"
+        "print(sorted({'ndl_tools.differ', 'ndl_tools.sorter'} & set(sys.modules)))"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env
+    ).stdout
+    assert out.strip() == "[]"
+
+    result = pytester.runpytest("-p", "ndl_tools.pytest_plugin")
+    result.assert_outcomes(passed=1)
+    assert not (pytester.path / ".pytest_cache" / "d" / "ndl-baselines").exists()
@@ -0,0 +1,98 @@
+import io
+
+import pytest
+
+from ndl_tools import (
+    AnsiRenderer,
+    Differ,
+    HtmlRenderer,
+    PlainRenderer,
+    UnifiedRenderer,
+)
+from ndl_tools.formatter import FORMAT_OFF
+
+LEFT = {
+    "a": 1,
+    "b": [3, 2, 1],
+    "c": {"x": "same", "y": "left <y> & more"},
+    "d": "only left",
+}
+RIGHT = {
+    "a": 1,
+    "b": [1, 2, 4],
+    "c": {"x": "same", "y": "right <y> & more"},
+    "e": "only right",
+}
+
+
+@pytest.mark.parametrize("right", [LEFT, RIGHT])
+def test_ansi_matches_diff_support(right):
+    stream = io.StringIO()
+    match = Differ.render(LEFT, right, AnsiRenderer(stream, buffer_rows=2))
+    result = Differ.diff(LEFT, right)
+    assert match == bool(result)
+    assert stream.getvalue() == result.support + "\n"
+
+
+def test_ansi_matches_large_diff_support():
+    # Enough repeated lines that the line matcher treats them as junk.
+    left = {f"k{i}": {"v": i, "w": [i, i + 1]} for i in range(300)}
+    right = {
+        f"k{i}": {"v": i if i % 37 else -i, "w": [i, i + 1 + i % 3]}
+        for i in range(300)
+        if i % 53
+    }
+    stream = io.StringIO()
+    assert not Differ.render(left, right, AnsiRenderer(stream))
+    assert stream.getvalue() == Differ.diff(left, right).support + "\n"
+
+
+def test_plain_has_no_colors():
+    stream = io.StringIO()
+    assert not Differ.render(LEFT, RIGHT, PlainRenderer(stream, max_col_width=30))
+    rows = stream.getvalue().splitlines()
+    assert FORMAT_OFF not in stream.getvalue()
+    line = '  "a": 1,'
+    assert f"{line:30} {line:30}" in rows
+    assert len({len(row) for row in rows}) == 1
+
+
+def test_unified():
+    stream = io.StringIO()
+    assert not Differ.render(LEFT, RIGHT, UnifiedRenderer(stream, context=0))
+    lines = stream.getvalue().splitlines()
+    assert lines[:2] == ["--- left", "+++ right"]
+    assert '-  "d": "only left"' in lines
+    assert '+  "e": "only right"' in lines
+    assert not any(line.startswith(" ") for line in lines)
+
+
+def test_unified_match_writes_nothing():
+    stream = io.StringIO()
+    assert Differ.render(LEFT, LEFT, UnifiedRenderer(stream))
+    assert stream.getvalue() == ""
+
+
+def test_html():
+    stream = io.StringIO()
+    Differ.render(LEFT, RIGHT, HtmlRenderer(stream, buffer_rows=1))
+    page = stream.getvalue()
+    assert page.startswith("<!DOCTYPE html>")
+    assert page.rstrip().endswith("</html>")
+    assert "&lt;y&gt; &amp; more" in page
+    assert '<span class="diff_chg">' in page
+    assert '<td class="diff_header">1</td><td>{</td>' in page
+
+
+def test_rows_are_written_in_batches():
+    class Stream(io.StringIO):
+        writes = 0
+
+        def write(self, text):
+            self.writes += 1
+            return super().write(text)
+
+    stream = Stream()
+    Differ.render(LEFT, RIGHT, PlainRenderer(stream, buffer_rows=4))
+    rows = stream.getvalue().count("\n")
+    assert stream.writes == -(-rows // 4)
@@ -0,0 +1,103 @@
+import socket
+import threading
+
+import pytest
+
+from ndl_tools import server as server_module
+from ndl_tools.server import DiffClient, DiffServer, DiffServerError
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets"
+)
+
+CONFIG = {
+    "normalizers": [
+        {
+            "type": "FloatRoundNormalizer",
+            "places": 1,
+            "selectors": [{"type": "EndsWithSelector", "end_of_path": "b"}],
+        }
+    ]
+}
+
+
+@pytest.fixture(params=[0, 1])
+def server(request, tmp_path):
+    # Forked workers start with the baselines this process has sorted.
+    server_module._BASELINES.clear()
+    server = DiffServer(str(tmp_path / "ndl.sock"), workers=request.param)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_diff(server):
+    with DiffClient(server.path) as client:
+        assert client.diff({"a": [2, 1]}, {"a": [1, 2]})
+        result = client.diff({"b": 1.001}, {"b": 1.0})
+        assert not result
+        assert '"b": 1.0' in result.support
+
+        config_id = client.configure(CONFIG)
+        assert client.configure(CONFIG) == config_id
+        assert client.diff({"b": 1.001}, {"b": 1.0}, config_id=config_id)
+
+
+def test_baseline(server):
+    with DiffClient(server.path) as client:
+        config_id = client.configure(CONFIG)
+        baseline_id = client.baseline({"b": 1.0, "l": [1, 2]}, config_id=config_id)
+        assert client.diff(
+            {"l": [2, 1], "b": 1.04}, baseline_id=baseline_id, config_id=config_id
+        )
+        assert not client.diff({"b": 1.0}, baseline_id=baseline_id, config_id=config_id)
+        with pytest.raises(DiffServerError):
+            client.diff({"b": 1.0}, baseline_id=baseline_id)
+
+
+def test_errors(server):
+    with DiffClient(server.path) as client:
+        with pytest.raises(DiffServerError):
+            client.configure({"normalizers": [{"type": "Nope"}]})
+        with pytest.raises(DiffServerError):
+            client.diff({}, {}, config_id="unknown")
+        assert client.diff({}, {})
+
+
+def test_concurrent_clients(server):
+    results = []
+
+    def run(i):
+        with DiffClient(server.path) as client:
+            results.append(bool(client.diff({"i": i}, {"i": i % 2})))
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(results) == [False, False, True, True]
+
+
+def test_baseline_sent_once(server, monkeypatch):
+    jobs = []
+    run = server._run
+    monkeypatch.setattr(server, "_run", lambda job: jobs.append(job) or run(job))
+    with DiffClient(server.path) as client:
+        baseline_id = client.baseline({"l": [1, 2]})
+        assert client.diff({"l": [2, 1]}, baseline_id=baseline_id)
+        assert client.diff({"l": [1, 2]}, baseline_id=baseline_id)
+    # The first diff is retried with the baseline, the second finds it.
+    assert [job[5] for job in jobs] == [False, True, False]
+    assert all(job[3] is None for job in jobs if not job[5])
+
+
+def test_baselines_dropped(server, monkeypatch):
+    monkeypatch.setattr(server_module, "MAX_BASELINES", 2)
+    with DiffClient(server.path) as client:
+        baseline_ids = [client.baseline({"i": i}) for i in range(3)]
+        with pytest.raises(DiffServerError, match="dropped"):
+            client.diff({"i": 0}, baseline_id=baseline_ids[0])
+        assert client.diff({"i": 2}, baseline_id=baseline_ids[2])
@@ -0,0 +1,99 @@
+import copy
+from json import JSONEncoder
+
+from ndl_tools import (
+    Differ,
+    DiffSession,
+    FloatRoundNormalizer,
+    ListLastComponentSelector,
+)
+
+LEFT = {
+    "b": 2,
+    "l": [4, 3, 1, 2],
+    "a": 1.001,
+    "d": {"x": 1, "y": [{"n": 2, "m": 1}, {"n": 1, "m": 2}]},
+}
+RIGHT = {
+    "a": 1.0,
+    "b": 2,
+    "d": {"x": 1, "y": [{"m": 2, "n": 1}, {"m": 1, "n": 2}]},
+    "l": [1, 2, 3, 4],
+}
+
+
+def test_session_matches_differ():
+    session = DiffSession()
+    result = session.diff(LEFT, RIGHT)
+    expected = Differ.diff(LEFT, RIGHT)
+    assert bool(result) == bool(expected)
+    assert result.support == expected.support
+
+
+def test_session_reuses_unchanged_work():
+    session = DiffSession(normalizers=FloatRoundNormalizer(places=1))
+    assert session.diff(LEFT, RIGHT)
+    assert session.reused_sections == 0
+
+    edited = copy.deepcopy(LEFT)
+    edited["b"] = 3
+    result = session.diff(edited, RIGHT)
+    assert not result
+    assert session.diffed_sections == 1
+    assert session.reused_sections == 5
+    assert session.sorted_subtrees == 1
+    assert result.support == Differ.diff(
+        edited, RIGHT, normalizers=FloatRoundNormalizer(places=1)
+    ).support
+
+
+def test_session_added_and_removed_keys():
+    session = DiffSession()
+    session.diff(LEFT, RIGHT)
+    edited = copy.deepcopy(LEFT)
+    del edited["l"]
+    edited["z"] = {"new": True}
+    result = session.diff(edited, RIGHT)
+    assert not result
+    assert '"z"' in result.support
+    assert '"l"' in result.support
+
+
+def test_session_selectors():
+    normalizers = FloatRoundNormalizer(
+        places=1, selectors=[ListLastComponentSelector(component_names=["a"])]
+    )
+    session = DiffSession(normalizers=normalizers)
+    assert session.diff(LEFT, RIGHT)
+    assert session.diff(LEFT, RIGHT)
+    assert session.reused_subtrees == 2
+
+
+def test_session_non_mapping_and_empty():
+    session = DiffSession()
+    assert session.diff([3, 1, 2], [1, 2, 3])
+    assert not session.diff({}, {"a": 1})
+    assert session.diff({}, {}).support == Differ.diff({}, {}).support
+
+
+def test_session_hash_collisions():
+    # hash(-1) == hash(-2) and hash(2 ** 61) == hash(1).
+    session = DiffSession()
+    assert session.diff({"a": {"x": -1}}, {"a": {"x": -1}})
+    assert not session.diff({"a": {"x": -2}}, {"a": {"x": -1}})
+    assert session.diff({"a": [1]}, {"a": [1]})
+    assert not session.diff({"a": [2 ** 61]}, {"a": [1]})
+
+
+class _NameEncoder(JSONEncoder):
+    def default(self, o):
+        return type(o).__name__
+
+
+def test_session_unpicklable_leaves():
+    # Subtrees with leaves that can't be fingerprinted are sorted every time.
+    session = DiffSession(cls=_NameEncoder)
+    leaf = lambda: 1  # noqa: E731
+    assert session.diff({"a": [leaf], "b": [1]}, {"a": [leaf], "b": [1]})
+    assert session.diff({"a": [leaf], "b": [1]}, {"a": [leaf], "b": [1]})
+    assert (session.sorted_subtrees, session.reused_subtrees) == (4, 2)
@@ -0,0 +1,151 @@
+import copy
+import datetime
+
+import pytest
+
+from ndl_tools import (
+    Differ,
+    FloatRoundNormalizer,
+    NotSnapshotError,
+    Snapshot,
+    Sorter,
+    write_snapshot,
+)
+from ndl_tools.snapshot import (
+    SnapshotList,
+    SnapshotMapping,
+    _children_first,
+    _fingerprint,
+    _raw_fingerprint,
+    fingerprint,
+    raw_fingerprint,
+)
+
+BASELINE = {
+    "id": 2 ** 70,
+    "name": "baseline é",
+    "flags": [True, False, True],
+    "note": None,
+    "orders": [
+        {"sku": "b", "price": 2.5, "tags": ["x", "y"]},
+        {"sku": "a", "price": 1.25, "tags": []},
+    ],
+    "blob": b"\x00\x01",
+}
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = tmp_path / "baseline.ndls"
+    write_snapshot(BASELINE, path)
+    with Snapshot(path) as snapshot:
+        yield snapshot
+
+
+def test_round_trip(snapshot):
+    materialized = snapshot.materialize()
+    sorted_baseline = Sorter.sorted(BASELINE)
+    assert Differ.first_differences(materialized, sorted_baseline, k=None) == []
+    assert snapshot.fingerprint() == fingerprint(sorted_baseline)
+
+
+def test_random_access(snapshot):
+    root = snapshot.root
+    assert isinstance(root, SnapshotMapping)
+    assert isinstance(root["orders"], SnapshotList)
+    assert snapshot.get("orders/[0]/sku") == "a"
+    assert snapshot.get("orders/[1]/tags/[1]") == "y"
+    assert snapshot.get("id") == 2 ** 70
+    with pytest.raises(KeyError):
+        snapshot.get("orders/[5]")
+    with pytest.raises(KeyError):
+        snapshot.get("missing")
+
+
+def test_arrays_are_mapped(tmp_path):
+    numpy = pytest.importorskip("numpy")
+    samples = numpy.arange(12, dtype=numpy.float32).reshape(3, 4)
+    baseline = dict(BASELINE, samples=samples)
+    path = tmp_path / "baseline.ndls"
+    write_snapshot(baseline, path)
+    with Snapshot(path) as snapshot:
+        samples = snapshot.get("samples")
+        assert not samples.flags.writeable
+        assert samples.ctypes.data % 16 == 0
+        numpy.testing.assert_array_equal(samples, baseline["samples"])
+        del samples
+
+        actual = copy.deepcopy(baseline)
+        sorted_actual = Sorter.sorted(actual)
+        rebuilt = snapshot.rebuild(sorted_actual)
+        assert rebuilt["samples"] is sorted_actual["samples"]
+
+
+def test_diff_snapshot(snapshot):
+    assert Differ.diff_snapshot(BASELINE, snapshot)
+
+    actual = copy.deepcopy(BASELINE)
+    actual["orders"][0]["price"] = 3.0
+    actual["extra"] = 1
+    result = Differ.diff_snapshot(actual, snapshot)
+    expected = Differ.diff(actual, BASELINE)
+    assert not result
+    assert result.support == expected.support
+
+
+def test_rebuild_reuses_equal_subtrees(snapshot):
+    actual = copy.deepcopy(BASELINE)
+    actual["orders"].append({"sku": "c", "price": 0.5, "tags": []})
+    sorted_actual = Sorter.sorted(actual)
+    rebuilt = snapshot.rebuild(sorted_actual)
+    assert rebuilt["flags"] is sorted_actual["flags"]
+    # The added order shifts the others, they are matched by fingerprint.
+    assert [order["sku"] for order in rebuilt["orders"]] == ["a", "b"]
+    assert all(
+        any(order is other for other in sorted_actual["orders"])
+        for order in rebuilt["orders"]
+    )
+
+
+def test_normalized_snapshot(tmp_path):
+    path = tmp_path / "baseline.ndls"
+    normalizers = FloatRoundNormalizer(places=1)
+    write_snapshot({"a": 1.04}, path, normalizers=[normalizers])
+    with Snapshot(path) as snapshot:
+        assert Differ.diff_snapshot({"a": 0.98}, snapshot, normalizers=[normalizers])
+
+
+def test_pickled_leaves(tmp_path):
+    path = tmp_path / "baseline.ndls"
+    day = datetime.date(2020, 1, 2)
+    write_snapshot({"day": day, "n": 1}, path)
+    with Snapshot(path) as snapshot:
+        assert snapshot.get("n") == 1
+        with pytest.raises(ValueError, match="allow_pickle"):
+            snapshot.get("day")
+    with Snapshot(path, allow_pickle=True) as snapshot:
+        assert snapshot.get("day") == day
+
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / "baseline.json"
+    path.write_text('{"a": 1}')
+    with pytest.raises(NotSnapshotError):
+        Snapshot(path)
+
+
+def test_deep_fingerprints():
+    data = {"leaf": [2, 1]}
+    for i in range(100):
+        data = {"child": [data, {"x": [i]}], "level": i}
+    sorted_data = Sorter.sorted(data)
+    assert _children_first(sorted_data, {}, _fingerprint) == fingerprint(sorted_data)
+    assert _children_first(data, {}, _raw_fingerprint) == raw_fingerprint(data)
+
+    other = data
+    for i in range(1000):
+        data = {"child": [data], "level": i}
+        other = {"level": i, "child": [other]}
+    assert fingerprint(Sorter.sorted(data)) == fingerprint(Sorter.sorted(other))
+    assert raw_fingerprint(data) == raw_fingerprint(other)
+    assert raw_fingerprint(data) != raw_fingerprint(data["child"])
@@ -1,8 +1,16 @@
 import json
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import OrderedDict, namedtuple
+from collections.abc import Mapping
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
 from typing import List
 
 from ndl_tools import (
+    DropPruner,
+    InternTable,
     NoSortListSorter,
     FloatRoundNormalizer,
     ListLastComponentSelector,
@@ -12,7 +20,8 @@ from ndl_tools import (
     SELECTORS,
 )
 from ndl_tools.list_sorter import NotSortedError
-from ndl_tools.sorter import SortedList, SortedMapping
+from ndl_tools.pruner import DROP
+from ndl_tools.sorter import CompactList, CompactMapping, SortedList, SortedMapping
 
 
 def test_sorted_iterable():
@@ -122,3 +131,252 @@ def test_not_sorted():
     sorter = FilteringNoSortListSorter(selectors=selector)
     sorted_dict = Sorter.sorted(unsorted, sorters=sorter)
     assert json.dumps(sorted_dict) == json.dumps(expected)
+
+
+def test_loads():
+    raw = json.dumps(TEST_DICT).encode()
+    assert Sorter.loads(raw) == Sorter.sorted(TEST_DICT)
+    assert json.dumps(Sorter.loads(raw)) == json.dumps(SORTED_DICT)
+
+
+def test_loads_list():
+    raw = json.dumps([[{"b": 1.234, "a": [2, 1]}], [[4, 3], [2.345, 1.234]]])
+    result = Sorter.loads(raw, normalizers=FloatRoundNormalizer(places=1))
+    expected = Sorter.sorted(json.loads(raw), normalizers=FloatRoundNormalizer(places=1))
+    assert json.dumps(result) == json.dumps(expected)
+    assert isinstance(result, SortedList)
+
+
+def test_loads_selectors():
+    selector = ListLastComponentSelector(component_names=["no_sort"])
+    sorter = NoSortListSorter(selectors=selector)
+    sorted_dict = Sorter.loads(json.dumps(NO_SORT), sorters=sorter)
+    assert json.dumps(sorted_dict) == json.dumps(NO_SORT_RESULT)
+
+
+def test_ordered_dict():
+    result = Sorter.sorted(OrderedDict([("b", [2, 1]), ("a", 1)]))
+    assert json.dumps(result) == json.dumps({"a": 1, "b": [1, 2]})
+
+
+def test_set_is_leaf():
+    data = {"s": {2, 1}}
+    assert Sorter.sorted(data)["s"] is data["s"]
+
+
+def test_register_list():
+    Sorter.register_list(set)
+    try:
+        result = Sorter.sorted({"s": {3, 1, 2}})
+        assert json.dumps(result) == json.dumps({"s": [1, 2, 3]})
+    finally:
+        Sorter.unregister(set)
+    assert Sorter.sorted({2, 1}) == {2, 1}
+
+
+@dataclass
+class Point:
+    y: List[int]
+    x: int
+
+
+PointTuple = namedtuple("PointTuple", ["y", "x"])
+
+
+def test_register_mapping():
+    Sorter.register_mapping(Point)
+    Sorter.register_mapping(tuple)
+    Sorter.register_mapping(Mapping, dict)
+    try:
+        expected = json.dumps([{"x": 1, "y": [1, 2]}])
+        assert json.dumps(Sorter.sorted([Point([2, 1], 1)])) == expected
+        assert json.dumps(Sorter.sorted([PointTuple([2, 1], 1)])) == expected
+        proxy = MappingProxyType({"y": [2, 1], "x": 1})
+        assert json.dumps(Sorter.sorted([proxy])) == expected
+    finally:
+        Sorter.unregister(Point)
+        Sorter.unregister(tuple)
+        Sorter.unregister(Mapping)
+
+
+def test_non_str_keys():
+    assert list(Sorter.sorted({2: [2, 1], 1: "b"}).keys()) == [1, 2]
+
+
+def test_compact():
+    result = Sorter.sorted(TEST_DICT, compact=True)
+    assert isinstance(result, CompactMapping)
+    assert not hasattr(result, "__dict__")
+    assert result.keys() == ("a", "b", "d", "l", "ld")
+    assert result["l"] == CompactList((1, 2, 3, 4))
+    assert result.get("z", 0) == 0
+    records = Sorter.sorted([{"a": 1}, {"a": 2}], compact=True)
+    assert records[0].keys() is records[1].keys()
+    assert result == Sorter.compact(Sorter.sorted(TEST_DICT))
+
+
+def test_compact_hashable():
+    left = Sorter.sorted(TEST_DICT, compact=True)
+    right = Sorter.sorted(SORTED_DICT, compact=True)
+    assert hash(left) == hash(right)
+    assert {left: 1}[right] == 1
+    assert len({left, right}) == 1
+
+
+def test_compact_types():
+    mapping = Sorter.sorted({"a": "b"}, compact=True)
+    list_ = Sorter.sorted(["a", "b"], compact=True)
+    assert mapping != list_
+    assert mapping < list_ or list_ < mapping
+    assert Sorter.sorted(TEST_LIST, compact=True) == Sorter.compact(
+        Sorter.sorted(SORTED_LIST)
+    )
+
+
+def test_compact_unhashable_leaves():
+    left = Sorter.sorted({"a": {1, 2}, "b": [{3}]}, compact=True)
+    right = Sorter.sorted({"b": [{3}], "a": {2, 1}}, compact=True)
+    assert left == right
+    assert left != Sorter.sorted({"a": {1}, "b": [{3}]}, compact=True)
+    assert left["b"] == CompactList(({3},))
+
+
+def test_compact_key_types():
+    data = {"a": {1: "x"}, "b": {True: "x"}, "c": {-0.0: "x"}, "d": {0.0: "x"}}
+    result = Sorter.sorted(data, compact=True)
+    assert [type(k) for k in result["b"].keys()] == [bool]
+    assert [str(k) for k in result["d"].keys()] == ["0.0"]
+
+
+def test_intern():
+    user = {"name": "a", "roles": [2, 1]}
+    data = {"x": [{"user": dict(user)}, {"user": dict(user)}], "y": {"user": user}}
+    result = Sorter.sorted(data, intern=True)
+    assert result == Sorter.sorted(data, compact=True)
+    assert result["x"][0] is result["x"][1]
+    assert result["x"][0]["user"] is result["y"]["user"]
+
+
+def test_intern_shared_table():
+    table = InternTable()
+    left = Sorter.sorted(TEST_DICT, intern=table)
+    right = Sorter.sorted(SORTED_DICT, intern=table)
+    assert left is right
+    assert table.hits > 0
+
+
+def test_intern_shared_references():
+    table = InternTable()
+    user = {"name": "a", "roles": [2, 1]}
+    Sorter.sorted([user, user, user], intern=table)
+    # The second and third references are found without sorting them again.
+    assert table.hits == 2
+
+
+def test_intern_table_sees_changes():
+    table = InternTable()
+    data = {"a": [1, 2]}
+    Sorter.sorted(data, intern=table)
+    data["a"].append(3)
+    assert Sorter.sorted(data, intern=table)["a"] == CompactList((1, 2, 3))
+
+
+def test_intern_leaf_types():
+    result = Sorter.sorted([[1], [1.0], [True]], intern=True)
+    assert len({id(node) for node in result}) == 3
+    result = Sorter.sorted({"a": [0.0], "b": [-0.0]}, intern=True)
+    assert result["a"] is not result["b"]
+    assert str(result["b"][0]) == "-0.0"
+
+
+def test_intern_key_types():
+    result = Sorter.sorted({"a": {1: "x"}, "b": {True: "x"}}, intern=True)
+    assert result["a"] is not result["b"]
+    assert [type(k) for k in result["b"].keys()] == [bool]
+    result = Sorter.sorted({"a": {0.0: "x"}, "b": {-0.0: "x"}}, intern=True)
+    assert [str(k) for k in result["b"].keys()] == ["-0.0"]
+
+
+def test_intern_selectors():
+    selector = ListLastComponentSelector(component_names=["no_sort"])
+    sorter = NoSortListSorter(selectors=selector)
+    result = Sorter.sorted(NO_SORT, sorters=sorter, intern=True)
+    assert result == Sorter.sorted(NO_SORT, sorters=sorter, compact=True)
+    assert list(result["no_sort"]) == [2, 1]
+
+
+def test_iterative():
+    data = {
+        "b": [[3, 1], {"y": [2.01, 1.0], "x": "x"}],
+        "a": [[2, 1], [1, 0]],
+        "debug": {"trace": [1, 2]},
+        "empty": [{}, []],
+    }
+    selector = ListLastComponentSelector(component_names=["a"])
+    kwargs = dict(
+        sorters=NoSortListSorter(selectors=selector),
+        normalizers=FloatRoundNormalizer(places=1),
+        pruners=DropPruner(
+            selectors=ListLastComponentSelector(component_names=["debug"])
+        ),
+    )
+    recursive = Sorter.sorted(data, **kwargs)
+    iterative = Sorter.sorted(data, iterative=True, **kwargs)
+    assert iterative == recursive
+    assert json.dumps(iterative) == json.dumps(recursive)
+    assert Sorter.sorted(data, iterative=True) == Sorter.sorted(data)
+
+
+def test_iterative_deep():
+    depth = 5000
+    data = {"leaf": [2, 1]}
+    for i in range(depth):
+        data = {"child": [data], "level": i}
+
+    sorted_data = Sorter.sorted(data)
+    for i in reversed(range(depth)):
+        assert list(sorted_data) == ["child", "level"]
+        assert sorted_data["level"] == i
+        assert isinstance(sorted_data["child"], SortedList)
+        sorted_data = sorted_data["child"][0]
+    assert sorted_data == {"leaf": [1, 2]}
+
+
+def test_parallel():
+    data = {
+        "big": [
+            {"id": i, "values": [3.01, 1.0, 2.0], "tags": ["b", "a"]} for i in range(50)
+        ],
+        "debug": {"trace": list(range(100))},
+        "floats": [2.01, 1.01] * 20,
+        "small": {"b": 1, "a": [2, 1]},
+        "ids": [[i, i - 1] for i in range(30)],
+    }
+    kwargs = dict(
+        sorters=NoSortListSorter(selectors=ListLastComponentSelector(["ids"])),
+        normalizers=FloatRoundNormalizer(places=1),
+        pruners=DropPruner(selectors=ListLastComponentSelector(["debug"])),
+    )
+    expected = Sorter.sorted(data, **kwargs)
+    with ProcessPoolExecutor(2) as executor:
+        for chunk_nodes in (10, 50, 1000, 100_000):
+            result = Sorter.sorted(
+                data, executor=executor, chunk_nodes=chunk_nodes, **kwargs
+            )
+            assert result == expected
+            assert json.dumps(result) == json.dumps(expected)
+    with ThreadPoolExecutor(2) as executor:
+        result = Sorter.sorted(data, executor=executor, chunk_nodes=10)
+        assert result == Sorter.sorted(data)
+
+
+def test_parallel_drops_in_workers():
+    # The dropped subtrees are small enough to be sorted in the worker processes.
+    data = {"rows": [{"id": i, "debug": {"trace": [i, 1]}} for i in range(20)]}
+    pruners = DropPruner(selectors=ListLastComponentSelector(["debug"]))
+    expected = Sorter.sorted(data, pruners=pruners)
+    with ProcessPoolExecutor(2) as executor:
+        result = Sorter.sorted(data, executor=executor, chunk_nodes=4, pruners=pruners)
+    assert result == expected
+    assert "debug" not in result["rows"][0]
+    assert pickle.loads(pickle.dumps(DROP)) is DROP